@@ -0,0 +1,187 @@
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from dagster import (
+    AssetExecutionContext,
+    AutomationCondition,
+    Config,
+    DailyPartitionsDefinition,
+    MaterializeResult,
+    asset,
+)
+
+from ingestion.article_types import NormalizedArticle
+from ingestion.db import DB_PATH, connect
+from ingestion.facets import ensure_facet_counts, refresh_facet_counts
+from ingestion.gdelt_fetcher import fetch_gdelt_articles
+from ingestion.ingest_news import (
+    ER_MAX_ITEMS,
+    GDELT_MAX_RECORDS,
+    GDELT_QUERY,
+    bump_data_version,
+    enrich_rows,
+    ensure_schema,
+    fetch_eventregistry_batch,
+    prepare_rows,
+    store_rows,
+)
+from ingestion.rate_limit import QuotaExhausted
+from ingestion.story_clusters import assign_story_clusters
+from ingestion.warm_up import warm_up
+
+# The news pipeline as software-defined assets, one partition per UTC publishing day:
+#
+#   raw_gdelt_articles ----------\
+#                                 normalized_articles -> article_enrichments -> stored_articles -> daily_rollups
+#   raw_eventregistry_articles --/                                                    |                  |
+#                                                                                story_clusters --> dashboard_views
+#
+# Fetching and enrichment are pure, so partitions run side by side; the steps that write
+# DuckDB share the "duckdb" pool (one writer at a time). Story clusters are not partitioned:
+# assignment is order-dependent across days, so the clusters and the dashboard views are
+# brought up to date once after the partitions they depend on have been materialized.
+
+# end_offset=1 includes today's (still filling) partition, which the schedule refreshes
+DAILY_PARTITIONS = DailyPartitionsDefinition(start_date="2025-01-01", end_offset=1)
+
+DUCKDB_POOL = "duckdb"
+
+# run once all updated partitions are done, without waiting for days that were never backfilled
+AFTER_PARTITIONS = AutomationCondition.eager().without(~AutomationCondition.any_deps_missing())
+
+
+# A raw batch whose provider is out of quota fails (QuotaExhausted) instead of recording an
+# empty day; rerun the partition once the quota resets. Only max_items=0 skips a provider.
+# A query matrix that ran out partway keeps the articles it already paid for.
+
+
+class FetchConfig(Config):
+    """Run config of a raw batch; the defaults fetch the whole partition day (see dagster_code/sensors.py)."""
+    max_items: Optional[int] = None  # None: full batch, 0: leave the provider out of this run
+    since: Optional[str] = None  # ISO timestamp: only newer articles (GDELT micro-batches)
+
+
+def _naive_utc_window(context: AssetExecutionContext):
+    """The partition's day as naive UTC datetimes, as stored in the articles table."""
+    window = context.partition_time_window
+    return window.start.replace(tzinfo=None), window.end.replace(tzinfo=None)
+
+
+@asset(partitions_def=DAILY_PARTITIONS, group_name="ingestion")
+def raw_gdelt_articles(context: AssetExecutionContext, config: FetchConfig) -> List[NormalizedArticle]:
+    if config.max_items == 0:
+        return []
+    window = context.partition_time_window
+    start, end = window.start, window.end
+    if config.since:
+        # may reach into the previous day: the last micro-batch before midnight left off there
+        start = datetime.fromisoformat(config.since)
+        end = min(end, datetime.now(timezone.utc))
+    articles = fetch_gdelt_articles(
+        query=GDELT_QUERY, maxrecords=config.max_items or GDELT_MAX_RECORDS, start=start, end=end
+    )
+    context.add_output_metadata({"articles": len(articles)})
+    return articles
+
+
+@asset(partitions_def=DAILY_PARTITIONS, group_name="ingestion")
+def raw_eventregistry_articles(context: AssetExecutionContext, config: FetchConfig) -> List[NormalizedArticle]:
+    if config.max_items == 0:
+        return []
+    window = context.partition_time_window
+    # Event Registry filters by day only; newest first, so a small max_items is the latest news
+    try:
+        articles = fetch_eventregistry_batch(
+            max_items=config.max_items or ER_MAX_ITEMS,
+            date_start=window.start.date(),
+            date_end=(window.end - timedelta(days=1)).date(),
+        )
+        quota_exhausted = False
+    except QuotaExhausted as exc:
+        if not exc.articles:
+            raise
+        context.log.warning(f"{exc}; keeping the {len(exc.articles)} articles fetched before")
+        articles, quota_exhausted = exc.articles, True
+    context.add_output_metadata({"articles": len(articles), "quota_exhausted": quota_exhausted})
+    return articles
+
+
+@asset(partitions_def=DAILY_PARTITIONS, group_name="ingestion")
+def normalized_articles(
+    context: AssetExecutionContext,
+    raw_gdelt_articles: List[NormalizedArticle],
+    raw_eventregistry_articles: List[NormalizedArticle],
+) -> List[dict]:
+    """Article rows with normalized URLs, deduplicated across providers (GDELT first, as in ingest())."""
+    rows = prepare_rows(raw_gdelt_articles + raw_eventregistry_articles)
+    context.add_output_metadata({"rows": len(rows)})
+    return rows
+
+
+@asset(partitions_def=DAILY_PARTITIONS, group_name="ingestion")
+def article_enrichments(normalized_articles: List[dict]) -> List[dict]:
+    """Normalized topics and language plus frame counts for every row."""
+    return enrich_rows(normalized_articles)
+
+
+@asset(partitions_def=DAILY_PARTITIONS, group_name="storage", pool=DUCKDB_POOL)
+def stored_articles(article_enrichments: List[dict]) -> MaterializeResult:
+    """New articles in DuckDB (existing article_ids are kept as they are)."""
+    con = connect(DB_PATH)
+    try:
+        ensure_schema(con)
+        ensure_facet_counts(con)
+        inserted = store_rows(con, article_enrichments)
+    finally:
+        con.close()
+    return MaterializeResult(metadata={"inserted": len(inserted), "fetched": len(article_enrichments)})
+
+
+@asset(partitions_def=DAILY_PARTITIONS, group_name="storage", pool=DUCKDB_POOL, deps=[stored_articles])
+def daily_rollups(context: AssetExecutionContext) -> MaterializeResult:
+    """The day's facet_counts buckets, recomputed from the stored articles."""
+    start, end = _naive_utc_window(context)
+    con = connect(DB_PATH)
+    try:
+        written = refresh_facet_counts(con, start, end)
+    finally:
+        con.close()
+    return MaterializeResult(metadata={"facet_rows": written})
+
+
+@asset(group_name="storage", pool=DUCKDB_POOL, deps=[stored_articles], automation_condition=AFTER_PARTITIONS)
+def story_clusters() -> MaterializeResult:
+    """Cluster assignment for articles that don't have one yet."""
+    con = connect(DB_PATH)
+    try:
+        assigned = assign_story_clusters(con)
+    finally:
+        con.close()
+    return MaterializeResult(metadata={"assigned": assigned})
+
+
+@asset(
+    group_name="dashboard",
+    pool=DUCKDB_POOL,
+    deps=[daily_rollups, story_clusters],
+    automation_condition=AFTER_PARTITIONS,
+)
+def dashboard_views() -> MaterializeResult:
+    """Publish the new data version and precompute the dashboard views for it."""
+    con = connect(DB_PATH)
+    try:
+        version = bump_data_version(con)
+    finally:
+        con.close()
+    return MaterializeResult(metadata={"data_version": version, "views_warmed": warm_up()})
+
+
+daily_assets = [
+    raw_gdelt_articles,
+    raw_eventregistry_articles,
+    normalized_articles,
+    article_enrichments,
+    stored_articles,
+    daily_rollups,
+]
+news_assets = daily_assets + [story_clusters, dashboard_views]
@@ -1,22 +1,46 @@
-from dagster import job, op, schedule, Definitions
-from ingestion.ingest_news import ingest_all_apis # a function calling all APIs and saving to Postgres
-#Single entry point for all API ingestion
-
-@op
-def fetch_and_store():
-    count = ingest_all_apis()
-    return count
+from dagster import (
+    AssetSelection,
+    AutomationConditionSensorDefinition,
+    DefaultSensorStatus,
+    Definitions,
+    RunRequest,
+    define_asset_job,
+    multiprocess_executor,
+    schedule,
+)
+from dagster_code.assets import DAILY_PARTITIONS, daily_assets, news_assets
+from dagster_code.sensors import build_micro_batch_sensor
+#Pipeline as daily-partitioned assets, see dagster_code/assets.py
 
-@job
-def news_job():
-    fetch_and_store()
+# One day of fetching, enrichment, storage and rollups. Backfills run one of these per
+# partition; within a run the two providers are fetched in separate processes.
+news_job = define_asset_job(
+    "news_job",
+    selection=AssetSelection.assets(*daily_assets),
+    partitions_def=DAILY_PARTITIONS,
+    executor_def=multiprocess_executor.configured({"max_concurrent": 4}),
+)
 
 # Calls 3 times a day at 08:00, 12:00, and 16:00 UTC. Mediastack has a limit of 4 times a day on free plan.
 @schedule(cron_schedule="0 8,12,16 * * *", job=news_job, execution_timezone="UTC")
-def three_times_a_day_schedule():
-    return {}
+def three_times_a_day_schedule(context):
+    # today's partition, which keeps filling during the day
+    today = context.scheduled_execution_time.strftime("%Y-%m-%d")
+    return RunRequest(partition_key=today)
+
+# Alternative to the schedule: small paced runs that keep the data fresh (dagster_code/sensors.py)
+micro_batch_sensor = build_micro_batch_sensor(news_job)
+
+# Story clusters and dashboard views follow once the partitions they depend on are done
+news_automation = AutomationConditionSensorDefinition(
+    "news_automation",
+    target=AssetSelection.assets("story_clusters", "dashboard_views"),
+    default_status=DefaultSensorStatus.RUNNING,
+)
 
 defs = Definitions(
+    assets=news_assets,
     jobs=[news_job],
     schedules=[three_times_a_day_schedule],
+    sensors=[micro_batch_sensor, news_automation],
 )
@@ -0,0 +1,86 @@
+from __future__ import annotations
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Iterable, Optional
+
+from ingestion.db import ROOT_DIR
+
+# Persistent cache of Q&A answers in a small SQLite file of its own (the news database is
+# opened read-only by the dashboard). WAL mode lets several dashboard processes read and
+# write it at once, which a DuckDB file can't. Entries expire after a TTL and the least
+# recently used ones are evicted beyond `max_entries`.
+
+ANSWER_CACHE_PATH = os.getenv("QA_CACHE_PATH", os.path.join(ROOT_DIR, "answer_cache.sqlite"))
+ANSWER_TTL_SECONDS = 7 * 24 * 3600
+MAX_ANSWERS = 500
+
+
+def normalize_question(question: str) -> str:
+    """Case, whitespace and trailing punctuation don't change the question."""
+    return re.sub(r"\s+", " ", (question or "").strip().lower()).rstrip("?!. ")
+
+
+def answer_key(question: str, article_ids: Iterable[str], model_name: str) -> str:
+    """Cache key: (normalized question, hash of the context article ids, model name)."""
+    ids_hash = hashlib.sha256("\n".join(sorted(article_ids)).encode("utf-8")).hexdigest()
+    raw = f"{normalize_question(question)}\x00{ids_hash}\x00{model_name}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class AnswerCache:
+    def __init__(
+        self,
+        path: str = ANSWER_CACHE_PATH,
+        max_entries: int = MAX_ANSWERS,
+        ttl_seconds: float = ANSWER_TTL_SECONDS,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._con = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute("""
+            CREATE TABLE IF NOT EXISTS answers (
+                key TEXT PRIMARY KEY,
+                answer TEXT,
+                created_at REAL,
+                last_used REAL
+            )
+        """)
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached answer, or None when missing or expired. A hit counts as a use (LRU)."""
+        now = time.time()
+        with self._lock:
+            row = self._con.execute("SELECT answer, created_at FROM answers WHERE key = ?", [key]).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl_seconds:
+                self._con.execute("DELETE FROM answers WHERE key = ?", [key])
+                return None
+            self._con.execute("UPDATE answers SET last_used = ? WHERE key = ?", [now, key])
+            return row[0]
+
+    def put(self, key: str, answer: str):
+        now = time.time()
+        with self._lock:
+            self._con.execute("INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?)", [key, answer, now, now])
+            self._con.execute("DELETE FROM answers WHERE created_at < ?", [now - self.ttl_seconds])
+            self._con.execute("""
+                DELETE FROM answers
+                WHERE key IN (
+                    SELECT key FROM answers ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )
+            """, [self.max_entries])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._con.execute("SELECT count(*) FROM answers").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._con.close()
@@ -1,11 +1,9 @@
 import os
 import sys
 import streamlit as st
-import duckdb
-import json
 import pandas as pd
 import html
-from datetime import datetime, timezone, timedelta
+from dataclasses import replace
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -15,8 +13,13 @@ if ROOT_DIR not in sys.path:
     sys.path.append(ROOT_DIR)
 
 from styles import apply_theme, render_nav
+from dashboard.time_windows import DEFAULT_WINDOW, TIME_FILTER_OPTIONS, time_bucket, window_cutoff
+from dashboard.data_access import current_data_version, memory_report, query_df, result_cache_stats
+from dashboard.approximate import exact_counts_toggle, format_count, sampling_caption, window_sampling
+from dashboard.facets import load_facet_counts
+from dashboard.parallel import run_concurrently
+from dashboard.queries import ArticleFilters, build_article_count_query, build_article_query
 
-DB_FILE = os.path.join(os.path.dirname(__file__), "../world_news.duckdb")
 LOGO_FILE = os.path.join(os.path.dirname(__file__), "../assets/logo.png")
 
 # ---------------- Page config ----------------
@@ -29,48 +32,32 @@ apply_theme()
 
 # ---------------- Helper functions ----------------
 
-TIME_FILTER_OPTIONS = {
-    "Last 24 hours": timedelta(hours=24),
-    "Last 7 days": timedelta(days=7),
-    "Last 30 days": timedelta(days=30),
-    "All time": None
-}
+PAGE_SIZE = 50
+
 
 # ---------------- Data loading ----------------
-@st.cache_data(ttl=600)
-def load_data():
-    con = duckdb.connect(DB_FILE, read_only=True)
-    df = con.execute("""
-        SELECT
-            title,
-            summary,
-            url,
-            image_url,
-            published_at,
-            provider,
-            source_name,
-            source_domain,
-            source_country,
-            language,
-            topics
-        FROM articles
-        ORDER BY published_at DESC
-        LIMIT 5000
-    """).df()
-    con.close()
-
-    def parse_topics(x):
-        try:
-            return json.loads(x) if x else []
-        except Exception:
-            return []
-
-    df["topics"] = df["topics"].apply(parse_topics)
-    df["published_at"] = pd.to_datetime(df["published_at"], utc=True, errors="coerce")
-    return df
-
-
-df = load_data()
+# Filters are applied inside DuckDB; only the rows of the current page reach pandas.
+# Every loader takes the data version so an ingest invalidates it immediately.
+@st.cache_data(max_entries=64)
+def load_facets(filters: ArticleFilters, data_version: int):
+    return load_facet_counts(filters)
+
+
+@st.cache_data(max_entries=64)
+def count_articles(filters: ArticleFilters, data_version: int, sample_pct: float | None = None):
+    """(count, 95% margin or None when exact)."""
+    sql, params = build_article_count_query(filters, sample_pct)
+    row = query_df(sql, params, data_version=data_version).iloc[0]
+    return int(row.iloc[0]), (int(row.iloc[1]) if len(row) > 1 else None)
+
+
+@st.cache_data(max_entries=64)
+def load_articles(filters: ArticleFilters, limit: int, after: tuple | None, data_version: int):
+    sql, params = build_article_query(filters, limit, after)
+    return query_df(sql, params, dataset="top_news.page", data_version=data_version)
+
+
+data_version = current_data_version()
 
 # ---------------- Header ----------------
 st.markdown('<div id="top"></div>', unsafe_allow_html=True)
@@ -96,29 +83,45 @@ st.markdown(
 if os.path.exists(LOGO_FILE):
     st.sidebar.image(LOGO_FILE, use_container_width=True)
 st.sidebar.header("Filters")
-search_query = st.sidebar.text_input("Search article titles")
 
-all_topics = sorted({t for ts in df["topics"] for t in ts})
-selected_topics = st.sidebar.multiselect(
-    "Categories",
-    all_topics,
-    format_func=lambda t: t.replace("_", " ").title()
+# Filters are read from the widget state first, so each facet can show counts that
+# follow the other selections (widgets keep their values in st.session_state by key).
+selected_time_range = st.session_state.get("filter_time", DEFAULT_WINDOW)
+filters = ArticleFilters.normalized(
+    cutoff_iso=window_cutoff(selected_time_range, time_bucket(selected_time_range)),
+    search=st.session_state.get("filter_search"),
+    topics=st.session_state.get("filter_topics"),
+    countries=st.session_state.get("filter_countries"),
+    languages=st.session_state.get("filter_languages"),
+    providers=st.session_state.get("filter_providers"),
 )
+facets = load_facets(filters, data_version)
+
+
+def facet_multiselect(label: str, dimension: str, key: str, format_value=str):
+    counts = facets[dimension]
+    # keep current selections listed even when the other filters leave them with no articles
+    options = sorted(set(counts) | set(st.session_state.get(key, [])))
+    st.sidebar.multiselect(
+        label,
+        options,
+        key=key,
+        format_func=lambda v: f"{format_value(v)} ({counts.get(v, 0):,})",
+    )
 
-all_countries = sorted(df["source_country"].dropna().unique())
-selected_countries = st.sidebar.multiselect("Countries", all_countries)
-
-all_languages = sorted(df["language"].dropna().unique())
-selected_languages = st.sidebar.multiselect("Languages", all_languages)
 
-selected_time_range = st.sidebar.radio(
+st.sidebar.text_input("Search article titles", key="filter_search")
+facet_multiselect("Categories", "topic", "filter_topics", lambda t: t.replace("_", " ").title())
+facet_multiselect("Countries", "country", "filter_countries")
+facet_multiselect("Languages", "language", "filter_languages")
+st.sidebar.radio(
     "Published time",
     list(TIME_FILTER_OPTIONS.keys()),
-    index=list(TIME_FILTER_OPTIONS.keys()).index("All time")
+    index=list(TIME_FILTER_OPTIONS.keys()).index(DEFAULT_WINDOW),
+    key="filter_time",
 )
-
-providers = sorted(df["provider"].dropna().unique())
-selected_providers = st.sidebar.multiselect("Provider", providers)
+facet_multiselect("Provider", "provider", "filter_providers")
+exact = exact_counts_toggle()
 
 # Back to top in sidebar
 st.sidebar.markdown(
@@ -132,93 +135,117 @@ st.sidebar.markdown(
     unsafe_allow_html=True,
 )
 
-# ---------------- Filtering logic ----------------
-filtered_df = df.copy()
-
-time_window = TIME_FILTER_OPTIONS[selected_time_range]
-if time_window is not None:
-    cutoff = datetime.now(timezone.utc) - time_window
-    filtered_df = filtered_df[
-        filtered_df["published_at"] >= cutoff
-    ]
-
-if search_query:
-    q = search_query.lower()
-    filtered_df = filtered_df[
-        filtered_df["title"].str.lower().str.contains(q, na=False)
-    ]
-
-if selected_topics:
-    filtered_df = filtered_df[
-        filtered_df["topics"].apply(lambda ts: any(t in ts for t in selected_topics))
-    ]
-
-if selected_countries:
-    filtered_df = filtered_df[filtered_df["source_country"].isin(selected_countries)]
-
-if selected_languages:
-    filtered_df = filtered_df[filtered_df["language"].isin(selected_languages)]
+# Memory held by cached datasets in this Streamlit process, and the on-disk result cache
+# shared by all dashboard processes
+with st.sidebar.expander("Cache memory"):
+    st.dataframe(memory_report(), hide_index=True)
+    stats = result_cache_stats()
+    st.caption(
+        f"Result cache: {stats['entries']} results, {stats['megabytes']} MB · "
+        f"{stats['hits']:,} hits / {stats['misses']:,} misses ({stats['hit_rate']:.0%})"
+    )
 
-if selected_providers:
-    filtered_df = filtered_df[filtered_df["provider"].isin(selected_providers)]
+# ---------------- Filtering logic ----------------
+# the filtered match count of a large window is estimated from a sample unless exact counts
+# are on; without filters the exact count(*) is cheaper than any sample
+sample_pct = window_sampling(filters.cutoff_iso, data_version, exact) if filters.narrows_articles() else None
+
+# Keyset pagination: remember the last (published_at, article_id) of every page we passed,
+# so "Older" / "Newer" only ever fetch one page from DuckDB. Reset when the filters change.
+feed_key = (selected_time_range, replace(filters, cutoff_iso=None), data_version)
+if st.session_state.get("feed_key") != feed_key:
+    st.session_state["feed_key"] = feed_key
+    st.session_state["feed_cursors"] = [None]
+cursors = st.session_state["feed_cursors"]
+
+# The match count and the page of articles are independent queries: run them at the same time
+(total_matches, total_margin), page_df = run_concurrently(
+    lambda: count_articles(filters, data_version, sample_pct),
+    # one extra row tells us whether an older page exists
+    lambda: load_articles(filters, PAGE_SIZE + 1, cursors[-1], data_version),
+)
 
 # ---------------- Display articles ----------------
-st.markdown(f"""
-<div class="hero-card">
-  <div class="hero-title">Top News</div>
-  <div class="hero-meta">{len(filtered_df)} articles | {selected_time_range}</div>
-</div>
-""", unsafe_allow_html=True)
-
-for _, row in filtered_df.iterrows():
-    display_title = row["title"]
-    display_summary = row["summary"]
-    display_url = row["url"]
-    display_image = row.get("image_url", None)
+def render_article_card(row) -> str:
+    display_image = row.image_url
 
     published_str = ""
-    if pd.notna(row["published_at"]):
-        published_str = pd.to_datetime(row["published_at"]).strftime("%Y-%m-%d %H:%M")
+    if pd.notna(row.published_at):
+        published_str = row.published_at.strftime("%Y-%m-%d %H:%M")
 
-    source_domain = row.get("source_domain")
-    source_name = row.get("source_name")
-    display_source = source_domain or source_name or "Unknown source"
+    display_source = row.source_domain or row.source_name or "Unknown source"
 
     meta_parts = [
         display_source,
-        row["provider"],
+        row.provider,
         published_str
     ]
 
-    if row["source_country"]:
-        meta_parts.append(str(row["source_country"]))
+    if row.source_country:
+        meta_parts.append(str(row.source_country))
 
-    if pd.notna(row["language"]):
-        meta_parts.append(row["language"])
+    if pd.notna(row.language):
+        meta_parts.append(row.language)
 
     safe_meta = [str(x) for x in meta_parts if x is not None]
     meta_text = " | ".join(safe_meta)
 
     summary_html = ""
-    if display_summary:
-        preview = display_summary[:500]
-        if len(display_summary) > 500:
+    if row.summary:
+        preview = row.summary[:500]
+        if len(row.summary) > 500:
             preview += "..."
         summary_html = f'<div class="article-summary">{html.escape(preview)}</div>'
 
     topics_html = ""
-    if row["topics"]:
-        topics_html = f'<div class="article-topics">Topics: {html.escape(", ".join(row["topics"]))}</div>'
+    if row.topics:
+        topics_html = f'<div class="article-topics">Topics: {html.escape(", ".join(row.topics))}</div>'
 
-    st.markdown(
-        f"""
+    image_html = ""
+    if display_image:
+        image_html = (
+            f"<img src='{html.escape(str(display_image))}' loading='lazy' "
+            "style='width:400px; height:auto; border-radius:8px; margin:0.5rem 0;'/>"
+        )
+
+    return f"""
 <div class="article-card">
-  <div class="article-title"><a href="{html.escape(display_url)}" target="_blank">{html.escape(display_title)}</a></div>
+  <div class="article-title"><a href="{html.escape(row.url)}" target="_blank">{html.escape(row.title)}</a></div>
   <div class="article-meta">{html.escape(meta_text)}</div>
-  {f"<img src='{html.escape(str(display_image))}' style='width:400px; height:auto; border-radius:8px; margin:0.5rem 0;'/>" if display_image else ""}
+  {image_html}
   {summary_html}
   {topics_html}
 </div>
-""",
-        unsafe_allow_html=True,
-    )
+"""
+
+
+st.markdown(f"""
+<div class="hero-card">
+  <div class="hero-title">Top News</div>
+  <div class="hero-meta">{format_count(total_matches, total_margin)} articles | {selected_time_range}</div>
+</div>
+""", unsafe_allow_html=True)
+if sampling_caption(sample_pct):
+    st.caption(sampling_caption(sample_pct))
+
+has_older = len(page_df) > PAGE_SIZE
+page_df = page_df.head(PAGE_SIZE)
+
+st.markdown(
+    "".join(render_article_card(row) for row in page_df.itertuples(index=False)),
+    unsafe_allow_html=True,
+)
+
+total_pages = max(1, (total_matches + PAGE_SIZE - 1) // PAGE_SIZE)
+nav_newer, nav_info, nav_older = st.columns([1, 2, 1])
+if nav_newer.button("← Newer", disabled=len(cursors) == 1):
+    cursors.pop()
+    st.rerun()
+nav_info.caption(f"Page {len(cursors)} of {'≈' if total_margin is not None else ''}{total_pages}")
+if nav_older.button("Older →", disabled=not has_older):
+    last = page_df.iloc[-1]
+    cursors.append((
+        last["published_at"].tz_convert("UTC").tz_localize(None).isoformat(),
+        last["article_id"],
+    ))
+    st.rerun()
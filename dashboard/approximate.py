@@ -0,0 +1,50 @@
+from __future__ import annotations
+from typing import Optional
+
+import pandas as pd
+import streamlit as st
+
+from dashboard.data_access import query_value
+from dashboard.queries import SAMPLE_ROWS, sample_percent
+from dashboard.views import window_rows as count_window_rows
+
+# Approximate mode on the pages: windows with more than APPROX_ROW_THRESHOLD articles are
+# aggregated over a sample (see dashboard/queries.py) unless "Exact counts" is switched on.
+# The window size comes from facet_counts, so the decision itself stays cheap.
+
+
+@st.cache_data(max_entries=32)
+def window_rows(cutoff_iso: Optional[str], data_version: int) -> int:
+    return count_window_rows(query_value, cutoff_iso)
+
+
+def exact_counts_toggle() -> bool:
+    return st.sidebar.toggle(
+        "Exact counts",
+        key="exact_counts",
+        help="Large time windows are estimated from a sample of about "
+        f"{SAMPLE_ROWS:,} articles. Switch on for exact (slower) counts.",
+    )
+
+
+def window_sampling(cutoff_iso: Optional[str], data_version: int, exact: bool) -> Optional[float]:
+    """Sampling rate (%) for the window's queries; None when they run exactly."""
+    if exact:
+        return None
+    return sample_percent(window_rows(cutoff_iso, data_version))
+
+
+def format_count(value, margin=None) -> str:
+    """'1,234' for exact counts, '≈1,200 ± 80' for estimates."""
+    if margin is None or pd.isna(margin):
+        return f"{int(value):,}"
+    return f"≈{int(value):,} ± {int(margin):,}"
+
+
+def sampling_caption(sample_pct: Optional[float]) -> Optional[str]:
+    if sample_pct is None:
+        return None
+    return (
+        f"Estimated from a {sample_pct:.2g}% sample of the articles in this window "
+        "(± is a 95% error bound). Switch on \"Exact counts\" in the sidebar for exact numbers."
+    )
@@ -0,0 +1,171 @@
+from __future__ import annotations
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import duckdb
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+from ingestion.db import DB_PATH, ReadConnectionPool
+from dashboard.result_cache import ResultCache, result_key
+from dashboard.views import view_query
+
+# Single place for how dashboard pages reach DuckDB. All pages share one pool of
+# read-only cursors per Streamlit process instead of opening the file on every cache miss.
+
+DB_FILE = DB_PATH
+
+# Results come out of DuckDB as Arrow. Low-cardinality text columns become pandas
+# categoricals, other text and list columns stay Arrow-backed (pd.ArrowDtype) instead of
+# Python objects; numbers and timestamps use the regular numpy dtypes.
+CATEGORICAL_COLUMNS = {"provider", "source_country", "source_domain", "source_name", "language"}
+
+_memory_lock = threading.Lock()
+_memory_by_dataset: Dict[str, dict] = {}
+
+
+@st.cache_resource
+def get_read_pool() -> ReadConnectionPool:
+    return ReadConnectionPool(DB_FILE)
+
+
+@st.cache_resource
+def get_result_cache() -> ResultCache:
+    """On-disk results shared with the other dashboard processes and the post-ingest warm-up."""
+    return ResultCache()
+
+
+def _pandas_dtype(arrow_type: pa.DataType):
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type) or pa.types.is_list(arrow_type):
+        return pd.ArrowDtype(arrow_type)
+    return None  # pyarrow default: numpy numbers, datetime64 (tz-aware for TIMESTAMPTZ), categoricals
+
+
+def arrow_to_pandas(table: pa.Table) -> pd.DataFrame:
+    """Arrow table -> memory-lean DataFrame (see CATEGORICAL_COLUMNS)."""
+    for i, field in enumerate(table.schema):
+        if field.name in CATEGORICAL_COLUMNS and pa.types.is_string(field.type):
+            table = table.set_column(i, field.name, table.column(i).dictionary_encode())
+    return table.to_pandas(types_mapper=_pandas_dtype)
+
+
+def query_arrow(sql: str, params: Optional[Sequence[Any]] = None) -> pa.Table:
+    """Run a query and return the result as an Arrow table."""
+    with get_read_pool().cursor() as cur:
+        result = cur.execute(sql, params or [])
+        return result.to_arrow_table() if hasattr(result, "to_arrow_table") else result.fetch_arrow_table()
+
+
+def cached_query_arrow(sql: str, params: Optional[Sequence[Any]], data_version: int) -> pa.Table:
+    """query_arrow() through the shared on-disk result cache, keyed by (query, params, data version)."""
+    cache = get_result_cache()
+    key = result_key(sql, params, data_version)
+    table = cache.get(key)
+    if table is None:
+        table = query_arrow(sql, params)
+        cache.put(key, table, data_version)
+    return table
+
+
+def query_df(
+    sql: str,
+    params: Optional[Sequence[Any]] = None,
+    dataset: Optional[str] = None,
+    data_version: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Run a query and return the result as a DataFrame. Loaders behind st.cache_data pass a
+    `dataset` name so the size of what they cache shows up in memory_report(), and the
+    data version to share results with other processes through the result cache.
+    """
+    if data_version is None:
+        table = query_arrow(sql, params)
+    else:
+        table = cached_query_arrow(sql, params, data_version)
+    df = arrow_to_pandas(table)
+    if dataset:
+        record_memory(dataset, df)
+    return df
+
+
+def load_view(
+    view: str,
+    window_name: str,
+    bucket: Optional[str],
+    data_version: int,
+    sample_pct: Optional[float] = None,
+    compute: Optional[Callable[[], pd.DataFrame]] = None,
+) -> pd.DataFrame:
+    """
+    A standard view (dashboard/views.py) for a window from the result cache, where the
+    post-ingest warm-up put it; on a miss it is queried now (or built by `compute`, for a
+    page that derives the view differently) and cached for the other processes.
+    """
+    sql, params = view_query(view, window_name, bucket, sample_pct)
+    if compute is None:
+        return query_df(sql, params, dataset=f"{view}[{window_name}]", data_version=data_version)
+
+    cache = get_result_cache()
+    key = result_key(sql, params, data_version)
+    table = cache.get(key)
+    if table is None:
+        df = compute()
+        cache.put(key, pa.Table.from_pandas(df, preserve_index=False), data_version)
+    else:
+        df = arrow_to_pandas(table)
+    record_memory(f"{view}[{window_name}]", df)
+    return df
+
+
+def record_memory(dataset: str, df: pd.DataFrame):
+    with _memory_lock:
+        _memory_by_dataset[dataset] = {
+            "dataset": dataset,
+            "rows": len(df),
+            "megabytes": round(df.memory_usage(deep=True).sum() / 1e6, 2),
+            "loaded_at": time.strftime("%H:%M:%S"),
+        }
+
+
+def result_cache_stats() -> Dict[str, float]:
+    return get_result_cache().stats()
+
+
+def memory_report() -> pd.DataFrame:
+    """Size of the most recent load of every cached dataset in this process, largest first."""
+    with _memory_lock:
+        rows = list(_memory_by_dataset.values())
+    report = pd.DataFrame(rows, columns=["dataset", "rows", "megabytes", "loaded_at"])
+    return report.sort_values("megabytes", ascending=False, ignore_index=True)
+
+
+def query_rows(sql: str, params: Optional[Sequence[Any]] = None) -> List[tuple]:
+    """Run a query and return all rows as tuples."""
+    with get_read_pool().cursor() as cur:
+        return cur.execute(sql, params or []).fetchall()
+
+
+def query_value(sql: str, params: Optional[Sequence[Any]] = None) -> Any:
+    """Run a query and return the first column of the first row (None when empty)."""
+    with get_read_pool().cursor() as cur:
+        row = cur.execute(sql, params or []).fetchone()
+    return row[0] if row else None
+
+
+def current_data_version() -> int:
+    """Version bumped by ingestion; part of every loader's cache key."""
+    try:
+        return query_value("SELECT version FROM data_version WHERE id = 1") or 0
+    except duckdb.CatalogException:
+        return 0
+
+
+def parse_topics(raw) -> List[str]:
+    """Stored topics are a JSON list string."""
+    try:
+        return json.loads(raw) if raw else []
+    except Exception:
+        return []
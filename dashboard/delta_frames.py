@@ -0,0 +1,148 @@
+from __future__ import annotations
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import duckdb
+import pandas as pd
+import streamlit as st
+
+from dashboard.data_access import query_df, query_value, record_memory
+
+# Article frames that are refreshed by delta instead of reloaded: each frame remembers the
+# newest inserted_at it has seen and, when the data version changes, fetches only rows
+# inserted after that. Rows that fall out of the time window are dropped in place.
+# A full reload only happens on first use or when existing articles were rewritten
+# (data_version.rewrite_version, bumped by ingestion.reprocess).
+
+Fetch = Callable[[str, Sequence[Any]], pd.DataFrame]
+FetchValue = Callable[[str, Sequence[Any]], Any]
+
+
+class DeltaFrame:
+    """
+    One loader's articles for one time window. `columns_sql` must select published_at
+    (timezone-aware); article_id and inserted_at are added automatically.
+    """
+
+    def __init__(
+        self,
+        columns_sql: str,
+        where_sql: str = "TRUE",
+        fetch: Fetch = query_df,
+        fetch_value: FetchValue = query_value,
+    ):
+        self.columns_sql = columns_sql
+        self.where_sql = where_sql
+        self._fetch = fetch
+        self._fetch_value = fetch_value
+        self._lock = threading.Lock()
+        self.frame: Optional[pd.DataFrame] = None
+        self.cutoff_iso: Optional[str] = None
+        self.data_version: Optional[int] = None
+        self.rewrite_version: Optional[int] = None
+        self.high_water = None
+        self.last_fetched_rows = 0
+
+    def _query(self, cutoff_iso: Optional[str], after=None) -> Tuple[str, List]:
+        sql = f"""
+            SELECT article_id, inserted_at, {self.columns_sql}
+            FROM articles
+            WHERE ({self.where_sql})
+        """
+        params: List = []
+        if cutoff_iso:
+            sql += " AND published_at >= ?"
+            params.append(cutoff_iso)
+        if after is not None:
+            sql += " AND inserted_at > ?"
+            params.append(after)
+        return sql, params
+
+    def _current_rewrite_version(self) -> int:
+        try:
+            return self._fetch_value("SELECT rewrite_version FROM data_version WHERE id = 1", []) or 0
+        except (duckdb.CatalogException, duckdb.BinderException):
+            return 0
+
+    def _fetch_rows(self, cutoff_iso: Optional[str], after=None) -> pd.DataFrame:
+        rows = self._fetch(*self._query(cutoff_iso, after))
+        self.last_fetched_rows = len(rows)
+        if len(rows):
+            newest = rows["inserted_at"].max()
+            self.high_water = newest if self.high_water is None or after is None else max(self.high_water, newest)
+        return rows
+
+    def _merge(self, new_rows: pd.DataFrame):
+        """Replace self.frame with old + new rows; the old frame is left untouched (sessions may still read it)."""
+        if not len(new_rows):
+            return
+        frame = self.frame
+        old_columns, new_columns = {}, {}
+        for column in frame.columns:
+            # categoricals only stay categorical when both sides share the categories
+            if isinstance(frame[column].dtype, pd.CategoricalDtype):
+                union = frame[column].cat.categories.union(new_rows[column].cat.categories)
+                old_columns[column] = frame[column].cat.set_categories(union)
+                new_columns[column] = new_rows[column].cat.set_categories(union)
+        # assign() returns new frames, so the swap below is the only change anyone can see
+        self.frame = pd.concat([frame.assign(**old_columns), new_rows.assign(**new_columns)], ignore_index=True)
+
+    def _evict(self, cutoff_iso: str):
+        keep = self.frame["published_at"] >= pd.Timestamp(cutoff_iso, tz="UTC")
+        if not keep.all():
+            self.frame = self.frame[keep].reset_index(drop=True)
+
+    def refresh(self, cutoff_iso: Optional[str], data_version: int) -> pd.DataFrame:
+        """
+        The window's articles as of `data_version`. Treat the returned frame as read-only:
+        refreshes build a new frame and swap it in, they never modify one handed out.
+        """
+        with self._lock:
+            version_changed = data_version != self.data_version
+            rewrite_version = self._current_rewrite_version() if version_changed else self.rewrite_version
+            moved_back = cutoff_iso and self.cutoff_iso and cutoff_iso < self.cutoff_iso
+
+            if self.frame is None or rewrite_version != self.rewrite_version or moved_back:
+                self.high_water = None
+                self.frame = self._fetch_rows(cutoff_iso)
+            else:
+                if version_changed:
+                    self._merge(self._fetch_rows(cutoff_iso, after=self.high_water))
+                else:
+                    self.last_fetched_rows = 0
+                if cutoff_iso and cutoff_iso != self.cutoff_iso:
+                    self._evict(cutoff_iso)
+
+            self.cutoff_iso = cutoff_iso
+            self.data_version = data_version
+            self.rewrite_version = rewrite_version
+            return self.frame
+
+
+@st.cache_resource
+def _delta_frames() -> Dict[Tuple[str, str], DeltaFrame]:
+    return {}
+
+
+_registry_lock = threading.Lock()
+
+
+def load_delta_frame(
+    dataset: str,
+    window_name: str,
+    cutoff_iso: Optional[str],
+    data_version: int,
+    columns_sql: str,
+    where_sql: str = "TRUE",
+) -> pd.DataFrame:
+    """Process-wide delta-refreshed frame for (dataset, window)."""
+    with _registry_lock:
+        frames = _delta_frames()
+        delta = frames.get((dataset, window_name))
+        if delta is None:
+            delta = frames[(dataset, window_name)] = DeltaFrame(columns_sql, where_sql)
+    before = delta.frame
+    frame = delta.refresh(cutoff_iso, data_version)
+    if frame is not before:  # only re-measure when the frame changed
+        record_memory(f"{dataset}[{window_name}]", frame)
+    return frame
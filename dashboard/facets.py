@@ -0,0 +1,40 @@
+from __future__ import annotations
+from typing import Dict
+
+import duckdb
+
+from dashboard.data_access import query_rows
+from dashboard.queries import (
+    FACET_DIMENSIONS,
+    ArticleFilters,
+    build_facet_query,
+    build_facet_table_query,
+    facet_filters,
+)
+
+# Sidebar facets: distinct values with article counts for each filter dimension.
+# A facet that only the time window applies to is read from the small facet_counts table
+# (one query for all of them); a facet narrowed by other filters is counted over the
+# matching articles, so its counts follow the rest of the sidebar.
+
+
+def load_facet_counts(filters: ArticleFilters) -> Dict[str, Dict[str, int]]:
+    """dimension -> {value: article_count}."""
+    facets: Dict[str, Dict[str, int]] = {dimension: {} for dimension in FACET_DIMENSIONS}
+    narrowed = [d for d in FACET_DIMENSIONS if facet_filters(filters, d).narrows_articles()]
+
+    from_table = [d for d in FACET_DIMENSIONS if d not in narrowed]
+    if from_table:
+        try:
+            sql, params = build_facet_table_query(filters.cutoff_iso)
+            for dimension, value, count in query_rows(sql, params):
+                if dimension in from_table:
+                    facets[dimension][value] = count
+        except duckdb.CatalogException:
+            # database not migrated yet (facet_counts is created by the next ingest)
+            narrowed = list(FACET_DIMENSIONS)
+
+    for dimension in narrowed:
+        sql, params = build_facet_query(filters, dimension)
+        facets[dimension] = dict(query_rows(sql, params))
+    return facets
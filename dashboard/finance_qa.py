@@ -0,0 +1,152 @@
+from __future__ import annotations
+import queue
+import textwrap
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from dashboard.answer_cache import AnswerCache, answer_key
+from transforms.retrieval import BM25Index, select_within_budget
+
+# Financial Q&A without Streamlit: pick the articles most relevant to the question
+# (BM25 over title + summary), fit them into a token budget and ask the model.
+# The model is pluggable (see dashboard/llm_clients.py), so this runs offline with a stub.
+
+TOP_K = 20
+TOKEN_BUDGET = 4000
+SUMMARY_CHARS = 500
+ANSWER_TIMEOUT_SECONDS = 45.0
+
+
+def index_text(article: Dict) -> str:
+    """What the retrieval index sees for one article."""
+    return f"{article.get('title') or ''} {article.get('summary') or ''}"
+
+
+def format_snippet(article: Dict) -> str:
+    summary = (article.get("summary") or "")[:SUMMARY_CHARS]
+    return f"Title: {article.get('title')}\nSummary: {summary}\nPublished: {article.get('published_at')}"
+
+
+def build_prompt(question: str, snippets: Sequence[str]) -> str:
+    return textwrap.dedent(f"""
+    You are analyzing recent financial news. Use only the provided articles.
+    Answer the user's question briefly and factually.
+    Question: {question}
+    Articles:
+    {"---".join(snippets)}
+    """)
+
+
+def select_context(
+    question: str,
+    index: BM25Index,
+    articles: Sequence[Dict],
+    top_k: int = TOP_K,
+    token_budget: int = TOKEN_BUDGET,
+) -> List[Tuple[str, str]]:
+    """
+    (article_id, snippet) pairs for the prompt: the top-k articles for the question among
+    `articles` (newest first), cut to the token budget. Falls back to the newest articles
+    when no article shares a term with the question.
+    """
+    by_id = {a["article_id"]: a for a in articles}
+    ranked = [doc_id for doc_id, _ in index.search(question, k=top_k, allowed=set(by_id))]
+    if not ranked:
+        ranked = list(by_id)[:top_k]
+    return select_within_budget(((doc_id, format_snippet(by_id[doc_id])) for doc_id in ranked), token_budget)
+
+
+def prepare_question(
+    question: str,
+    index: BM25Index,
+    articles: Sequence[Dict],
+    top_k: int = TOP_K,
+    token_budget: int = TOKEN_BUDGET,
+) -> Tuple[str, List[str]]:
+    """(prompt, ids of the articles in it) for a question."""
+    context = select_context(question, index, articles, top_k, token_budget)
+    return build_prompt(question, [snippet for _, snippet in context]), [doc_id for doc_id, _ in context]
+
+
+def answer_question(
+    question: str,
+    index: BM25Index,
+    articles: Sequence[Dict],
+    generate: Callable[[str], str],
+    top_k: int = TOP_K,
+    token_budget: int = TOKEN_BUDGET,
+) -> Tuple[str, List[str]]:
+    """Answer from the selected context; returns (answer, ids of the articles sent)."""
+    prompt, used_ids = prepare_question(question, index, articles, top_k, token_budget)
+    return generate(prompt) or "No answer returned.", used_ids
+
+
+def stream_with_timeout(chunks: Callable[[], Iterator[str]], timeout: float) -> Iterator[str]:
+    """
+    Re-yield a chunk stream produced in a worker thread; raises TimeoutError once `timeout`
+    seconds have passed in total, even if the underlying call is stuck.
+    """
+    q: "queue.Queue" = queue.Queue()
+    done = object()
+
+    def produce():
+        try:
+            for chunk in chunks():
+                q.put(chunk)
+            q.put(done)
+        except BaseException as exc:
+            q.put(exc)
+
+    threading.Thread(target=produce, name="qa-stream", daemon=True).start()
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"no complete answer within {timeout:.0f}s")
+        try:
+            item = q.get(timeout=remaining)
+        except queue.Empty:
+            continue
+        if item is done:
+            return
+        if isinstance(item, BaseException):
+            raise item
+        yield item
+
+
+def stream_answer(
+    question: str,
+    prompt: str,
+    article_ids: Sequence[str],
+    client,
+    cache: Optional[AnswerCache] = None,
+    timeout: float = ANSWER_TIMEOUT_SECONDS,
+) -> Iterator[str]:
+    """
+    Yield the answer as it arrives and store it in the cache once complete. Cached answers
+    are yielded in one piece. Timeouts and errors end the stream with a message and are not cached.
+    """
+    key = answer_key(question, article_ids, client.name)
+    cached = cache.get(key) if cache is not None else None
+    if cached is not None:
+        yield cached
+        return
+
+    parts = []
+    try:
+        for chunk in stream_with_timeout(lambda: client.stream(prompt, timeout=timeout), timeout):
+            parts.append(chunk)
+            yield chunk
+    except TimeoutError as e:
+        yield f"\n\n_Answer stopped: {e}._"
+        return
+    except Exception as e:
+        yield f"Request failed: {e}"
+        return
+
+    answer = "".join(parts)
+    if not answer:
+        yield "No answer returned."
+    elif cache is not None:
+        cache.put(key, answer)
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import argparse
+import ast
+import glob
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Cold-start budget for the dashboard: how long the module-level imports of app.py and
+# each page take in a fresh interpreter (python -X importtime), compared against the
+# budgets in import_budgets.json.
+#
+#   python -m dashboard.import_time            # check, exit code 1 when over budget
+#   python -m dashboard.import_time --update   # re-baseline budgets (+25% headroom)
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BUDGETS_FILE = os.path.join(os.path.dirname(__file__), "import_budgets.json")
+HEADROOM = 1.25
+
+
+def entry_points() -> List[str]:
+    pages = sorted(glob.glob(os.path.join(ROOT_DIR, "dashboard", "pages", "*.py")))
+    return ["dashboard/app.py"] + [os.path.relpath(p, ROOT_DIR) for p in pages]
+
+
+def top_level_imports(path: str) -> List[str]:
+    """The module-level import statements of a script, as source lines."""
+    with open(os.path.join(ROOT_DIR, path), encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int]]:
+    """(module, cumulative microseconds) for the imports done directly by the script."""
+    top = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # nested imports are indented further than the script's own ones
+        if len(name) - len(name.lstrip()) == 1:
+            top.append((name.strip(), int(cumulative)))
+    return top
+
+
+def _importtime(code: str) -> List[Tuple[str, int]]:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT_DIR, os.path.join(ROOT_DIR, "dashboard")]))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    return parse_importtime(proc.stderr)
+
+
+def measure(path: str, runs: int = 3) -> Tuple[float, List[Tuple[str, int]]]:
+    """Best-of-N import time (ms) for a script and its heaviest direct imports."""
+    code = "\n".join(top_level_imports(path))
+    # modules the interpreter loads before any script code runs (site, encodings, ...)
+    startup = {module for module, _ in _importtime("pass")}
+    best = None
+    for _ in range(runs):
+        top = [(module, us) for module, us in _importtime(code) if module not in startup]
+        total = sum(us for _, us in top) / 1000
+        if best is None or total < best[0]:
+            best = (total, sorted(top, key=lambda item: -item[1])[:5])
+    return best
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Check dashboard import time against budgets")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--update", action="store_true", help="write current timings (+25%%) as the new budgets")
+    args = parser.parse_args(argv)
+
+    budgets: Dict[str, float] = {}
+    if os.path.exists(BUDGETS_FILE):
+        with open(BUDGETS_FILE, encoding="utf-8") as f:
+            budgets = json.load(f)
+
+    over = []
+    for path in entry_points():
+        total_ms, heaviest = measure(path, args.runs)
+        budget = budgets.get(path)
+        status = "no budget" if budget is None else ("OK" if total_ms <= budget else "OVER")
+        print(f"{path}: {total_ms:.0f} ms (budget {budget if budget is not None else '-'} ms) {status}")
+        for module, us in heaviest:
+            print(f"    {module}: {us / 1000:.0f} ms")
+        if args.update:
+            budgets[path] = round(total_ms * HEADROOM, -1)
+        elif budget is not None and total_ms > budget:
+            over.append(path)
+
+    if args.update:
+        with open(BUDGETS_FILE, "w", encoding="utf-8") as f:
+            json.dump(budgets, f, indent=2)
+            f.write("\n")
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+from __future__ import annotations
+import os
+import re
+from typing import Iterator, Optional
+
+# Model clients for the financial Q&A. A client has a `name` (part of the answer-cache key)
+# and `stream(prompt, timeout)`, which yields text chunks as the model produces them.
+
+GEMINI_MODEL = "gemini-2.5-flash-lite"
+REQUEST_TIMEOUT_SECONDS = 30.0
+
+
+class GeminiClient:
+    """Google Gemini, streamed. google.generativeai is only imported when a client is created."""
+
+    def __init__(self, api_key: str, model_name: str = GEMINI_MODEL):
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self.name = model_name
+        self._model = genai.GenerativeModel(model_name)
+
+    def stream(self, prompt: str, timeout: float = REQUEST_TIMEOUT_SECONDS) -> Iterator[str]:
+        response = self._model.generate_content(prompt, stream=True, request_options={"timeout": timeout})
+        for chunk in response:
+            text = getattr(chunk, "text", "")
+            if text:
+                yield text
+
+
+class LocalClient:
+    """
+    Offline stand-in that "answers" by listing the article titles in the prompt.
+    Used in tests and when no API key is configured (QA_MODEL_CLIENT=local).
+    """
+
+    name = "local-titles"
+
+    def __init__(self, max_titles: int = 5):
+        self.max_titles = max_titles
+
+    def stream(self, prompt: str, timeout: float = REQUEST_TIMEOUT_SECONDS) -> Iterator[str]:
+        titles = re.findall(r"^\s*Title: (.+)$", prompt, flags=re.MULTILINE)[: self.max_titles]
+        if not titles:
+            yield "No articles to answer from."
+            return
+        yield "Most relevant articles:\n"
+        for title in titles:
+            yield f"- {title}\n"
+
+
+def make_client(kind: Optional[str] = None) -> Optional[object]:
+    """
+    Client chosen by QA_MODEL_CLIENT ("gemini" or "local"). Defaults to Gemini when
+    GEMINI_API_KEY is set; returns None when Gemini is asked for without a key.
+    """
+    kind = (kind or os.getenv("QA_MODEL_CLIENT") or "gemini").lower()
+    if kind == "local":
+        return LocalClient()
+    api_key = os.getenv("GEMINI_API_KEY")
+    return GeminiClient(api_key) if api_key else None
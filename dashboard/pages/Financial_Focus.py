@@ -1,23 +1,24 @@
 import os
 import sys
-import json
 import pandas as pd
-import duckdb
-import plotly.express as px
 import streamlit as st
-import textwrap
-from datetime import datetime, timezone, timedelta
 
 from dotenv import load_dotenv
 from dashboard.styles import apply_theme, render_nav
-import google.generativeai as genai
+from dashboard.time_windows import DEFAULT_WINDOW, TIME_FILTER_OPTIONS, time_bucket, window_cutoff
+from dashboard.data_access import current_data_version
+from dashboard.delta_frames import load_delta_frame
+from dashboard.parallel import run_concurrently
+from dashboard.answer_cache import AnswerCache
+from dashboard.finance_qa import index_text, prepare_question, stream_answer
+from dashboard.llm_clients import make_client
+from transforms.retrieval import BM25Index
 
 # Ensure project root is available in Python import path
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 if ROOT_DIR not in sys.path:
     sys.path.append(ROOT_DIR)
 
-DB_FILE = os.path.join(ROOT_DIR, "world_news.duckdb")
 LOGO_FILE = os.path.join(ROOT_DIR, "assets", "logo.png")
 
 st.set_page_config(page_title="Financial Focus", layout="wide")
@@ -41,66 +42,65 @@ st.markdown(
 if os.path.exists(LOGO_FILE):
     st.sidebar.image(LOGO_FILE, use_container_width=True)
 
-TIME_FILTER_OPTIONS = {
-    "Last 24 hours": timedelta(hours=24),
-    "Last 7 days": timedelta(days=7),
-    "Last 30 days": timedelta(days=30),
-    "All time": None,
-}
-
 selected_time_range = st.sidebar.radio(
     "Published time",
     list(TIME_FILTER_OPTIONS.keys()),
-    index=list(TIME_FILTER_OPTIONS.keys()).index("All time"),
+    index=list(TIME_FILTER_OPTIONS.keys()).index(DEFAULT_WINDOW),
 )
-time_window = TIME_FILTER_OPTIONS[selected_time_range]
-cutoff = datetime.now(timezone.utc) - time_window if time_window else None
-cutoff_iso = cutoff.isoformat() if cutoff else None
-
-
-@st.cache_data(ttl=600)
-def load_articles(cutoff_iso: str | None):
-    """Load articles from DuckDB and parse topics as Python lists."""
-    con = duckdb.connect(DB_FILE, read_only=True)
-    query = """
-        SELECT title, summary, body, published_at, provider, source_country, source_domain, topics, url
-        FROM articles
-        WHERE topics IS NOT NULL
-    """
-    params = []
-    if cutoff_iso:
-        query += " AND published_at >= ?"
-        params.append(cutoff_iso)
-    articles_df = con.execute(query, params).df()
-    con.close()
-
-    def parse_topics(raw):
-        try:
-            return json.loads(raw) if raw else []
-        except Exception:
-            return []
-
-    articles_df["topics"] = articles_df["topics"].apply(parse_topics)
-    articles_df["published_at"] = pd.to_datetime(
-        articles_df["published_at"], utc=True, errors="coerce"
+# Cache key: (window, bucket, data version) -> stable until the bucket rolls over or new data lands
+bucket = time_bucket(selected_time_range)
+data_version = current_data_version()
+
+
+# Delta-refreshed per window: new data versions only fetch newly inserted rows (see dashboard/delta_frames.py)
+ARTICLE_COLUMNS = """
+    title,
+    coalesce(summary, '') AS summary,
+    timezone('UTC', published_at) AS published_at,
+    provider,
+    coalesce(source_country, 'Unknown') AS source_country,
+    coalesce(source_domain, '') AS source_domain,
+    from_json(topics, '["VARCHAR"]') AS topics,
+    coalesce(url, '') AS url
+"""
+
+
+def load_articles(window_name: str, bucket: str | None, data_version: int):
+    """Articles of the window; topics arrive as lists and published_at in UTC."""
+    return load_delta_frame(
+        "financial_focus.articles", window_name, window_cutoff(window_name, bucket), data_version,
+        columns_sql=ARTICLE_COLUMNS, where_sql="topics IS NOT NULL",
     )
-    articles_df["summary"] = articles_df["summary"].fillna("")
-    articles_df["source_country"] = articles_df["source_country"].fillna("Unknown")
-    articles_df["source_domain"] = articles_df["source_domain"].fillna("")
-    articles_df["url"] = articles_df["url"].fillna("")
-    return articles_df
 
 
-articles = load_articles(cutoff_iso)
+@st.cache_resource
+def get_finance_index() -> BM25Index:
+    """One retrieval index per process; it only ever grows by articles it hasn't seen."""
+    return BM25Index()
+
+
+@st.cache_resource
+def get_answer_cache() -> AnswerCache:
+    """Answers persist across reruns and restarts; repeated questions skip the model."""
+    return AnswerCache()
+
+
+@st.cache_resource
+def get_qa_client():
+    """Gemini when GEMINI_API_KEY is set; QA_MODEL_CLIENT=local uses an offline stand-in."""
+    return make_client()
+
+
+# Loading the window's articles and creating the model client (which imports the Gemini
+# SDK on first use) don't depend on each other, so they run at the same time
+articles, qa_client = run_concurrently(
+    lambda: load_articles(selected_time_range, bucket, data_version),
+    get_qa_client,
+)
 # Split by provider for clarity
 er_articles = articles[articles["provider"].str.lower() == "eventregistry"].copy()
 gdelt_articles = articles[articles["provider"].str.lower() == "gdelt"].copy()
 
-# Configure Gemini if key present
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-
 # Shared financial-related topics
 focus_topics = {"business", "economy"}
 
@@ -132,33 +132,25 @@ er_financial = er_articles[er_articles["topics"].apply(lambda ts: any(t in focus
 er_financial = er_financial.sort_values("published_at", ascending=False)
 
 if ask_clicked:
-    if not GEMINI_API_KEY:
+    if qa_client is None:
         st.info("Add GEMINI_API_KEY to your .env to enable the financial Q&A assistant.")
     elif er_financial.empty:
         st.info("No recent financial EventRegistry articles available for Q&A.")
     elif not question:
         st.info("Enter a question or click a preset to ask about the financial articles.")
     else:
-        # Use a larger slice of financial articles while keeping prompt size reasonable
-        context_rows = er_financial.head(100)
-        context_snippets = [
-            f"Title: {r['title']}\nSummary: {r.get('summary','')[:500]}\nPublished: {r.get('published_at')}"
-            for _, r in context_rows.iterrows()
-        ]
-        prompt = textwrap.dedent(f"""
-        You are analyzing recent financial news. Use only the provided articles.
-        Answer the user's question briefly and factually.
-        Question: {question}
-        Articles:
-        {"---".join(context_snippets)}
-        """)
-        try:
-            model = genai.GenerativeModel("gemini-2.5-flash-lite")
-            resp = model.generate_content(prompt)
-            answer = resp.text if hasattr(resp, "text") else "No answer returned."
-        except Exception as e:
-            answer = f"Request failed: {e}"
-        st.markdown(f"**Answer:** {answer}")
+        # Rank financial articles by relevance to the question and send only what fits the budget
+        candidates = er_financial[["article_id", "title", "summary", "published_at"]].to_dict("records")
+        finance_index = get_finance_index()
+        finance_index.add_many((a["article_id"], index_text(a)) for a in candidates)
+
+        prompt, used_ids = prepare_question(question, finance_index, candidates)
+
+        # Streams into the page as the model answers; cached answers appear at once
+        st.markdown("**Answer:**")
+        st.write_stream(stream_answer(question, prompt, used_ids, qa_client, cache=get_answer_cache()))
+        if used_ids:
+            st.caption(f"Based on the {len(used_ids)} most relevant of {len(candidates)} financial articles.")
 
 
 
@@ -179,10 +171,10 @@ else:
     end = start + page_size
     page_rows = er_fin.iloc[start:end]
 
-    for _, row in page_rows.iterrows():
+    for row in page_rows.to_dict("records"):
         published_str = ""
         if pd.notna(row["published_at"]):
-            published_str = pd.to_datetime(row["published_at"]).strftime("%Y-%m-%d %H:%M")
+            published_str = row["published_at"].strftime("%Y-%m-%d %H:%M")
         display_source = row.get("source_domain") or row.get("source_country")
         topics = row.get("topics") or []
         topic_label = topics[0] if topics else ""
@@ -1,19 +1,20 @@
 import os
 import sys
-import duckdb
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 import streamlit as st
-from datetime import datetime, timezone, timedelta
 
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 if ROOT_DIR not in sys.path:
     sys.path.append(ROOT_DIR)
 
 from dashboard.styles import apply_theme, render_nav, apply_hover_style
+from dashboard.time_windows import DEFAULT_WINDOW, TIME_FILTER_OPTIONS, time_bucket, window_cutoff
+from dashboard.data_access import current_data_version, load_view
+from dashboard.parallel import run_concurrently
+from dashboard.approximate import exact_counts_toggle, format_count, sampling_caption, window_sampling
 
-DB_FILE = os.path.join(ROOT_DIR, "world_news.duckdb")
 LOGO_FILE = os.path.join(ROOT_DIR, "assets", "logo.png")
 
 st.set_page_config(page_title="Global Coverage", layout="wide")
@@ -28,84 +29,37 @@ st.markdown("A global snapshot of where news is produced — " \
 if os.path.exists(LOGO_FILE):
     st.sidebar.image(LOGO_FILE, use_container_width=True)
 
-TIME_FILTER_OPTIONS = {
-    "Last 24 hours": timedelta(hours=24),
-    "Last 7 days": timedelta(days=7),
-    "Last 30 days": timedelta(days=30),
-    "All time": None,
-}
-
 selected_time_range = st.sidebar.radio(
     "Published time",
     list(TIME_FILTER_OPTIONS.keys()),
-    index=list(TIME_FILTER_OPTIONS.keys()).index("All time"),
+    index=list(TIME_FILTER_OPTIONS.keys()).index(DEFAULT_WINDOW),
 )
-time_window = TIME_FILTER_OPTIONS[selected_time_range]
-cutoff = datetime.now(timezone.utc) - time_window if time_window else None
-cutoff_iso = cutoff.isoformat() if cutoff else None
-
-@st.cache_data(ttl=600)
-def load_country_counts(cutoff_iso: str | None):
-    """Load GDELT article counts per source country."""
-    con = duckdb.connect(DB_FILE, read_only=True)
-    query = """
-        SELECT source_country, published_at
-        FROM articles
-        WHERE source_country IS NOT NULL
-          AND lower(provider) = 'gdelt'
-    """
-    params = []
-    if cutoff_iso:
-        query += " AND published_at >= ?"
-        params.append(cutoff_iso)
-    country_df = con.execute(query, params).df()
-    con.close()
-    country_df["published_at"] = pd.to_datetime(country_df["published_at"], utc=True, errors="coerce")
-    counts = country_df.groupby("source_country").size().reset_index(name="article_count")
-    return counts[counts["source_country"].notna()]
-
-
-@st.cache_data(ttl=600)
-def load_domain_counts(cutoff_iso: str | None):
-    """Load article counts per (country, domain) across all providers."""
-    con = duckdb.connect(DB_FILE, read_only=True)
-    query = """
-        SELECT source_country, source_domain, published_at
-        FROM articles
-        WHERE source_country IS NOT NULL
-          AND source_domain IS NOT NULL
-    """
-    params = []
-    if cutoff_iso:
-        query += " AND published_at >= ?"
-        params.append(cutoff_iso)
-    domain_df = con.execute(query, params).df()
-    con.close()
-    domain_df["published_at"] = pd.to_datetime(domain_df["published_at"], utc=True, errors="coerce")
-    return (
-        domain_df.groupby(["source_country", "source_domain"])
-        .size()
-        .reset_index(name="article_count")
-    )
+# Cache key: (window, bucket, data version) -> stable until the bucket rolls over or new data lands
+bucket = time_bucket(selected_time_range)
+data_version = current_data_version()
+# Large windows are aggregated over a sample unless exact counts are asked for
+exact = exact_counts_toggle()
+sample_pct = window_sampling(window_cutoff(selected_time_range, bucket), data_version, exact)
 
-country_counts = load_country_counts(cutoff_iso)
-domain_counts = load_domain_counts(cutoff_iso)
+@st.cache_data(max_entries=16)
+def load_country_counts(window_name: str, bucket: str | None, data_version: int, sample_pct: float | None):
+    """GDELT article counts per source country with share and coverage tier (precomputed after ingest, else aggregated in DuckDB)."""
+    return load_view("global_coverage.countries", window_name, bucket, data_version, sample_pct)
 
-total_articles = country_counts["article_count"].sum()
-country_counts["share"] = (country_counts["article_count"] / total_articles * 100).round(1)
 
-# Label coverage tiers by volume (low/mid/high based on quantiles)
-low_cut = country_counts["article_count"].quantile(0.33)
-high_cut = country_counts["article_count"].quantile(0.66)
+@st.cache_data(max_entries=16)
+def load_domain_concentration(window_name: str, bucket: str | None, data_version: int, sample_pct: float | None):
+    """Top 10 domains of every country with top-3 share and HHI (precomputed after ingest, else aggregated in DuckDB)."""
+    return load_view("global_coverage.domains", window_name, bucket, data_version, sample_pct)
 
-def coverage_label(count: float) -> str:
-    if count >= high_cut:
-        return "High coverage"
-    if count <= low_cut:
-        return "Low coverage"
-    return "Medium coverage"
 
-country_counts["coverage_label"] = country_counts["article_count"].apply(coverage_label)
+# Both aggregates run at the same time, each on its own cursor
+country_counts, domain_counts = run_concurrently(
+    lambda: load_country_counts(selected_time_range, bucket, data_version, sample_pct),
+    lambda: load_domain_concentration(selected_time_range, bucket, data_version, sample_pct),
+)
+if sampling_caption(sample_pct):
+    st.caption(sampling_caption(sample_pct))
 
 # Match the Financial Focus globe palette
 colorscale = [
@@ -118,13 +72,14 @@ col1, col2 = st.columns([1, 2], gap="large")
 with col1:
     st.subheader("Coverage Imbalance by Country (GDELT)")
     country_cards = []
-    for _, row in country_counts.sort_values("article_count", ascending=False).head(10).iterrows():
+    for _, row in country_counts.head(10).iterrows():
+        articles = format_count(row["article_count"], row.get("margin"))
         country_name = row["source_country"] if pd.notna(row["source_country"]) else "Unknown"
         country_cards.append(
             f"<div class='topic-card compact-card'>"
             f"<div class='topic'>{country_name}</div>"
             f"<div class='count'>{row['share']:.1f}%</div>"
-            f"<div style='color:#94a3b8; font-size:0.95rem; font-weight:700;'>Articles: {int(row['article_count']):,}</div>"
+            f"<div style='color:#94a3b8; font-size:0.95rem; font-weight:700;'>Articles: {articles}</div>"
             f"</div>"
         )
 
@@ -191,25 +146,11 @@ selected_country = st.selectbox(
 )
 
 if selected_country:
-    country_domains = domain_counts[domain_counts["source_country"] == selected_country]
-    top_domains = country_domains.sort_values("article_count", ascending=False).head(10)
+    top_domains = domain_counts[domain_counts["source_country"] == selected_country]
     if not top_domains.empty:
-        total = country_domains["article_count"].sum()
-        top3_share = (
-            country_domains.sort_values("article_count", ascending=False)
-            .head(3)["article_count"]
-            .sum()
-        )
-        top3_pct = (top3_share / total * 100).round(1) if total else 0
-        if top3_pct >= 60:
-            concentration_level = "High concentration"
-        elif top3_pct >= 35:
-            concentration_level = "Moderate concentration"
-        else:
-            concentration_level = "Low concentration"
-        top_domains = top_domains.assign(
-            share=lambda d: (d["article_count"] / total * 100).round(1)
-        )
+        top3_pct = top_domains["top3_pct"].iloc[0]
+        hhi = int(top_domains["hhi"].iloc[0])
+        concentration_level = top_domains["concentration_level"].iloc[0]
 
         st.markdown(
             f"""
@@ -219,6 +160,7 @@ if selected_country:
                     of all articles in <b>{selected_country}</b><br>
                     come from the <b>top 3 domains</b><br>
                     <span style="color:#38bdf8; font-weight:700;">{concentration_level}</span>
+                    <span style="color:#94a3b8;"> · HHI {hhi:,}</span>
                 </div>
             </div>
             """,
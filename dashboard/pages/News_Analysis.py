@@ -1,16 +1,11 @@
 import os
 import sys
-import json
 import pandas as pd
-import duckdb
 import plotly.express as px
 import streamlit as st
-from datetime import datetime, timezone, timedelta
 import html
-import numpy as np
-from collections import Counter
 
-from transforms.transform_utils import FRAME_GROUPS, cluster_articles_by_title, count_frames
+from transforms.transform_utils import get_taxonomy
 
 # Ensure project root is available in Python import path
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
@@ -18,9 +13,13 @@ if ROOT_DIR not in sys.path:
     sys.path.append(ROOT_DIR)
 
 from dashboard.styles import apply_theme, render_nav, apply_hover_style
+from dashboard.time_windows import DEFAULT_WINDOW, TIME_FILTER_OPTIONS, time_bucket, window_cutoff
+from dashboard.data_access import current_data_version, load_view
+from dashboard.delta_frames import load_delta_frame
+from dashboard.parallel import run_concurrently
+from dashboard.approximate import exact_counts_toggle, format_count, sampling_caption, window_sampling
 
 # File paths
-DB_FILE = os.path.join(ROOT_DIR, "world_news.duckdb")
 LOGO_FILE = os.path.join(ROOT_DIR, "assets", "logo.png")
 
 st.set_page_config(page_title="Text Analysis", layout="wide")
@@ -37,102 +36,95 @@ st.markdown("This page breaks down what the news is actually about: " \
 if os.path.exists(LOGO_FILE):
     st.sidebar.image(LOGO_FILE, use_container_width=True)
 
-TIME_FILTER_OPTIONS = {
-    "Last 24 hours": timedelta(hours=24),
-    "Last 7 days": timedelta(days=7),
-    "Last 30 days": timedelta(days=30),
-    "All time": None,
-}
-
 selected_time_range = st.sidebar.radio(
     "Published time",
     list(TIME_FILTER_OPTIONS.keys()),
-    index=list(TIME_FILTER_OPTIONS.keys()).index("All time"),
+    index=list(TIME_FILTER_OPTIONS.keys()).index(DEFAULT_WINDOW),
 )
-time_window = TIME_FILTER_OPTIONS[selected_time_range]
-cutoff = datetime.now(timezone.utc) - time_window if time_window else None
-cutoff_iso = cutoff.isoformat() if cutoff else None
-
-
-# Load articles from DuckDB and preprocess fields.
-# Cached for 10 minutes to avoid unnecessary DB reads.
-@st.cache_data(ttl=600)
-def load_articles(cutoff_iso: str | None):
-    con = duckdb.connect(DB_FILE, read_only=True)
-    # Execute SQL query to fetch relevant columns
-    query = """
-        SELECT
-            title,
-            summary,
-            body,
-            published_at,
-            source_country,
-            topics,
-            provider
-        FROM articles
-        WHERE topics IS NOT NULL
-    """
-    params = []
-    if cutoff_iso:
-        query += " AND published_at >= ?"
-        params.append(cutoff_iso)
-    df = con.execute(query, params).df()
-    con.close()
-    # parse topics
-    def parse_topics(x):
-        try:
-            return json.loads(x) if x else []
-        except Exception:
-            return []
-    df["topics"] = df["topics"].apply(parse_topics)
-    df["published_at"] = pd.to_datetime(df["published_at"], utc=True, errors="coerce")
-    df["summary"] = df["summary"].fillna("")
-    df["body"] = df["body"].fillna("")
-    return df
-
-df = load_articles(cutoff_iso)
-# Restrict analysis to EventRegistry only
-df = df[df["provider"].str.lower() == "eventregistry"]
-
-# Cache framing aggregation to avoid recomputing on every rerun.
-@st.cache_data(ttl=600)
-def compute_framing_totals(frame_df: pd.DataFrame) -> pd.DataFrame:
-    framing_df = frame_df.copy()
-    framing_df["body"] = framing_df["body"].fillna("")
-    # If body is empty, fall back to summary text
-    framing_df["body"] = np.where(
-        framing_df["body"].str.len() == 0,
-        framing_df["summary"],
-        framing_df["body"],
+# Cache key: (window, bucket, data version) -> stable until the bucket rolls over or new data lands
+bucket = time_bucket(selected_time_range)
+data_version = current_data_version()
+# Large windows are aggregated over a sample unless exact counts are asked for
+exact = exact_counts_toggle()
+sample_pct = window_sampling(window_cutoff(selected_time_range, bucket), data_version, exact)
+
+
+# Articles of the window, delta-refreshed: a new data version only fetches rows inserted
+# since the last load, and rows that leave the window are dropped (dashboard/delta_frames.py).
+ARTICLE_COLUMNS = """
+    title,
+    timezone('UTC', published_at) AS published_at,
+    coalesce(source_country, 'Unknown') AS source_country,
+    from_json(topics, '["VARCHAR"]') AS topics,
+    provider
+"""
+
+
+def load_articles(window_name: str, bucket: str | None, data_version: int):
+    # topics arrive as lists and published_at in UTC, so no pandas cleanup passes are needed
+    return load_delta_frame(
+        "news_analysis.articles", window_name, window_cutoff(window_name, bucket), data_version,
+        columns_sql=ARTICLE_COLUMNS, where_sql="topics IS NOT NULL",
     )
-    frame_counts = framing_df["body"].apply(count_frames)
-    frame_totals = pd.DataFrame(list(frame_counts)).fillna(0)
-    frame_totals["published_at"] = framing_df["published_at"].values
 
-    # Aggregate weekly for totals
-    frame_totals["week"] = frame_totals["published_at"].dt.to_period("W").apply(lambda r: r.start_time)
-    weekly = frame_totals.groupby("week")[list(FRAME_GROUPS.keys())].sum().reset_index()
 
-    total_counts = weekly[list(FRAME_GROUPS.keys())].sum().reset_index()
-    total_counts.columns = ["frame", "count"]
+@st.cache_data(max_entries=16)
+def load_topic_counts(window_name: str, bucket: str | None, data_version: int, sample_pct: float | None) -> pd.DataFrame:
+    """
+    Articles per topic: precomputed after ingest, else counted in DuckDB for a sampled
+    (large) window and from the delta-refreshed article frame otherwise.
+    """
+    compute = None
+    if sample_pct is None:
+        compute = lambda: count_topics(load_articles(window_name, bucket, data_version))
+    return load_view("news_analysis.topic_counts", window_name, bucket, data_version, sample_pct, compute=compute)
+
+
+def count_topics(df: pd.DataFrame) -> pd.DataFrame:
+    # Restrict analysis to EventRegistry only
+    df = df[df["provider"].str.lower() == "eventregistry"]
+
+    # explode topics. Convert list of topics into one row per topic
+    exploded = df.explode("topics").dropna(subset=["topics"]).copy()
+    exploded["topics"] = exploded["topics"].astype(str)
+
+    return (
+        exploded[exploded["topics"].str.lower() != "unknown"]
+        .groupby("topics")
+        .size()
+        .reset_index(name="article_count")
+        .rename(columns={"topics": "topic"})
+        .sort_values("article_count", ascending=False)
+    )
+
+# Framing totals are aggregated in DuckDB from the frames stored at ingestion.
+# The cache key is just (window, bucket, data version), so reruns don't hash any article text.
+@st.cache_data(max_entries=16)
+def compute_framing_totals(window_name: str, bucket: str | None, data_version: int, sample_pct: float | None = None) -> pd.DataFrame:
+    totals = load_view("news_analysis.frame_totals", window_name, bucket, data_version, sample_pct).set_index("frame")
+    # every frame of the current taxonomy gets a bar, even with zero hits
+    frame_names = list(get_taxonomy().frame_groups)
+    total_counts = totals.reindex(frame_names, fill_value=0).astype(int).rename_axis("frame").reset_index()
     return total_counts
 
-# explode topics. Convert list of topics into one row per topic
-exploded = df.explode("topics").dropna(subset=["topics"]).copy()
-exploded["topics"] = exploded["topics"].astype(str)
-exploded["source_country"] = exploded["source_country"].fillna("Unknown")
+# Story clusters are assigned during ingestion (see ingestion/story_clusters.py);
+# here we only count how many of their EventRegistry members fall in the time window.
+@st.cache_data(max_entries=16)
+def load_story_clusters(window_name: str, bucket: str | None, data_version: int) -> pd.DataFrame:
+    return load_view("news_analysis.story_clusters", window_name, bucket, data_version)
+
+# The page's loaders are independent, so they run at the same time (each on its own cursor)
+topic_counts, total_counts, top_clusters = run_concurrently(
+    lambda: load_topic_counts(selected_time_range, bucket, data_version, sample_pct),
+    lambda: compute_framing_totals(selected_time_range, bucket, data_version, sample_pct),
+    lambda: load_story_clusters(selected_time_range, bucket, data_version),
+)
 
 # Most written topics header (for clarity on bottom chart)
 st.subheader("Most Written Topics (EventRegistry only)")
+if sampling_caption(sample_pct):
+    st.caption(sampling_caption(sample_pct))
 
-topic_counts = (
-    exploded[exploded["topics"].str.lower() != "unknown"]
-    .groupby("topics")
-    .size()
-    .reset_index(name="article_count")
-    .rename(columns={"topics": "topic"})
-    .sort_values("article_count", ascending=False)
-)
 fig_topic_total = px.bar(
     topic_counts,
     x="article_count",
@@ -177,7 +169,6 @@ st.markdown(
     "certain perspectives such as conflict, security, sanctions, or humanitarian impact. "
     "The analysis reflects attention allocation rather than sentiment or intent."
 )
-total_counts = compute_framing_totals(df)
 bar_fig = px.bar(
     total_counts.sort_values("count", ascending=False),
     x="frame",
@@ -206,7 +197,7 @@ if total_sum > 0:
         frame_cards.append(
             f"<div class='compact-card'><div class='topic'>{row['frame']}</div>"
             f"<div class='count'>{pct:.1f}%</div>"
-            f"<div style='color:#94a3b8; font-size:1rem; font-weight:700;'>Hits: {int(row['count']):,}</div></div>"
+            f"<div style='color:#94a3b8; font-size:1rem; font-weight:700;'>Hits: {format_count(row['count'], row.get('margin'))}</div></div>"
         )
     st.markdown(
         f"<div class='topic-cards'>{''.join(frame_cards)}</div>",
@@ -214,10 +205,7 @@ if total_sum > 0:
     )
 
 # Move repeated narratives to bottom
-clusters = cluster_articles_by_title(df, limit=350, threshold=0.35)
-clusters_sorted = sorted(clusters, key=lambda c: len(c), reverse=True)
-
-if clusters_sorted:
+if not top_clusters.empty:
     st.subheader("Repeated Narratives Across Articles")
     st.markdown(
         "Articles are clustered when their headlines share at least 35% of keywords. "
@@ -228,19 +216,10 @@ if clusters_sorted:
         "- **Examples**: sample headlines so you can quickly see the shared narrative."
     )
 
-    def _mode_topic(rows):
-        bag = Counter()
-        for r in rows:
-            # getatts = give me r.topics if it exists
-            for t in getattr(r, "topics", []) or []:
-                bag[t] += 1
-        return bag.most_common(1)[0][0] if bag else ""
-
-    top_clusters = clusters_sorted[:6]
     table = pd.DataFrame({
-        "cluster_size": [len(c) for c in top_clusters],
-        "topic_hint": [_mode_topic(c) for c in top_clusters],
-        "examples": [" | ".join([m.title for m in c[:3]]) for c in top_clusters],
+        "cluster_size": top_clusters["cluster_size"],
+        "topic_hint": top_clusters["topic_hint"].fillna(""),
+        "examples": [" | ".join(titles) for titles in top_clusters["examples"]],
     })
 
     st.dataframe(table, use_container_width=True)
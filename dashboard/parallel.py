@@ -0,0 +1,32 @@
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, List
+
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+# Runs a page's independent loaders at the same time, so a cold page waits for its slowest
+# query instead of the sum of them. Loaders keep their st.cache_data wrappers (hits return
+# at once) and each query takes its own cursor from the shared read pool; DuckDB releases
+# the GIL while it executes, so the queries really overlap.
+
+MAX_WORKERS = 4
+
+
+def run_concurrently(*tasks: Callable[[], Any], max_workers: int = MAX_WORKERS) -> List[Any]:
+    """
+    Call each task (a zero-argument callable) on a thread pool and return their results in
+    order. The first failing task's exception is raised once all of them have finished.
+    """
+    if len(tasks) <= 1:
+        return [task() for task in tasks]
+    # workers inherit the script run context, so st.cache_data behaves as on the main thread
+    ctx = get_script_run_ctx()
+    initializer = partial(add_script_run_ctx, None, ctx) if ctx is not None else None
+    with ThreadPoolExecutor(
+        max_workers=min(max_workers, len(tasks)),
+        thread_name_prefix="page-loader",
+        initializer=initializer,
+    ) as pool:
+        futures = [pool.submit(task) for task in tasks]
+    return [future.result() for future in futures]
@@ -0,0 +1,419 @@
+from __future__ import annotations
+from dataclasses import dataclass, replace
+from typing import Iterable, List, Optional, Tuple
+
+# SQL builders for dashboard queries. No Streamlit here, so they can be tested
+# (and reused by ingestion jobs) without a running app.
+
+# Shaped for the page in SQL: text used for display is never NULL, published_at is
+# timezone-aware (UTC) and topics arrive as a list, so pandas needs no cleanup passes.
+ARTICLE_COLUMNS = """
+    article_id,
+    title,
+    coalesce(summary, '') AS summary,
+    coalesce(url, '') AS url,
+    coalesce(image_url, '') AS image_url,
+    timezone('UTC', published_at) AS published_at,
+    provider,
+    coalesce(source_name, '') AS source_name,
+    coalesce(source_domain, '') AS source_domain,
+    coalesce(source_country, '') AS source_country,
+    language,
+    from_json(topics, '["VARCHAR"]') AS topics
+"""
+
+
+# Approximate mode for large windows: aggregates run over a Bernoulli sample of the
+# window's articles (about SAMPLE_ROWS of them) and counts are scaled back up, each with
+# a 95% error bound in an extra `margin` column. Pages switch to it above
+# APPROX_ROW_THRESHOLD articles unless exact counts are asked for (dashboard/approximate.py).
+# Builders take `sample_pct`; None (the default) is the exact query.
+APPROX_ROW_THRESHOLD = 2_000_000
+SAMPLE_ROWS = 200_000
+SAMPLE_SEED = 42
+Z_95 = 1.96
+
+
+def sample_percent(
+    window_rows: int,
+    exact: bool = False,
+    threshold: int = APPROX_ROW_THRESHOLD,
+    sample_rows: int = SAMPLE_ROWS,
+) -> Optional[float]:
+    """Sampling rate (%) for a window of `window_rows` articles; None means query exactly."""
+    if exact or window_rows <= threshold:
+        return None
+    return round(sample_rows * 100.0 / window_rows, 4)
+
+
+def _sample_clause(sample_pct: Optional[float]) -> str:
+    if sample_pct is None:
+        return ""
+    return f"TABLESAMPLE {float(sample_pct)}% (bernoulli, {SAMPLE_SEED})"
+
+
+def _estimate(total: str, square_total: str, sample_pct: Optional[float]) -> Tuple[str, str]:
+    """
+    SQL for (estimate, 95% margin) of a sum over the sampled rows. With every row kept at
+    rate q, sum/q is unbiased and its standard error is sqrt((1 - q) * sum of squares) / q.
+    """
+    if sample_pct is None:
+        return total, "0"
+    q = sample_pct / 100
+    return (
+        f"round({total} / {q})::BIGINT",
+        f"round({Z_95} * sqrt({square_total} * {1 - q}) / {q})::BIGINT",
+    )
+
+
+def _normalize_values(values: Optional[Iterable[str]]) -> Tuple[str, ...]:
+    return tuple(sorted({v for v in values or () if v}))
+
+
+@dataclass(frozen=True)
+class ArticleFilters:
+    """Sidebar selections in a canonical form, so equal selections share one cache entry."""
+    cutoff_iso: Optional[str] = None
+    search: str = ""
+    topics: Tuple[str, ...] = ()
+    countries: Tuple[str, ...] = ()
+    languages: Tuple[str, ...] = ()
+    providers: Tuple[str, ...] = ()
+
+    @classmethod
+    def normalized(
+        cls,
+        cutoff_iso: Optional[str] = None,
+        search: Optional[str] = None,
+        topics: Optional[Iterable[str]] = None,
+        countries: Optional[Iterable[str]] = None,
+        languages: Optional[Iterable[str]] = None,
+        providers: Optional[Iterable[str]] = None,
+    ) -> "ArticleFilters":
+        return cls(
+            cutoff_iso=cutoff_iso,
+            search=(search or "").strip().lower(),
+            topics=_normalize_values(topics),
+            countries=_normalize_values(countries),
+            languages=_normalize_values(languages),
+            providers=_normalize_values(providers),
+        )
+
+    def narrows_articles(self) -> bool:
+        """True when anything besides the time window restricts the articles."""
+        return bool(self.search or self.topics or self.countries or self.languages or self.providers)
+
+
+# sidebar facet dimension -> (ArticleFilters field, SQL expression for its values)
+FACET_DIMENSIONS = {
+    "topic": ("topics", """unnest(list_distinct(from_json(topics, '["VARCHAR"]')))"""),
+    "country": ("countries", "source_country"),
+    "language": ("languages", "language"),
+    "provider": ("providers", "provider"),
+}
+
+
+def _where(filters: ArticleFilters) -> Tuple[str, List]:
+    clauses, params = [], []
+    if filters.cutoff_iso:
+        clauses.append("published_at >= ?")
+        params.append(filters.cutoff_iso)
+    if filters.search:
+        clauses.append("contains(lower(title), ?)")
+        params.append(filters.search)
+    if filters.topics:
+        clauses.append("""list_has_any(from_json(topics, '["VARCHAR"]'), ?::VARCHAR[])""")
+        params.append(list(filters.topics))
+    if filters.countries:
+        clauses.append("list_contains(?::VARCHAR[], source_country)")
+        params.append(list(filters.countries))
+    if filters.languages:
+        clauses.append("list_contains(?::VARCHAR[], language)")
+        params.append(list(filters.languages))
+    if filters.providers:
+        clauses.append("list_contains(?::VARCHAR[], provider)")
+        params.append(list(filters.providers))
+    sql = ("WHERE " + "\n          AND ".join(clauses)) if clauses else ""
+    return sql, params
+
+
+def build_article_query(
+    filters: ArticleFilters, limit: int, after: Optional[Tuple[str, str]] = None
+) -> Tuple[str, List]:
+    """
+    One page of matching articles, newest first. Keyset pagination: `after` is the
+    (published_at, article_id) of the last article on the previous page, so each page
+    costs the same no matter how deep the reader scrolls.
+    """
+    where, params = _where(filters)
+    if after is not None:
+        keyset = "(published_at < ? OR (published_at = ? AND article_id < ?))"
+        where = f"{where}\n          AND {keyset}" if where else f"WHERE {keyset}"
+        params += [after[0], after[0], after[1]]
+    sql = f"""
+        SELECT {ARTICLE_COLUMNS}
+        FROM articles
+        {where}
+        ORDER BY published_at DESC NULLS LAST, article_id DESC
+        LIMIT ?
+    """
+    return sql, params + [limit]
+
+
+def build_article_count_query(filters: ArticleFilters, sample_pct: Optional[float] = None) -> Tuple[str, List]:
+    """
+    Number of articles matching the filters (estimate and margin when sampled). Only filtered
+    counts are sampled: a sample still scans every row, while a plain count(*) doesn't.
+    """
+    where, params = _where(filters)
+    if sample_pct is None or not filters.narrows_articles():
+        return f"SELECT count(*) FROM articles {where}", params
+    estimate, margin = _estimate("count(*)", "count(*)", sample_pct)
+    return f"SELECT {estimate} AS article_count, {margin} AS margin FROM articles {_sample_clause(sample_pct)} {where}", params
+
+
+def build_window_size_query(cutoff_iso: Optional[str] = None) -> Tuple[str, List]:
+    """
+    Articles in a time window, read from facet_counts (every article has one provider), so
+    deciding between exact and approximate mode never scans articles. Hour-rounded like facets.
+    """
+    sql, params = build_facet_table_query(cutoff_iso)
+    return f"SELECT coalesce(sum(article_count), 0)::BIGINT FROM ({sql}) WHERE dimension = 'provider'", params
+
+
+def build_window_size_fallback_query(cutoff_iso: Optional[str] = None) -> Tuple[str, List]:
+    """Same as build_window_size_query, counted over articles (before facet_counts exists)."""
+    return build_article_count_query(ArticleFilters(cutoff_iso=cutoff_iso))
+
+
+def facet_filters(filters: ArticleFilters, dimension: str) -> ArticleFilters:
+    """Filters that apply to a facet's counts: all active filters except the facet's own."""
+    field, _ = FACET_DIMENSIONS[dimension]
+    return replace(filters, **{field: ()})
+
+
+def build_facet_table_query(cutoff_iso: Optional[str] = None) -> Tuple[str, List]:
+    """
+    (dimension, value, article_count) for every facet from the precomputed facet_counts table.
+    Counts are per published hour, so a window cutoff is rounded down to the hour.
+    """
+    params: List = []
+    where = ""
+    if cutoff_iso:
+        where = "WHERE bucket_hour >= date_trunc('hour', ?::TIMESTAMP)"
+        params.append(cutoff_iso)
+    sql = f"""
+        SELECT dimension, value, sum(article_count)::BIGINT AS article_count
+        FROM facet_counts
+        {where}
+        GROUP BY dimension, value
+        ORDER BY dimension, value
+    """
+    return sql, params
+
+
+def build_facet_query(filters: ArticleFilters, dimension: str) -> Tuple[str, List]:
+    """(value, article_count) for one facet, counted over articles matching the other filters."""
+    _, expression = FACET_DIMENSIONS[dimension]
+    where, params = _where(facet_filters(filters, dimension))
+    sql = f"""
+        SELECT value, count(*) AS article_count
+        FROM (SELECT {expression} AS value FROM articles {where})
+        WHERE value IS NOT NULL
+        GROUP BY value
+        ORDER BY value
+    """
+    return sql, params
+
+
+def build_country_coverage_query(
+    cutoff_iso: Optional[str] = None, sample_pct: Optional[float] = None
+) -> Tuple[str, List]:
+    """
+    GDELT article counts per source country with share (%) and a coverage tier.
+    Tiers split at the 33rd/66th percentile of the per-country counts (approx_quantile when sampled).
+    """
+    params: List = []
+    window = ""
+    if cutoff_iso:
+        window = "AND published_at >= ?"
+        params.append(cutoff_iso)
+    estimate, margin = _estimate("count(*)", "count(*)", sample_pct)
+    quantile = "quantile_cont" if sample_pct is None else "approx_quantile"
+    margin_column = "" if sample_pct is None else ",\n            margin"
+    sql = f"""
+        WITH counts AS (
+            SELECT source_country, {estimate} AS article_count, {margin} AS margin
+            FROM articles {_sample_clause(sample_pct)}
+            WHERE source_country IS NOT NULL
+              AND lower(provider) = 'gdelt'
+              {window}
+            GROUP BY source_country
+        ),
+        cuts AS (
+            SELECT
+                {quantile}(article_count, 0.33) AS low_cut,
+                {quantile}(article_count, 0.66) AS high_cut,
+                sum(article_count) AS total
+            FROM counts
+        )
+        SELECT
+            source_country,
+            article_count,
+            round(article_count * 100.0 / total, 1) AS share,
+            CASE
+                WHEN article_count >= high_cut THEN 'High coverage'
+                WHEN article_count <= low_cut THEN 'Low coverage'
+                ELSE 'Medium coverage'
+            END AS coverage_label{margin_column}
+        FROM counts, cuts
+        ORDER BY article_count DESC, source_country
+    """
+    return sql, params
+
+
+def build_domain_concentration_query(
+    cutoff_iso: Optional[str] = None, top_n: int = 10, sample_pct: Optional[float] = None
+) -> Tuple[str, List]:
+    """
+    Top-N publishing domains of every country (all providers), each row carrying the
+    country's concentration metrics: top-3 share (%) and HHI (sum of squared % shares, 0-10,000).
+    When sampled, shares and HHI come from the sample and only domains seen in it are ranked.
+    """
+    params: List = []
+    window = ""
+    if cutoff_iso:
+        window = "AND published_at >= ?"
+        params.append(cutoff_iso)
+    estimate, margin = _estimate("count(*)", "count(*)", sample_pct)
+    margin_column = "" if sample_pct is None else ",\n            r.margin"
+    sql = f"""
+        WITH counts AS (
+            SELECT source_country, source_domain, {estimate} AS article_count, {margin} AS margin
+            FROM articles {_sample_clause(sample_pct)}
+            WHERE source_country IS NOT NULL
+              AND source_domain IS NOT NULL
+              {window}
+            GROUP BY source_country, source_domain
+        ),
+        ranked AS (
+            SELECT
+                *,
+                sum(article_count) OVER (PARTITION BY source_country) AS country_total,
+                row_number() OVER (
+                    PARTITION BY source_country ORDER BY article_count DESC, source_domain
+                ) AS domain_rank
+            FROM counts
+        ),
+        metrics AS (
+            SELECT
+                source_country,
+                round(sum(article_count) FILTER (WHERE domain_rank <= 3) * 100.0 / any_value(country_total), 1) AS top3_pct,
+                round(sum(power(article_count * 100.0 / country_total, 2)), 0) AS hhi
+            FROM ranked
+            GROUP BY source_country
+        )
+        SELECT
+            r.source_country,
+            r.source_domain,
+            r.article_count,
+            r.domain_rank,
+            round(r.article_count * 100.0 / r.country_total, 1) AS share,
+            m.top3_pct,
+            m.hhi,
+            CASE
+                WHEN m.top3_pct >= 60 THEN 'High concentration'
+                WHEN m.top3_pct >= 35 THEN 'Moderate concentration'
+                ELSE 'Low concentration'
+            END AS concentration_level{margin_column}
+        FROM ranked r
+        JOIN metrics m USING (source_country)
+        WHERE r.domain_rank <= ?
+        ORDER BY r.source_country, r.domain_rank
+    """
+    return sql, params + [top_n]
+
+
+def build_frame_totals_query(cutoff_iso: Optional[str] = None, sample_pct: Optional[float] = None) -> Tuple[str, List]:
+    """
+    Number of EventRegistry articles hitting each framing group. Uses the frames stored at
+    ingestion and falls back to the count_frames UDF (body, else summary) for rows without them.
+    """
+    params: List = []
+    window = ""
+    if cutoff_iso:
+        window = "AND published_at >= ?"
+        params.append(cutoff_iso)
+    total, margin = _estimate("sum(hit.value)", "sum(hit.value * hit.value)", sample_pct)
+    margin_column = "" if sample_pct is None else f", {margin} AS margin"
+    sql = f"""
+        WITH hits AS (
+            SELECT unnest(map_entries(coalesce(
+                frames::JSON::MAP(VARCHAR, INTEGER),
+                count_frames(coalesce(nullif(body, ''), summary))
+            ))) AS hit
+            FROM articles {_sample_clause(sample_pct)}
+            WHERE topics IS NOT NULL
+              AND published_at IS NOT NULL
+              AND lower(provider) = 'eventregistry'
+              {window}
+        )
+        SELECT hit.key AS frame, ({total})::BIGINT AS count{margin_column}
+        FROM hits
+        GROUP BY frame
+    """
+    return sql, params
+
+
+def build_topic_counts_query(cutoff_iso: Optional[str] = None, sample_pct: Optional[float] = None) -> Tuple[str, List]:
+    """(topic, article_count[, margin]) over EventRegistry articles, most written first; for sampled windows."""
+    params: List = []
+    window = ""
+    if cutoff_iso:
+        window = "AND published_at >= ?"
+        params.append(cutoff_iso)
+    estimate, margin = _estimate("count(*)", "count(*)", sample_pct)
+    margin_column = "" if sample_pct is None else f", {margin} AS margin"
+    sql = f"""
+        SELECT topic, {estimate} AS article_count{margin_column}
+        FROM (
+            SELECT unnest(list_distinct(from_json(topics, '["VARCHAR"]'))) AS topic
+            FROM articles {_sample_clause(sample_pct)}
+            WHERE topics IS NOT NULL
+              AND lower(provider) = 'eventregistry'
+              {window}
+        )
+        WHERE topic IS NOT NULL AND lower(topic) != 'unknown'
+        GROUP BY topic
+        ORDER BY article_count DESC, topic
+    """
+    return sql, params
+
+
+def build_story_clusters_query(cutoff_iso: Optional[str] = None, limit: int = 6) -> Tuple[str, List]:
+    """
+    Largest story clusters by EventRegistry members in the window, with a topic hint and
+    up to three of the newest member titles. Clusters are assigned during ingestion.
+    """
+    params: List = []
+    window = ""
+    if cutoff_iso:
+        window = "AND a.published_at >= ?"
+        params.append(cutoff_iso)
+    sql = f"""
+        SELECT
+            c.cluster_id,
+            count(*) AS cluster_size,
+            any_value(c.topic_hint) AS topic_hint,
+            any_value(c.representative_title) AS representative_title,
+            list(a.title ORDER BY a.published_at DESC)[1:3] AS examples
+        FROM articles a
+        JOIN story_clusters c ON a.cluster_id = c.cluster_id
+        WHERE lower(a.provider) = 'eventregistry'
+          {window}
+        GROUP BY c.cluster_id
+        HAVING count(*) > 1
+        ORDER BY cluster_size DESC, c.cluster_id
+        LIMIT ?
+    """
+    return sql, params + [limit]
@@ -0,0 +1,152 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Sequence
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from ingestion.db import ROOT_DIR
+
+# Query results on disk, shared by every dashboard process on the host (replicas, restarts)
+# and by the post-ingest warm-up. Each result is an Arrow IPC file; a small SQLite index
+# (WAL mode, so several processes can read and write it, which a DuckDB file can't) tracks
+# size and last use for LRU eviction beyond `max_bytes`, plus shared hit/miss counters.
+# Keys are (query fingerprint, parameters, data version), so an ingest never serves stale rows.
+#
+#   result_cache/index.sqlite
+#   result_cache/<key[:2]>/<key>.arrow
+
+RESULT_CACHE_DIR = os.getenv("RESULT_CACHE_DIR", os.path.join(ROOT_DIR, "result_cache"))
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_MB", "512")) * 1024 * 1024
+
+
+def query_fingerprint(sql: str) -> str:
+    """Hash of the SQL text; whitespace differences don't matter."""
+    return hashlib.sha256(re.sub(r"\s+", " ", sql).strip().encode("utf-8")).hexdigest()
+
+
+def result_key(sql: str, params: Optional[Sequence[Any]], data_version: int) -> str:
+    raw = json.dumps([query_fingerprint(sql), list(params or []), data_version], default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, root: str = RESULT_CACHE_DIR, max_bytes: int = RESULT_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self._con = sqlite3.connect(
+            os.path.join(root, "index.sqlite"), timeout=30, check_same_thread=False, isolation_level=None
+        )
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                data_version INTEGER,
+                bytes INTEGER,
+                created_at REAL,
+                last_used REAL
+            )
+        """)
+        self._con.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER)")
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.arrow")
+
+    def _count(self, name: str):
+        self._con.execute("""
+            INSERT INTO counters VALUES (?, 1)
+            ON CONFLICT (name) DO UPDATE SET value = value + 1
+        """, [name])
+
+    def get(self, key: str) -> Optional[pa.Table]:
+        """Cached result, or None on a miss. A hit counts as a use (LRU)."""
+        with self._lock:
+            known = self._con.execute("SELECT 1 FROM results WHERE key = ?", [key]).fetchone()
+            table = None
+            if known:
+                try:
+                    with pa.OSFile(self._path(key)) as source:
+                        table = ipc.open_file(source).read_all()
+                except (FileNotFoundError, OSError, pa.ArrowInvalid):
+                    # evicted (or cut short) by another process in between
+                    self._con.execute("DELETE FROM results WHERE key = ?", [key])
+            if table is None:
+                self._count("misses")
+                return None
+            self._con.execute("UPDATE results SET last_used = ? WHERE key = ?", [time.time(), key])
+            self._count("hits")
+            return table
+
+    def put(self, key: str, table: pa.Table, data_version: int = 0):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # readers never see a half-written file
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with pa.OSFile(tmp, "wb") as sink, ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        try:
+            os.replace(tmp, path)
+        except PermissionError:
+            # Windows: another process is reading the same result right now; it is cached already
+            os.remove(tmp)
+            return
+        now = time.time()
+        with self._lock:
+            self._con.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                [key, data_version, os.path.getsize(path), now, now],
+            )
+            self._evict_locked()
+
+    def _remove_locked(self, keys: Sequence[str]):
+        for key in keys:
+            self._con.execute("DELETE FROM results WHERE key = ?", [key])
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def _evict_locked(self):
+        total = self._con.execute("SELECT coalesce(sum(bytes), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evict = []
+        for key, size in self._con.execute("SELECT key, bytes FROM results ORDER BY last_used"):
+            if total <= self.max_bytes:
+                break
+            evict.append(key)
+            total -= size
+        self._remove_locked(evict)
+
+    def prune(self, keep_version: int) -> int:
+        """Drop results of data versions older than `keep_version`; they can't be hit again."""
+        with self._lock:
+            keys = [r[0] for r in self._con.execute("SELECT key FROM results WHERE data_version < ?", [keep_version])]
+            self._remove_locked(keys)
+            return len(keys)
+
+    def stats(self) -> Dict[str, float]:
+        """Hits and misses of all processes, number of results and their size (MB)."""
+        with self._lock:
+            counters = dict(self._con.execute("SELECT name, value FROM counters").fetchall())
+            entries, size = self._con.execute("SELECT count(*), coalesce(sum(bytes), 0) FROM results").fetchone()
+        hits, misses = counters.get("hits", 0), counters.get("misses", 0)
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+            "entries": entries,
+            "megabytes": round(size / 1e6, 2),
+        }
+
+    def close(self):
+        with self._lock:
+            self._con.close()
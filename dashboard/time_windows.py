@@ -0,0 +1,42 @@
+from __future__ import annotations
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+# Time filters shared by all pages. Cutoffs are aligned to buckets so that cache keys
+# stay the same for a while ("Last 24 hours" moves in 15-minute steps) instead of
+# changing on every rerun.
+
+TIME_FILTER_OPTIONS: Dict[str, Optional[timedelta]] = {
+    "Last 24 hours": timedelta(hours=24),
+    "Last 7 days": timedelta(days=7),
+    "Last 30 days": timedelta(days=30),
+    "All time": None,
+}
+
+BUCKET_SIZES: Dict[str, timedelta] = {
+    "Last 24 hours": timedelta(minutes=15),
+    "Last 7 days": timedelta(hours=1),
+    "Last 30 days": timedelta(hours=6),
+}
+
+DEFAULT_WINDOW = "All time"
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def time_bucket(window_name: str, now: Optional[datetime] = None) -> Optional[str]:
+    """Start of the current bucket for a window (ISO, naive UTC); None for "All time"."""
+    size = BUCKET_SIZES.get(window_name)
+    if TIME_FILTER_OPTIONS[window_name] is None or size is None:
+        return None
+    now = now or datetime.now(timezone.utc)
+    start = _EPOCH + ((now - _EPOCH) // size) * size
+    return start.replace(tzinfo=None).isoformat()
+
+
+def window_cutoff(window_name: str, bucket: Optional[str]) -> Optional[str]:
+    """Lower bound on published_at (ISO, naive UTC) for a window and bucket."""
+    window = TIME_FILTER_OPTIONS[window_name]
+    if window is None or bucket is None:
+        return None
+    return (datetime.fromisoformat(bucket) - window).isoformat()
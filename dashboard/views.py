@@ -0,0 +1,55 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import duckdb
+
+from dashboard.time_windows import window_cutoff
+from dashboard.queries import (
+    build_country_coverage_query,
+    build_domain_concentration_query,
+    build_frame_totals_query,
+    build_story_clusters_query,
+    build_topic_counts_query,
+    build_window_size_fallback_query,
+    build_window_size_query,
+    sample_percent,
+)
+
+# The standard views behind the pages: one aggregate query per (view, time window). No
+# Streamlit here, so ingestion can compute them right after an ingest (ingestion/warm_up.py)
+# and store them in the shared result cache (dashboard/result_cache.py), where the page
+# loaders find them under the same (query, parameters, data version) key.
+
+# view name -> (cutoff_iso, sample_pct) -> (sql, params)
+VIEW_QUERIES: Dict[str, Callable[[Optional[str], Optional[float]], Tuple[str, List]]] = {
+    "global_coverage.countries": lambda cutoff, pct: build_country_coverage_query(cutoff, sample_pct=pct),
+    "global_coverage.domains": lambda cutoff, pct: build_domain_concentration_query(cutoff, top_n=10, sample_pct=pct),
+    "news_analysis.frame_totals": lambda cutoff, pct: build_frame_totals_query(cutoff, sample_pct=pct),
+    "news_analysis.topic_counts": lambda cutoff, pct: build_topic_counts_query(cutoff, sample_pct=pct),
+    "news_analysis.story_clusters": lambda cutoff, pct: build_story_clusters_query(cutoff),
+}
+
+FetchValue = Callable[[str, Sequence[Any]], Any]
+
+
+def window_rows(fetch_value: FetchValue, cutoff_iso: Optional[str]) -> int:
+    """Articles in a window: from facet_counts, or counted over articles before it exists."""
+    try:
+        rows = fetch_value(*build_window_size_query(cutoff_iso))
+    except duckdb.CatalogException:
+        rows = None
+    if not rows:
+        rows = fetch_value(*build_window_size_fallback_query(cutoff_iso))
+    return rows or 0
+
+
+def window_sample_percent(fetch_value: FetchValue, cutoff_iso: Optional[str]) -> Optional[float]:
+    """Sampling rate pages use for the window by default (exact counts off)."""
+    return sample_percent(window_rows(fetch_value, cutoff_iso))
+
+
+def view_query(
+    view: str, window_name: str, bucket: Optional[str], sample_pct: Optional[float] = None
+) -> Tuple[str, List]:
+    """(sql, params) of a view for a window and time bucket."""
+    return VIEW_QUERIES[view](window_cutoff(window_name, bucket), sample_pct)
@@ -0,0 +1,147 @@
+from __future__ import annotations
+import os
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+
+import duckdb
+
+from transforms.duckdb_udfs import register_udfs
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DB_PATH = os.getenv("NEWS_DB_PATH", os.path.join(ROOT_DIR, "world_news.duckdb"))
+
+# A DuckDB file is locked per process: while the dashboard holds it open, ingestion can't write.
+# Writers wait this long for readers to let go; pooled readers let go after POOL_IDLE_SECONDS.
+LOCK_RETRY_SECONDS = 60.0
+POOL_IDLE_SECONDS = 10.0
+
+
+def connect(
+    path: str | None = None, read_only: bool = False, lock_timeout: float = LOCK_RETRY_SECONDS
+) -> duckdb.DuckDBPyConnection:
+    """Open the news database with the transform UDFs registered (use this instead of duckdb.connect)."""
+    deadline = time.monotonic() + lock_timeout
+    while True:
+        try:
+            con = duckdb.connect(path or DB_PATH, read_only=read_only)
+            break
+        except duckdb.IOException as exc:
+            if "lock" not in str(exc).lower() or time.monotonic() >= deadline:
+                raise
+            time.sleep(0.5)
+    return register_udfs(con)
+
+
+class ReadConnectionPool:
+    """
+    Process-wide pool of read-only cursors on one shared connection.
+    The connection is reopened when the database file changes (a new snapshot after an
+    ingest) and closed after POOL_IDLE_SECONDS without use, so writers can get the lock.
+    One thread opens it while the others wait for that result, not for the pool lock.
+    """
+
+    def __init__(self, path: str | None = None, max_idle: int = 8, idle_seconds: float = POOL_IDLE_SECONDS):
+        self.path = path or DB_PATH
+        self.max_idle = max_idle
+        self.idle_seconds = idle_seconds
+        self._lock = threading.Lock()
+        self._con: Optional[duckdb.DuckDBPyConnection] = None
+        self._snapshot: Optional[Tuple] = None
+        self._opening: Optional[Future] = None  # set while one thread opens the connection
+        self._generation = 0
+        self._idle: List[duckdb.DuckDBPyConnection] = []
+        self._in_use = 0
+        self._last_used = time.monotonic()
+        self._reaper: Optional[threading.Thread] = None
+
+    def snapshot_id(self) -> Tuple:
+        """Identifies the on-disk state (database file + write-ahead log)."""
+        parts = []
+        for p in (self.path, self.path + ".wal"):
+            try:
+                st = os.stat(p)
+                parts.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                parts.append(None)
+        return tuple(parts)
+
+    def _close_locked(self):
+        for cur in self._idle:
+            cur.close()
+        self._idle.clear()
+        if self._con is not None:
+            self._con.close()
+        self._con = None
+        self._snapshot = None
+        self._generation += 1
+
+    def close(self):
+        with self._lock:
+            self._close_locked()
+
+    def _reap(self):
+        while True:
+            time.sleep(self.idle_seconds / 2)
+            with self._lock:
+                if self._con is None:
+                    self._reaper = None
+                    return
+                if self._in_use == 0 and time.monotonic() - self._last_used >= self.idle_seconds:
+                    self._close_locked()
+                    self._reaper = None
+                    return
+
+    def _open(self) -> duckdb.DuckDBPyConnection:
+        con = connect(self.path, read_only=True)
+        # TIMESTAMPTZ results reach pandas in UTC (GLOBAL: cursors don't inherit session settings)
+        con.execute("SET GLOBAL TimeZone = 'UTC'")
+        return con
+
+    def _checkout(self) -> Tuple[duckdb.DuckDBPyConnection, int]:
+        while True:
+            with self._lock:
+                snapshot = self.snapshot_id()
+                if self._con is not None and snapshot != self._snapshot and self._in_use == 0:
+                    self._close_locked()
+                if self._con is not None:
+                    cur = self._idle.pop() if self._idle else self._con.cursor()
+                    self._in_use += 1
+                    return cur, self._generation
+                opening, owner = self._opening, self._opening is None
+                if owner:
+                    opening = self._opening = Future()
+            if not owner:
+                opening.result()  # the opener's error, instead of every thread retrying on its own
+                continue
+            # opening may wait up to LOCK_RETRY_SECONDS for an ingest's write lock; one thread
+            # does it outside the pool lock, so cursors in use can still be handed back
+            try:
+                con = self._open()
+            except BaseException as exc:
+                with self._lock:
+                    self._opening = None
+                opening.set_exception(exc)
+                raise
+            with self._lock:
+                self._con, self._snapshot, self._opening = con, snapshot, None
+                if self._reaper is None:
+                    self._reaper = threading.Thread(target=self._reap, name="duckdb-pool-reaper", daemon=True)
+                    self._reaper.start()
+            opening.set_result(None)
+
+    @contextmanager
+    def cursor(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        cur, generation = self._checkout()
+        try:
+            yield cur
+        finally:
+            with self._lock:
+                self._in_use -= 1
+                self._last_used = time.monotonic()
+                if generation == self._generation and len(self._idle) < self.max_idle:
+                    self._idle.append(cur)
+                else:
+                    cur.close()
@@ -1,12 +1,25 @@
 from __future__ import annotations
+import itertools
+import logging
+import math
 import os
-from datetime import datetime, timezone
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
 
 from eventregistry import EventRegistry, QueryArticlesIter, QueryItems
 from ingestion.article_types import NormalizedArticle
+from ingestion.rate_limit import QuotaExhausted, RateLimiter, get_rate_limiter
 from transforms.transform_utils import categorize_text
 
+# Without the archive EventRegistry only searches the last 30 days
+ARCHIVE_AFTER_DAYS = 30
+# The API rejects more than 5 simultaneous requests per key
+MAX_PARALLEL_QUERIES = 5
+
+logger = logging.getLogger(__name__)
+
 def _parse_er_dt(dt_str: str) -> datetime:
     # ER usually returns "YYYY-MM-DD" or iso strings
     try:
@@ -15,6 +28,17 @@ def _parse_er_dt(dt_str: str) -> datetime:
         return datetime.now(timezone.utc)
 
 
+@lru_cache(maxsize=4)
+def _client(api_key: str, use_archive: bool) -> EventRegistry:
+    """One client per key and archive setting, reused across calls along with its HTTP session."""
+    return EventRegistry(apiKey=api_key, allowUseOfArchive=use_archive)
+
+
+@lru_cache(maxsize=64)
+def _category_uri(api_key: str, category: str) -> Optional[str]:
+    return _client(api_key, False).getCategoryUri(category)
+
+
 def _extract_topics(art: dict, fallback_keywords: List[str]) -> List[str]:
     """Pick topics from ER article; avoid broad keyword fallbacks."""
     cats = art.get("categories") or art.get("categoriesEng") or []
@@ -31,17 +55,29 @@ def fetch_eventregistry_articles(
     category: Optional[str] = None,     # e.g. "Business"
     lang: Optional[str] = None,         # e.g. "eng", "deu" (ER uses 3-letter)
     max_items: int = 100,
+    date_start: Optional[date] = None,  # inclusive article dates (UTC), e.g. one day for a backfill
+    date_end: Optional[date] = None,
+    limiter: Optional[RateLimiter] = None,  # shared rate limit and daily quota, process-wide by default
 ) -> List[NormalizedArticle]:
     api_key = os.getenv("EVENTREGISTRY_API_KEY")
     if not api_key:
         raise RuntimeError("Missing EVENTREGISTRY_API_KEY env var")
 
-    er = EventRegistry(apiKey=api_key, allowUseOfArchive=False)
+    if max_items <= 0:
+        return []
+    # every page of up to 100 articles is one request against the plan; raises QuotaExhausted
+    # when the daily quota is used up
+    max_items = (limiter or get_rate_limiter()).reserve("eventregistry", max_items)
+
+    use_archive = date_start is not None and date_start < datetime.now(timezone.utc).date() - timedelta(days=ARCHIVE_AFTER_DAYS)
+    er = _client(api_key, use_archive)
 
     q = QueryArticlesIter(
         keywords=QueryItems.OR(keywords) if len(keywords) > 1 else keywords[0],
-        categoryUri=er.getCategoryUri(category) if category else None,
-        lang=lang
+        categoryUri=_category_uri(api_key, category) if category else None,
+        lang=lang,
+        dateStart=date_start,
+        dateEnd=date_end,
     )
 
     out: List[NormalizedArticle] = []
@@ -80,3 +116,72 @@ def fetch_eventregistry_articles(
             )
         )
     return out
+
+
+def fetch_eventregistry_matrix(
+    keywords: Sequence[str],
+    categories: Sequence[Optional[str]] = (None,),
+    langs: Sequence[Optional[str]] = (None,),
+    max_items_per_query: int = 100,
+    date_start: Optional[date] = None,
+    date_end: Optional[date] = None,
+    limiter: Optional[RateLimiter] = None,
+    max_workers: int = MAX_PARALLEL_QUERIES,
+) -> List[NormalizedArticle]:
+    """
+    Query matrix: one sub-query per (keyword, category, language), each capped at
+    `max_items_per_query`, so a busy topic can't crowd out the others as in a single OR query.
+    Sub-queries run in parallel under the shared rate limiter; articles found by several of
+    them are kept once (by Event Registry uri), in sub-query order.
+
+    A matrix that today's quota can't pay for isn't started. If the quota still runs out
+    partway (another process spent it), the articles already fetched are not lost: they come
+    with the QuotaExhausted error. A sub-query failing otherwise is logged and left out,
+    unless all of them fail.
+    """
+    limiter = limiter or get_rate_limiter()
+    queries = list(itertools.product(keywords, categories, langs))
+    if not queries or max_items_per_query <= 0:
+        return []
+    needed = len(queries) * math.ceil(max_items_per_query / limiter.limits["eventregistry"].items_per_request)
+    remaining = limiter.remaining("eventregistry")
+    if remaining < needed:
+        raise QuotaExhausted(f"The eventregistry query matrix needs {needed} requests, {remaining} are left today")
+
+    def run(query) -> List[NormalizedArticle]:
+        keyword, category, lang = query
+        return fetch_eventregistry_articles(
+            [keyword], category=category, lang=lang, max_items=max_items_per_query,
+            date_start=date_start, date_end=date_end, limiter=limiter,
+        )
+
+    results: Dict[int, List[NormalizedArticle]] = {}
+    quota_error = None
+    errors = []
+    with ThreadPoolExecutor(
+        max_workers=min(max_workers, len(queries)), thread_name_prefix="er-query"
+    ) as pool:
+        futures = {pool.submit(run, query): i for i, query in enumerate(queries)}
+        for future in as_completed(futures):
+            try:
+                results[futures[future]] = future.result()
+            except QuotaExhausted as exc:
+                quota_error = quota_error or exc
+            except Exception as exc:
+                logger.warning("Event Registry sub-query %s failed", queries[futures[future]], exc_info=True)
+                errors.append(exc)
+
+    if errors and not results and quota_error is None:
+        raise errors[0]
+    out: List[NormalizedArticle] = []
+    seen = set()
+    for i in sorted(results):
+        for article in results[i]:
+            key = article.provider_id or article.url
+            if key in seen:
+                continue
+            seen.add(key)
+            out.append(article)
+    if quota_error is not None:
+        raise QuotaExhausted(str(quota_error), articles=out) from quota_error
+    return out
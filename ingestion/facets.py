@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Sequence
+
+import duckdb
+import pandas as pd
+
+# Sidebar facets (distinct filter values with article counts) are served from the small
+# facet_counts table instead of scanning articles. Ingestion adds the counts of newly
+# inserted articles; rebuild_facet_counts() recomputes everything (after a reprocess) and
+# refresh_facet_counts() one time range (a day's rollup in the Dagster assets).
+
+
+def _facet_rows_sql(source: str) -> str:
+    """(dimension, value, bucket_hour, article_count) for the articles in `source` (a FROM clause)."""
+    return f"""
+        SELECT dimension, value, bucket_hour, count(*) AS article_count
+        FROM (
+            WITH src AS (
+                SELECT
+                    topics, source_country, language, provider,
+                    coalesce(date_trunc('hour', published_at), TIMESTAMP '1970-01-01') AS bucket_hour
+                FROM {source}
+            )
+            SELECT 'topic' AS dimension, unnest(list_distinct(from_json(topics, '["VARCHAR"]'))) AS value, bucket_hour FROM src
+            UNION ALL SELECT 'country', source_country, bucket_hour FROM src
+            UNION ALL SELECT 'language', language, bucket_hour FROM src
+            UNION ALL SELECT 'provider', provider, bucket_hour FROM src
+        )
+        WHERE value IS NOT NULL
+        GROUP BY dimension, value, bucket_hour
+    """
+
+
+def add_facet_counts(con: duckdb.DuckDBPyConnection, article_ids: Sequence[str]) -> int:
+    """Add the given (newly inserted) articles to facet_counts. Returns the number of articles counted."""
+    if not len(article_ids):
+        return 0
+    con.register("new_article_ids", pd.DataFrame({"article_id": list(article_ids)}))
+    con.execute(f"""
+        INSERT INTO facet_counts (dimension, value, bucket_hour, article_count)
+        {_facet_rows_sql("articles JOIN new_article_ids USING (article_id)")}
+        ON CONFLICT (dimension, value, bucket_hour)
+        DO UPDATE SET article_count = facet_counts.article_count + excluded.article_count
+    """)
+    con.unregister("new_article_ids")
+    return len(article_ids)
+
+
+def rebuild_facet_counts(con: duckdb.DuckDBPyConnection):
+    """Recompute facet_counts from all articles (topics/language may have changed)."""
+    con.execute("BEGIN TRANSACTION")
+    con.execute("DELETE FROM facet_counts")
+    con.execute(f"""
+        INSERT INTO facet_counts (dimension, value, bucket_hour, article_count)
+        {_facet_rows_sql("articles")}
+    """)
+    con.execute("COMMIT")
+
+
+def refresh_facet_counts(con: duckdb.DuckDBPyConnection, start: datetime, end: datetime) -> int:
+    """
+    Recompute the facet_counts buckets in [start, end) (naive UTC) from the articles published
+    then. Idempotent, unlike add_facet_counts. Returns the number of facet rows written.
+    """
+    con.execute("BEGIN TRANSACTION")
+    con.execute("DELETE FROM facet_counts WHERE bucket_hour >= ? AND bucket_hour < ?", [start, end])
+    written = con.execute(f"""
+        INSERT INTO facet_counts (dimension, value, bucket_hour, article_count)
+        {_facet_rows_sql("articles WHERE published_at >= ? AND published_at < ?")}
+    """, [start, end]).fetchone()[0]
+    con.execute("COMMIT")
+    return written
+
+
+def ensure_facet_counts(con: duckdb.DuckDBPyConnection):
+    """Build facet_counts once for databases created before it existed."""
+    empty = con.execute("SELECT count(*) = 0 FROM facet_counts").fetchone()[0]
+    if empty and con.execute("SELECT count(*) > 0 FROM articles").fetchone()[0]:
+        rebuild_facet_counts(con)
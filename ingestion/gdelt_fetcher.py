@@ -4,8 +4,24 @@ from typing import List, Optional
 import requests
 
 from ingestion.article_types import NormalizedArticle
+from ingestion.rate_limit import RateLimiter, get_rate_limiter
 
 GDELT_DOC_API = "https://api.gdeltproject.org/api/v2/doc/doc"
+GDELT_DATETIME_FORMAT = "%Y%m%d%H%M%S"
+# GDELT throttles with a 429 or a plain-text notice instead of JSON; back off and retry
+GDELT_RETRIES = 3
+GDELT_BACKOFF_SECONDS = 10.0
+
+
+def _throttled(r: requests.Response) -> bool:
+    return r.status_code == 429 or "limit requests" in r.text[:300].lower()
+
+
+def _backoff_seconds(r: requests.Response, attempt: int) -> float:
+    try:
+        return float(r.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return GDELT_BACKOFF_SECONDS * 2 ** attempt
 
 def _parse_dt(dt_str: str) -> datetime:
     # GDELT typically returns ISO-ish strings; keep it robust:
@@ -21,12 +37,19 @@ def fetch_gdelt_articles(
     maxrecords: int = 200,  
     sourcelang: Optional[str] = None,
     source_country: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limiter: Optional[RateLimiter] = None,
 ) -> List[NormalizedArticle]:
     
     """
     query: free-text or advanced operators; you can add filters using operators inside query.
     Example: '(economy OR inflation) sourcelang:spanish'
+    start/end: fixed UTC date range (e.g. one day for a backfill) instead of the rolling `timespan`.
+    limiter: shared rate limit and daily quota (ingestion/rate_limit.py); the process-wide one by default.
+    Raises QuotaExhausted when the daily quota is used up; maxrecords=0 returns [] without a request.
     """
+    limiter = limiter or get_rate_limiter()
     q = query.strip()
     if sourcelang:
         q += f" sourcelang:{sourcelang}"
@@ -43,9 +66,23 @@ def fetch_gdelt_articles(
         "sort": "datedesc",
         "maxrecords": maxrecords,
     }
+    if start is not None or end is not None:
+        params.pop("timespan")
+        if start is not None:
+            params["startdatetime"] = start.astimezone(timezone.utc).strftime(GDELT_DATETIME_FORMAT)
+        if end is not None:
+            params["enddatetime"] = end.astimezone(timezone.utc).strftime(GDELT_DATETIME_FORMAT)
 
-
-    r = requests.get(GDELT_DOC_API, params=params, timeout=30)
+    if maxrecords <= 0:
+        return []
+    for attempt in range(GDELT_RETRIES + 1):
+        # raises QuotaExhausted when today's budget is used up
+        maxrecords = limiter.reserve("gdelt", maxrecords)
+        params["maxrecords"] = maxrecords
+        r = requests.get(GDELT_DOC_API, params=params, timeout=30)
+        if not _throttled(r) or attempt == GDELT_RETRIES:
+            break
+        limiter.penalize("gdelt", _backoff_seconds(r, attempt))
 
     # GDELT sometimes returns HTML or empty responses with 200 OK
     try:
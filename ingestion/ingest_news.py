@@ -3,7 +3,11 @@ from __future__ import annotations
 import duckdb
 import hashlib
 import json
-from typing import List
+import math
+import os
+from dataclasses import replace
+from datetime import date
+from typing import List, Optional
 import pandas as pd
 
 from dotenv import load_dotenv
@@ -11,15 +15,39 @@ load_dotenv()
 
 # -------- ingestion (external data) --------
 from ingestion.gdelt_fetcher import fetch_gdelt_articles
-from ingestion.eventregistry_fetcher import fetch_eventregistry_articles
+from ingestion.eventregistry_fetcher import fetch_eventregistry_articles, fetch_eventregistry_matrix
 
 # -------- processing (your logic) ----------
-from transforms.transform_utils import normalize_topics, normalize_language
+from transforms.parallel import transform_records
 # -------- storage --------------------------
 from .schema import DDL
+from ingestion.db import DB_PATH, connect
 from ingestion.article_types import NormalizedArticle
+from ingestion.story_clusters import assign_story_clusters
+from ingestion.facets import add_facet_counts, ensure_facet_counts
+from ingestion.pacing import PROVIDER_PACES, ProviderPace
+from ingestion.rate_limit import QuotaExhausted
 
-DB_PATH = "world_news.duckdb"
+# What each run asks the providers for (shared with the Dagster assets)
+GDELT_QUERY = "(economy OR business OR finance OR technology OR politics OR sports OR health)"
+GDELT_MAX_RECORDS = 250  # reduce faster testing
+ER_KEYWORDS = ["economy", "technology", "politics", "sports", "health"]
+ER_MAX_ITEMS = 250
+
+
+def _env_list(name: str) -> List[Optional[str]]:
+    """Comma-separated env values; [None] (no filter) when unset."""
+    return [v.strip() for v in os.getenv(name, "").split(",") if v.strip()] or [None]
+
+
+# Event Registry query matrix: one sub-query per keyword x category x language instead of a
+# single OR query, each capped separately so busy topics don't crowd out the rest. The run's
+# max_items is split over the sub-queries, but every sub-query spends at least one request,
+# so micro-batch pacing stretches the interval by the matrix size (eventregistry_pace()).
+ER_QUERY_MATRIX = os.getenv("EVENTREGISTRY_QUERY_MATRIX", "0") == "1"
+ER_MATRIX_CATEGORIES = _env_list("EVENTREGISTRY_MATRIX_CATEGORIES")  # e.g. "Business,Sports"
+ER_MATRIX_LANGS = _env_list("EVENTREGISTRY_MATRIX_LANGS")  # e.g. "eng,deu"
+ER_ITEMS_PER_QUERY = int(os.getenv("EVENTREGISTRY_ITEMS_PER_QUERY", "100"))
 
 
 # -------------------------------------------------
@@ -35,22 +63,29 @@ def ensure_schema(con: duckdb.DuckDBPyConnection):
     """Create tables if they don’t exist"""
     con.execute(DDL)
 
-# -------------------------------------------------
-# Storage
-# -------------------------------------------------
 
-def upsert_articles(
-    con: duckdb.DuckDBPyConnection,
-    articles: List[NormalizedArticle]
-) -> int:
+def bump_data_version(con: duckdb.DuckDBPyConnection, rewrite: bool = False) -> int:
     """
-    Normalize topics, translate (if needed), and store articles.
-    Deduplication is handled via article_id primary key.
+    Mark the data as changed so dashboard caches keyed on the version are refreshed.
+    Pass rewrite=True when existing articles were modified, not only new ones inserted.
     """
-    if not articles:
-        return 0
+    return con.execute("""
+        INSERT INTO data_version (id, version, rewrite_version, updated_at)
+        VALUES (1, 1, CASE WHEN ? THEN 1 ELSE 0 END, NOW())
+        ON CONFLICT (id) DO UPDATE SET
+            version = data_version.version + 1,
+            rewrite_version = coalesce(data_version.rewrite_version, 0) + CASE WHEN ? THEN 1 ELSE 0 END,
+            updated_at = NOW()
+        RETURNING version
+    """, [rewrite, rewrite]).fetchone()[0]
 
-    rows = []
+# -------------------------------------------------
+# Storage
+# -------------------------------------------------
+
+def prepare_rows(articles: List[NormalizedArticle]) -> List[dict]:
+    """One row per article, keyed by article_id (hash of the normalized URL); first one wins."""
+    rows = {}
 
     for a in articles:
         # Normalize URL a bit to avoid dupes on trailing spaces or slashes
@@ -59,13 +94,9 @@ def upsert_articles(
             normalized_url = normalized_url[:-1]
 
         article_id = article_id_from_url(normalized_url)
-
-        # ---- normalize topics (skip for gdelt to keep original themes) ----
-        provider_lower = (a.provider or "").lower()
-        text_blob = f"{a.title or ''} {a.summary or ''}"
-        topics = a.topics if provider_lower == "gdelt" else normalize_topics(a.topics, text_blob=text_blob)
-
-        rows.append({
+        if article_id in rows:
+            continue
+        rows[article_id] = {
             "article_id": article_id,
             "provider": a.provider,
             "provider_id": a.provider_id,
@@ -78,59 +109,157 @@ def upsert_articles(
             "source_name": a.source_name,
             "source_domain": a.source_domain,
             "source_country": a.source_country,
-            "language": normalize_language(a.language),
-            "topics": json.dumps(topics)
-        })
-
-    df_rows = pd.DataFrame(rows).drop_duplicates(subset=["article_id"])
-    con.register("rows", df_rows)
-
-    con.execute("""
+            "language": a.language,
+            "topics": a.topics,
+        }
+
+    return list(rows.values())
+
+
+def enrich_rows(rows: List[dict]) -> List[dict]:
+    """Normalize topics (gdelt keeps original themes) and language, derive frames, in bulk."""
+    return [
+        {
+            **row,
+            "topics": json.dumps(derived["topics"]),
+            "language": derived["language"],
+            "frames": json.dumps(derived["frames"]),
+            "taxonomy_version": derived["taxonomy_version"],
+        }
+        for row, derived in zip(rows, transform_records(rows))
+    ]
+
+
+def store_rows(con: duckdb.DuckDBPyConnection, rows: List[dict]) -> List[str]:
+    """Insert enriched rows; existing article_ids are skipped. Returns the inserted ids."""
+    if not rows:
+        return []
+    con.register("rows", pd.DataFrame(rows))
+
+    inserted_ids = con.execute("""
         INSERT INTO articles (
             article_id, provider, provider_id, url, title, summary, body, image_url, published_at,
-            source_name, source_domain, source_country, language, topics
+            source_name, source_domain, source_country, language, topics, frames, taxonomy_version
         )
         SELECT
             article_id, provider, provider_id, url, title, summary, body, image_url, published_at,
-            source_name, source_domain, source_country, language, topics
+            source_name, source_domain, source_country, language, topics, frames, taxonomy_version
         FROM rows
         ON CONFLICT(article_id) DO NOTHING
-    """)
+        RETURNING article_id
+    """).fetchall()
+    con.unregister("rows")
+
+    # only articles that were actually inserted are added to the sidebar facet counts
+    new_ids = [r[0] for r in inserted_ids]
+    add_facet_counts(con, new_ids)
+    return new_ids
+
+
+def upsert_articles(
+    con: duckdb.DuckDBPyConnection,
+    articles: List[NormalizedArticle]
+) -> int:
+    """
+    Normalize topics, translate (if needed), and store articles.
+    Deduplication is handled via article_id primary key.
+    """
+    if not articles:
+        return 0
+
+    store_rows(con, enrich_rows(prepare_rows(articles)))
 
-    return len(rows)
+    return len(articles)
 
 
 # -------------------------------------------------
 # Main ingestion pipeline
 # -------------------------------------------------
 
+def _er_matrix_size() -> int:
+    return len(ER_KEYWORDS) * len(ER_MATRIX_CATEGORIES) * len(ER_MATRIX_LANGS)
+
+
+def _er_items_per_query(max_items: int) -> int:
+    """The run's max_items split over the sub-queries, at most ER_ITEMS_PER_QUERY each."""
+    return max(min(ER_ITEMS_PER_QUERY, math.ceil(max_items / _er_matrix_size())), 1)
+
+
+def eventregistry_requests_per_run(max_items: int) -> int:
+    """Requests a fetch_eventregistry_batch(max_items) spends (every page of a query is one)."""
+    per_request = PROVIDER_PACES["eventregistry"].items_per_request
+    if ER_QUERY_MATRIX:
+        return _er_matrix_size() * math.ceil(_er_items_per_query(max_items) / per_request)
+    return math.ceil(max_items / per_request)
+
+
+def eventregistry_pace() -> ProviderPace:
+    """Event Registry pacing for micro-batches, with the requests such a run really spends."""
+    pace = PROVIDER_PACES["eventregistry"]
+    return replace(pace, requests_per_run=eventregistry_requests_per_run(pace.items_per_request))
+
+
+def fetch_eventregistry_batch(
+    max_items: int = ER_MAX_ITEMS,
+    date_start: Optional[date] = None,
+    date_end: Optional[date] = None,
+) -> List[NormalizedArticle]:
+    """
+    Event Registry articles for ER_KEYWORDS: one OR query of up to `max_items`, or in
+    query-matrix mode `max_items` split over the sub-queries.
+    """
+    if ER_QUERY_MATRIX:
+        return fetch_eventregistry_matrix(
+            ER_KEYWORDS, ER_MATRIX_CATEGORIES, ER_MATRIX_LANGS,
+            max_items_per_query=_er_items_per_query(max_items),
+            date_start=date_start, date_end=date_end,
+        )
+    return fetch_eventregistry_articles(
+        keywords=ER_KEYWORDS, max_items=max_items, date_start=date_start, date_end=date_end
+    )
+
+
 def ingest() -> int:
     """
     Orchestrates ingestion from all sources.
     """
-    con = duckdb.connect(DB_PATH)
+    con = connect(DB_PATH)
     ensure_schema(con)
+    ensure_facet_counts(con)
 
     total_inserted = 0
+    # a provider out of quota doesn't keep the other one's articles (or what it fetched before
+    # running out) from being published; the error is raised once they are
+    quota_error = None
 
     # ---------------- GDELT ----------------
-    gdelt_articles = fetch_gdelt_articles(
-        query="(economy OR business OR finance OR technology OR politics OR sports OR health)",
-        timespan="24h",
-        maxrecords=250 # reduce faster testing
-    )
+    try:
+        gdelt_articles = fetch_gdelt_articles(
+            query=GDELT_QUERY,
+            timespan="24h",
+            maxrecords=GDELT_MAX_RECORDS
+        )
+    except QuotaExhausted as exc:
+        gdelt_articles, quota_error = exc.articles, exc
 
     total_inserted += upsert_articles(con, gdelt_articles)
 
     # ------------ Event Registry ------------
-    er_articles = fetch_eventregistry_articles(
-        keywords=["economy", "technology", "politics", "sports", "health"],
-        max_items=250
-    )
+    try:
+        er_articles = fetch_eventregistry_batch()
+    except QuotaExhausted as exc:
+        er_articles, quota_error = exc.articles, exc
 
     total_inserted += upsert_articles(con, er_articles)
 
+    # ------------ Story clusters ------------
+    assign_story_clusters(con)
+
+    bump_data_version(con)
+
     con.close()
+    if quota_error is not None:
+        raise quota_error
     return total_inserted
 
 
@@ -0,0 +1,48 @@
+from __future__ import annotations
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Mapping
+
+# Micro-batch ingestion: instead of three large runs a day, a small incremental run whenever
+# the newest fetch is older than the freshness target. Each provider is paced by its daily
+# request budget: it joins a run only once its share of the day has passed, and then spends
+# one request's worth of items (or what its run costs), so the budget is spread evenly over the day.
+
+FRESHNESS_TARGET = timedelta(minutes=int(os.getenv("NEWS_FRESHNESS_MINUTES", "30")))
+
+
+@dataclass(frozen=True)
+class ProviderPace:
+    daily_requests: int  # API calls we may spend per day
+    items_per_request: int
+    requests_per_run: int = 1  # what one micro-batch spends (more for an Event Registry query matrix)
+
+    @property
+    def interval(self) -> timedelta:
+        """Minimum time between two fetches from the provider, so whole runs fit the daily budget."""
+        return timedelta(days=1) / max(self.daily_requests // self.requests_per_run, 1)
+
+
+PROVIDER_PACES: Dict[str, ProviderPace] = {
+    # no published quota, but throttles bursts: one request every 5 minutes at most
+    "gdelt": ProviderPace(int(os.getenv("GDELT_DAILY_REQUESTS", "288")), items_per_request=250),
+    # every 100 articles is one request (token) against the plan
+    "eventregistry": ProviderPace(int(os.getenv("EVENTREGISTRY_DAILY_REQUESTS", "48")), items_per_request=100),
+}
+
+
+def due_providers(
+    last_fetch: Mapping[str, datetime],
+    now: datetime,
+    paces: Mapping[str, ProviderPace] = PROVIDER_PACES,
+    freshness: timedelta = FRESHNESS_TARGET,
+) -> List[str]:
+    """Providers to fetch in a micro-batch at `now`; empty while the data is fresh enough."""
+    newest = max(last_fetch.values(), default=None)
+    if newest is not None and now - newest < freshness:
+        return []
+    return [
+        name for name, pace in paces.items()
+        if name not in last_fetch or now - last_fetch[name] >= pace.interval
+    ]
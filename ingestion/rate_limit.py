@@ -0,0 +1,153 @@
+from __future__ import annotations
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, Sequence
+
+from ingestion.db import ROOT_DIR, connect
+from ingestion.pacing import PROVIDER_PACES
+
+# Rate limits and daily quotas of the news APIs, shared by every process that fetches
+# (ingest(), the Dagster steps, parallel sub-queries). Each provider has a token bucket
+# (requests per second with a burst) and a daily request budget; both live in a small DuckDB
+# file of their own, opened per call so several processes can take turns. A fetch first
+# reserves what it wants to spend: the requests it may make and the max_items they cover.
+
+RATE_LIMIT_PATH = os.getenv("RATE_LIMIT_DB_PATH", os.path.join(ROOT_DIR, "rate_limits.duckdb"))
+
+class QuotaExhausted(RuntimeError):
+    """Today's request budget of a provider is used up; fetch again after midnight UTC."""
+
+    def __init__(self, message: str, articles: Sequence = ()):
+        super().__init__(message)
+        self.articles = list(articles)  # what the batch fetched before the quota ran out
+
+
+@dataclass(frozen=True)
+class ProviderLimits:
+    requests_per_second: float
+    burst: int
+    daily_requests: int
+    items_per_request: int
+
+
+PROVIDER_LIMITS: Dict[str, ProviderLimits] = {
+    # GDELT asks for at most one request every 5 seconds
+    "gdelt": ProviderLimits(0.2, 1, PROVIDER_PACES["gdelt"].daily_requests, PROVIDER_PACES["gdelt"].items_per_request),
+    # the API rejects more than 5 simultaneous requests
+    "eventregistry": ProviderLimits(
+        2.0, 5, PROVIDER_PACES["eventregistry"].daily_requests, PROVIDER_PACES["eventregistry"].items_per_request
+    ),
+}
+
+
+class RateLimiter:
+    def __init__(self, path: str = RATE_LIMIT_PATH, limits: Dict[str, ProviderLimits] = PROVIDER_LIMITS):
+        self.path = path
+        self.limits = limits
+        self._lock = threading.Lock()
+        con = connect(path)
+        try:
+            con.execute("""
+                CREATE TABLE IF NOT EXISTS provider_quota (
+                    provider VARCHAR PRIMARY KEY,
+                    tokens DOUBLE,          -- token bucket level (negative: requests taken ahead)
+                    refilled_at DOUBLE,     -- epoch seconds of the last refill
+                    blocked_until DOUBLE,   -- backoff after the provider throttled us
+                    quota_day DATE,         -- UTC day requests_used counts for
+                    requests_used INTEGER
+                )
+            """)
+        finally:
+            con.close()
+
+    def _state(self, con, provider: str, now: float) -> dict:
+        """Bucket state refilled up to `now`, with the daily count reset on a new UTC day."""
+        limits = self.limits[provider]
+        today = datetime.fromtimestamp(now, timezone.utc).date()
+        row = con.execute("""
+            SELECT tokens, refilled_at, blocked_until, quota_day, requests_used
+            FROM provider_quota WHERE provider = ?
+        """, [provider]).fetchone()
+        if row is None:
+            return {"tokens": float(limits.burst), "blocked_until": 0.0, "requests_used": 0, "quota_day": today}
+        tokens, refilled_at, blocked_until, quota_day, used = row
+        return {
+            "tokens": min(float(limits.burst), tokens + (now - refilled_at) * limits.requests_per_second),
+            "blocked_until": blocked_until,
+            "requests_used": used if quota_day == today else 0,
+            "quota_day": today,
+        }
+
+    def _save(self, con, provider: str, state: dict, now: float):
+        con.execute("INSERT OR REPLACE INTO provider_quota VALUES (?, ?, ?, ?, ?, ?)", [
+            provider, state["tokens"], now, state["blocked_until"], state["quota_day"], state["requests_used"],
+        ])
+
+    def remaining(self, provider: str) -> int:
+        """Requests left in today's budget."""
+        with self._lock:
+            con = connect(self.path)
+            try:
+                used = self._state(con, provider, time.time())["requests_used"]
+            finally:
+                con.close()
+        return max(self.limits[provider].daily_requests - used, 0)
+
+    def reserve(self, provider: str, max_items: int) -> int:
+        """
+        Spend requests for fetching up to `max_items`: as many as they need, capped by what is
+        left today, waiting for the token bucket (or a backoff) first. Returns the max_items
+        they cover (0 for max_items=0, without spending anything). Raises QuotaExhausted when
+        today's budget is used up.
+        """
+        if max_items <= 0:
+            return 0
+        limits = self.limits[provider]
+        wanted = math.ceil(max_items / limits.items_per_request)
+        while True:
+            with self._lock:
+                con = connect(self.path)
+                try:
+                    con.execute("BEGIN TRANSACTION")
+                    now = time.time()
+                    state = self._state(con, provider, now)
+                    requests = min(wanted, limits.daily_requests - state["requests_used"])
+                    if requests <= 0:
+                        con.execute("COMMIT")
+                        raise QuotaExhausted(f"Daily {provider} quota of {limits.daily_requests} requests is used up")
+                    # a reservation may overdraw the bucket; later callers wait for the refill
+                    wait = max(state["blocked_until"] - now, (1 - state["tokens"]) / limits.requests_per_second, 0)
+                    if wait <= 0:
+                        state["tokens"] -= requests
+                        state["requests_used"] += requests
+                    self._save(con, provider, state, now)
+                    con.execute("COMMIT")
+                finally:
+                    con.close()
+            if wait <= 0:
+                return min(max_items, requests * limits.items_per_request)
+            time.sleep(wait)
+
+    def penalize(self, provider: str, seconds: float):
+        """The provider throttled us: nobody calls it again for `seconds`."""
+        with self._lock:
+            con = connect(self.path)
+            try:
+                now = time.time()
+                state = self._state(con, provider, now)
+                state["blocked_until"] = max(state["blocked_until"], now + seconds)
+                state["tokens"] = min(state["tokens"], 0.0)
+                self._save(con, provider, state, now)
+            finally:
+                con.close()
+
+
+@lru_cache(maxsize=1)
+def get_rate_limiter() -> RateLimiter:
+    """The process-wide limiter on RATE_LIMIT_PATH."""
+    return RateLimiter()
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import argparse
+import json
+from typing import Optional
+
+import duckdb
+import pyarrow as pa
+
+from ingestion.db import DB_PATH, connect
+from ingestion.facets import rebuild_facet_counts
+from ingestion.ingest_news import bump_data_version, ensure_schema
+from transforms.parallel import rederive_records
+from transforms.transform_utils import get_taxonomy
+
+BATCH_SIZE = 50_000
+
+
+# -------------------------------------------------
+# Progress tracking (one row per taxonomy version)
+# -------------------------------------------------
+
+def _load_progress(con: duckdb.DuckDBPyConnection, version: str):
+    return con.execute(
+        "SELECT last_article_id, processed_rows, finished_at FROM reprocess_progress WHERE taxonomy_version = ?",
+        [version],
+    ).fetchone()
+
+
+def _save_progress(con: duckdb.DuckDBPyConnection, version: str, last_id: Optional[str], processed: int, finished: bool):
+    con.execute("""
+        INSERT INTO reprocess_progress (taxonomy_version, last_article_id, processed_rows, started_at, updated_at, finished_at)
+        VALUES (?, ?, ?, NOW(), NOW(), CASE WHEN ? THEN NOW() END)
+        ON CONFLICT (taxonomy_version) DO UPDATE SET
+            last_article_id = excluded.last_article_id,
+            processed_rows = excluded.processed_rows,
+            updated_at = excluded.updated_at,
+            finished_at = excluded.finished_at
+    """, [version, last_id, processed, finished])
+
+
+def _pending(con: duckdb.DuckDBPyConnection, version: str, up_to: Optional[str] = None) -> bool:
+    """Whether any article (up to article_id `up_to`) isn't stamped with `version`."""
+    query = "SELECT EXISTS (SELECT 1 FROM articles WHERE taxonomy_version IS DISTINCT FROM ?"
+    params = [version]
+    if up_to is not None:
+        query += " AND article_id <= ?"
+        params.append(up_to)
+    return con.execute(query + ")", params).fetchone()[0]
+
+
+# -------------------------------------------------
+# Reprocessing
+# -------------------------------------------------
+
+def reprocess_articles(
+    con: duckdb.DuckDBPyConnection,
+    batch_size: int = BATCH_SIZE,
+    restart: bool = False,
+    workers: Optional[int] = None,
+) -> int:
+    """
+    Recompute topics, frames and language of stored articles with the current taxonomy.
+    Rows stream out of DuckDB in Arrow batches ordered by article_id, are re-derived in bulk
+    (process pool), and are written back with one set-based UPDATE per batch. Progress is
+    committed per batch, so an interrupted run resumes after the last finished batch.
+    Returns the number of rows updated in this call.
+    """
+    ensure_schema(con)
+    version = get_taxonomy().version
+
+    # the stamps decide whether a run is needed, not the progress row: after taxonomy
+    # A -> B -> A, A's run is finished but every row is stamped B
+    if not _pending(con, version):
+        return 0
+    progress = None if restart else _load_progress(con, version)
+    # resume after the last batch only if no row before it has been restamped since
+    if progress and (progress[0] is None or _pending(con, version, up_to=progress[0])):
+        progress = None
+    last_id, processed = (progress[0], progress[1] or 0) if progress else (None, 0)
+
+    query = """
+        SELECT article_id, provider, title, summary, body, language, topics
+        FROM articles
+        WHERE taxonomy_version IS DISTINCT FROM ?
+    """
+    params = [version]
+    if last_id is not None:
+        query += " AND article_id > ?"
+        params.append(last_id)
+    query += " ORDER BY article_id"
+
+    # separate cursor for the streaming read so the updates below don't cancel it
+    result = con.cursor().execute(query, params)
+    reader = result.to_arrow_reader(batch_size) if hasattr(result, "to_arrow_reader") else result.fetch_record_batch(batch_size)
+
+    updated = 0
+    for batch in reader:
+        records = batch.to_pylist()
+        for r in records:
+            try:
+                r["topics"] = json.loads(r["topics"]) if r["topics"] else []
+            except Exception:
+                r["topics"] = []
+
+        derived = rederive_records(records, workers=workers)
+        updates = pa.table({
+            "article_id": batch.column("article_id"),
+            "topics": [json.dumps(d["topics"]) for d in derived],
+            "frames": [json.dumps(d["frames"]) for d in derived],
+            "language": [d["language"] for d in derived],
+            "taxonomy_version": [d["taxonomy_version"] for d in derived],
+        })
+
+        con.execute("BEGIN TRANSACTION")
+        con.register("reprocessed", updates)
+        con.execute("""
+            UPDATE articles
+            SET topics = r.topics,
+                frames = r.frames,
+                language = r.language,
+                taxonomy_version = r.taxonomy_version
+            FROM reprocessed r
+            WHERE articles.article_id = r.article_id
+        """)
+        con.unregister("reprocessed")
+        updated += len(records)
+        processed += len(records)
+        _save_progress(con, version, records[-1]["article_id"], processed, finished=False)
+        con.execute("COMMIT")
+
+    _save_progress(con, version, None, processed, finished=True)
+    if updated:
+        rebuild_facet_counts(con)  # topics and languages may have changed
+        bump_data_version(con, rewrite=True)
+    return updated
+
+
+# -------------------------------------------------
+# CLI entrypoint
+# -------------------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute topics/frames/language after a taxonomy change")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=None, help="process-pool size (default: one per core)")
+    parser.add_argument("--restart", action="store_true", help="ignore saved progress for this taxonomy version")
+    args = parser.parse_args()
+
+    con = connect(DB_PATH)
+    count = reprocess_articles(con, batch_size=args.batch_size, restart=args.restart, workers=args.workers)
+    con.close()
+    print(f"Reprocessed {count} articles with taxonomy {get_taxonomy().version}")
@@ -27,4 +27,51 @@ CREATE INDEX IF NOT EXISTS idx_articles_language ON articles(language);
 -- add image_url if table already exists without it
 ALTER TABLE articles ADD COLUMN IF NOT EXISTS image_url VARCHAR;
 ALTER TABLE articles ADD COLUMN IF NOT EXISTS body VARCHAR;
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS cluster_id VARCHAR;
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS frames VARCHAR; -- JSON object: framing group -> 0/1
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS taxonomy_version VARCHAR; -- taxonomy that produced topics/frames
+
+-- bumped after every write that changes what the dashboard shows (cache key for loaders)
+CREATE TABLE IF NOT EXISTS data_version (
+  id          INTEGER PRIMARY KEY,
+  version     BIGINT,
+  updated_at  TIMESTAMP
+);
+-- bumped only when existing articles were rewritten (not just new ones inserted);
+-- delta-refreshed dashboard frames reload fully when it changes
+ALTER TABLE data_version ADD COLUMN IF NOT EXISTS rewrite_version BIGINT DEFAULT 0;
+
+-- resumable progress of ingestion.reprocess, one row per taxonomy version
+CREATE TABLE IF NOT EXISTS reprocess_progress (
+  taxonomy_version  VARCHAR PRIMARY KEY,
+  last_article_id   VARCHAR,
+  processed_rows    BIGINT,
+  started_at        TIMESTAMP,
+  updated_at        TIMESTAMP,
+  finished_at       TIMESTAMP
+);
+
+-- repeated-narrative clusters, maintained incrementally by ingestion
+CREATE TABLE IF NOT EXISTS story_clusters (
+  cluster_id            VARCHAR PRIMARY KEY, -- article_id of the article that started the cluster
+  representative_title  VARCHAR,
+  representative_score  DOUBLE,
+  token_counts          VARCHAR, -- JSON object: title token -> number of members using it
+  topic_counts          VARCHAR, -- JSON object: topic -> number of members tagged with it
+  topic_hint            VARCHAR,
+  cluster_size          INTEGER,
+  first_seen            TIMESTAMP,
+  last_seen             TIMESTAMP,
+  updated_at            TIMESTAMP DEFAULT NOW()
+);
+
+-- sidebar facet counts: articles per (filter dimension, value, published hour), kept up to
+-- date by ingestion; NULL published_at is counted under 1970-01-01 (only "All time" sees it)
+CREATE TABLE IF NOT EXISTS facet_counts (
+  dimension      VARCHAR,   -- topic | country | language | provider
+  value          VARCHAR,
+  bucket_hour    TIMESTAMP,
+  article_count  BIGINT,
+  PRIMARY KEY (dimension, value, bucket_hour)
+);
 """
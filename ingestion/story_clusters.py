@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import json
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+import duckdb
+import pandas as pd
+
+from transforms.transform_utils import _jaccard, _token_set
+
+# Same similarity rule as the dashboard used to apply on the fly (35% shared title words)
+CLUSTER_THRESHOLD = 0.35
+# Only clusters that saw an article recently can absorb new ones
+CLUSTER_WINDOW = timedelta(days=14)
+
+
+@dataclass
+class StoryCluster:
+    cluster_id: str
+    representative_title: str
+    representative_score: float
+    token_counts: Counter
+    topic_counts: Counter
+    cluster_size: int
+    first_seen: Optional[datetime]
+    last_seen: Optional[datetime]
+    dirty: bool = field(default=False)
+
+    def signature(self) -> Set[str]:
+        """Tokens shared by at least half of the members (all tokens for a single article)."""
+        return {t for t, c in self.token_counts.items() if c * 2 >= self.cluster_size}
+
+    def topic_hint(self) -> str:
+        return self.topic_counts.most_common(1)[0][0] if self.topic_counts else ""
+
+
+def _parse_topics(raw) -> List[str]:
+    try:
+        return json.loads(raw) if raw else []
+    except Exception:
+        return []
+
+
+def _load_clusters(con: duckdb.DuckDBPyConnection, since: Optional[datetime]) -> Dict[str, StoryCluster]:
+    query = """
+        SELECT cluster_id, representative_title, representative_score, token_counts,
+               topic_counts, cluster_size, first_seen, last_seen
+        FROM story_clusters
+    """
+    params = []
+    if since is not None:
+        query += " WHERE last_seen >= ?"
+        params.append(since)
+
+    clusters = {}
+    for row in con.execute(query, params).fetchall():
+        clusters[row[0]] = StoryCluster(
+            cluster_id=row[0],
+            representative_title=row[1] or "",
+            representative_score=row[2] or 0.0,
+            token_counts=Counter(json.loads(row[3] or "{}")),
+            topic_counts=Counter(json.loads(row[4] or "{}")),
+            cluster_size=row[5] or 0,
+            first_seen=row[6],
+            last_seen=row[7],
+        )
+    return clusters
+
+
+def _save(con: duckdb.DuckDBPyConnection, clusters: Dict[str, StoryCluster], assignments: List[dict]):
+    changed = [c for c in clusters.values() if c.dirty]
+    if changed:
+        cluster_rows = pd.DataFrame([
+            {
+                "cluster_id": c.cluster_id,
+                "representative_title": c.representative_title,
+                "representative_score": c.representative_score,
+                "token_counts": json.dumps(dict(c.token_counts)),
+                "topic_counts": json.dumps(dict(c.topic_counts)),
+                "topic_hint": c.topic_hint(),
+                "cluster_size": c.cluster_size,
+                "first_seen": c.first_seen,
+                "last_seen": c.last_seen,
+            }
+            for c in changed
+        ])
+        con.register("cluster_rows", cluster_rows)
+        con.execute("""
+            INSERT OR REPLACE INTO story_clusters (
+                cluster_id, representative_title, representative_score, token_counts, topic_counts,
+                topic_hint, cluster_size, first_seen, last_seen, updated_at
+            )
+            SELECT
+                cluster_id, representative_title, representative_score, token_counts, topic_counts,
+                topic_hint, cluster_size, first_seen, last_seen, NOW()
+            FROM cluster_rows
+        """)
+        con.unregister("cluster_rows")
+
+    if assignments:
+        con.register("cluster_assignments", pd.DataFrame(assignments))
+        con.execute("""
+            UPDATE articles
+            SET cluster_id = a.cluster_id
+            FROM cluster_assignments a
+            WHERE articles.article_id = a.article_id
+        """)
+        con.unregister("cluster_assignments")
+
+
+def assign_story_clusters(con: duckdb.DuckDBPyConnection, threshold: float = CLUSTER_THRESHOLD) -> int:
+    """
+    Put every article without a cluster into a story cluster.
+    Each article is compared (title Jaccard) against the signature of recently active
+    clusters; it joins the best match above `threshold` or starts a new cluster.
+    Returns the number of articles assigned.
+    """
+    pending = con.execute("""
+        SELECT article_id, title, topics, published_at
+        FROM articles
+        WHERE cluster_id IS NULL AND title IS NOT NULL
+        ORDER BY published_at, article_id
+    """).fetchall()
+    if not pending:
+        return 0
+
+    oldest = next((r[3] for r in pending if r[3] is not None), None)
+    clusters = _load_clusters(con, oldest - CLUSTER_WINDOW if oldest else None)
+
+    # inverted index: signature token -> cluster ids, so we only score clusters sharing a word
+    index: Dict[str, Set[str]] = {}
+    for c in clusters.values():
+        for t in c.signature():
+            index.setdefault(t, set()).add(c.cluster_id)
+
+    assignments = []
+    for article_id, title, raw_topics, published_at in pending:
+        tokens = _token_set(title)
+        topics = _parse_topics(raw_topics)
+
+        best, best_score = None, 0.0
+        for cid in {cid for t in tokens for cid in index.get(t, ())}:
+            c = clusters[cid]
+            if published_at and c.last_seen and published_at - c.last_seen > CLUSTER_WINDOW:
+                continue
+            score = _jaccard(tokens, c.signature())
+            if score >= threshold and (score > best_score or (score == best_score and cid < best.cluster_id)):
+                best, best_score = c, score
+
+        if best is None:
+            best = StoryCluster(
+                cluster_id=article_id,
+                representative_title=title,
+                representative_score=1.0,
+                token_counts=Counter(),
+                topic_counts=Counter(),
+                cluster_size=0,
+                first_seen=published_at,
+                last_seen=published_at,
+            )
+            clusters[article_id] = best
+
+        old_signature = best.signature()
+        best.token_counts.update(tokens)
+        best.topic_counts.update(topics)
+        best.cluster_size += 1
+        if published_at is not None:
+            best.first_seen = min(best.first_seen or published_at, published_at)
+            best.last_seen = max(best.last_seen or published_at, published_at)
+
+        # keep the representative title as the one closest to the (possibly shifted) signature
+        signature = best.signature()
+        best.representative_score = _jaccard(_token_set(best.representative_title), signature)
+        candidate_score = _jaccard(tokens, signature)
+        if candidate_score > best.representative_score:
+            best.representative_title = title
+            best.representative_score = candidate_score
+        best.dirty = True
+
+        for t in old_signature - signature:
+            index.get(t, set()).discard(best.cluster_id)
+        for t in signature:
+            index.setdefault(t, set()).add(best.cluster_id)
+
+        assignments.append({"article_id": article_id, "cluster_id": best.cluster_id})
+
+    _save(con, clusters, assignments)
+    return len(assignments)
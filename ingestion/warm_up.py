@@ -0,0 +1,63 @@
+from __future__ import annotations
+import logging
+from datetime import datetime
+from typing import Optional
+
+import duckdb
+
+from ingestion.db import DB_PATH, connect
+from dashboard.time_windows import TIME_FILTER_OPTIONS, time_bucket, window_cutoff
+from dashboard.result_cache import ResultCache, result_key
+from dashboard.views import VIEW_QUERIES, view_query, window_sample_percent
+
+# Cache warm-up after an ingest: computes every standard dashboard view (dashboard/views.py)
+# for every time window at the new data version and puts it in the shared result cache,
+# where the page loaders look first, so the first visitor after an ingest never waits on a
+# cold query. Windows are warmed for their current time bucket and default sampling.
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up_views(
+    con: duckdb.DuckDBPyConnection,
+    cache: ResultCache,
+    now: Optional[datetime] = None,
+) -> int:
+    """Precompute all views at the current data version; returns the number of results written."""
+    row = con.execute("SELECT version FROM data_version WHERE id = 1").fetchone()
+    data_version = row[0] if row else 0
+
+    def fetch_value(sql, params):
+        row = con.execute(sql, params).fetchone()
+        return row[0] if row else None
+
+    written = 0
+    for window_name in TIME_FILTER_OPTIONS:
+        bucket = time_bucket(window_name, now)
+        sample_pct = window_sample_percent(fetch_value, window_cutoff(window_name, bucket))
+        for view in VIEW_QUERIES:
+            sql, params = view_query(view, window_name, bucket, sample_pct)
+            cache.put(result_key(sql, params, data_version), con.execute(sql, params).to_arrow_table(), data_version)
+            written += 1
+
+    # results of older versions can't be hit any more
+    cache.prune(data_version)
+    logger.info("Warmed %d dashboard views for data version %s", written, data_version)
+    return written
+
+
+def warm_up(path: Optional[str] = None) -> int:
+    """Open the news database read-only and warm all dashboard views."""
+    con = connect(path or DB_PATH, read_only=True)
+    # same session time zone as the dashboard's read pool, so cached timestamps match
+    con.execute("SET TimeZone = 'UTC'")
+    cache = ResultCache()
+    try:
+        return warm_up_views(con, cache)
+    finally:
+        cache.close()
+        con.close()
+
+
+if __name__ == "__main__":
+    print(f"Warmed {warm_up()} dashboard views")
@@ -55,3 +55,906 @@ def test_cluster_articles_by_title_groups_similar_headlines():
     clusters = cluster_articles_by_title(data, limit=10, threshold=0.25)
     # Expect at least one cluster with the two similar headlines
     assert any(len(c) == 2 for c in clusters)
+
+#5. --------------------------------------------------------------
+# Checks that ingestion assigns similar headlines to one stored story cluster,
+# and that a later article joins the existing cluster instead of starting a new one.
+def test_assign_story_clusters_joins_existing_cluster():
+    import duckdb
+    from ingestion.schema import DDL
+    from ingestion.story_clusters import assign_story_clusters
+
+    con = duckdb.connect()
+    con.execute(DDL)
+    con.execute("""
+        INSERT INTO articles (article_id, url, title, topics, published_at) VALUES
+        ('a1', 'u1', 'Russia invades Ukraine in latest offensive', '["politics"]', '2025-01-01'),
+        ('a2', 'u2', 'Completely different sports headline', '["sports"]', '2025-01-01 01:00')
+    """)
+    assert assign_story_clusters(con) == 2
+
+    # a new ingest batch arrives later
+    con.execute("""
+        INSERT INTO articles (article_id, url, title, topics, published_at) VALUES
+        ('a3', 'u3', 'Russia invades Ukraine again in offensive', '["politics"]', '2025-01-02')
+    """)
+    assert assign_story_clusters(con) == 1
+
+    cluster_of = dict(con.execute("SELECT article_id, cluster_id FROM articles").fetchall())
+    assert cluster_of["a3"] == cluster_of["a1"] == "a1"
+    assert cluster_of["a2"] == "a2"
+    size, hint = con.execute(
+        "SELECT cluster_size, topic_hint FROM story_clusters WHERE cluster_id = 'a1'"
+    ).fetchone()
+    assert size == 2 and hint == "politics"
+
+#6. --------------------------------------------------------------
+# Checks that the process-pool transform stage returns results in input order
+# and gives the same answers as the serial fallback.
+def test_parallel_transform_matches_serial_order():
+    from transforms.parallel import parallel_map, transform_records
+
+    codes = ["eng", "swe", "", "fra", None, "deu", "xx"]
+    serial = parallel_map(normalize_language, codes, workers=1)
+    parallel = parallel_map(normalize_language, codes, workers=2, chunk_size=2, min_parallel=0)
+    assert parallel == serial == [normalize_language(c) for c in codes]
+
+    records = [
+        {"provider": "gdelt", "topics": ["Unknown"], "title": "Market rally", "language": "en"},
+        {"provider": "eventregistry", "topics": ["climate"], "title": "x", "language": "sv"},
+    ]
+    derived = transform_records(records, workers=1)
+    assert derived[0]["topics"] == ["Unknown"] and derived[0]["language"] == "English"
+    assert derived[1]["topics"] == ["environment_climate"] and derived[1]["language"] == "Swedish"
+
+#7. --------------------------------------------------------------
+# Checks that an edited taxonomy file is picked up without a restart, that the
+# version stamp changes with it, and that unchanged content reuses the compiled matchers.
+def test_taxonomy_file_hot_reload(tmp_path, monkeypatch):
+    import json
+    import os
+    from transforms import transform_utils
+
+    monkeypatch.setattr(transform_utils, "TAXONOMY_RELOAD_SECONDS", 0.0)
+    path = tmp_path / "taxonomy.json"
+    taxonomy = {
+        "version": "t1",
+        "category_keywords": {"sports": ["football"]},
+        "aliases": {},
+        "frame_groups": {"Conflict & War": ["war"]},
+    }
+    path.write_text(json.dumps(taxonomy))
+    first = transform_utils.get_taxonomy(str(path))
+    assert first.version.startswith("t1@")
+    assert transform_utils.get_taxonomy(str(path)) is first
+
+    taxonomy["version"] = "t2"
+    taxonomy["frame_groups"]["Sanctions & Pressure"] = ["embargo"]
+    path.write_text(json.dumps(taxonomy))
+    os.utime(path, ns=(0, 10**18))  # make sure the mtime differs on coarse filesystems
+    second = transform_utils.get_taxonomy(str(path))
+    assert second.version.startswith("t2@")
+    assert second.frame_patterns["Sanctions & Pressure"].search("new embargo announced")
+
+    # restore the default taxonomy for the other tests
+    transform_utils.get_taxonomy()
+
+#8. --------------------------------------------------------------
+# Checks that reprocessing recomputes topics and frames of stored articles in batches,
+# stamps the taxonomy version, and does nothing on a second run (progress is remembered).
+def test_reprocess_articles_updates_and_resumes():
+    import duckdb
+    from ingestion.reprocess import reprocess_articles
+    from ingestion.schema import DDL
+    from transforms.transform_utils import get_taxonomy
+
+    con = duckdb.connect()
+    con.execute(DDL)
+    con.execute("""
+        INSERT INTO articles (article_id, provider, url, title, body, language, topics) VALUES
+        ('a1', 'eventregistry', 'u1', 'Football league final', 'The war and the embargo', 'eng', '["politics"]'),
+        ('a2', 'gdelt', 'u2', 'Stocks fall', NULL, 'en', '["Unknown"]'),
+        ('a3', 'eventregistry', 'u3', 'Nothing to see', NULL, 'swe', '["health"]')
+    """)
+    assert reprocess_articles(con, batch_size=2, workers=1) == 3
+    assert reprocess_articles(con, batch_size=2, workers=1) == 0
+
+    rows = {
+        r[0]: r[1:]
+        for r in con.execute(
+            "SELECT article_id, topics, language, frames, taxonomy_version FROM articles"
+        ).fetchall()
+    }
+    assert rows["a1"][0] == '["sports"]'
+    assert rows["a2"][0] == '["Unknown"]'          # gdelt themes are kept
+    assert rows["a3"][0] == '["health"]'           # no keyword hit -> stored topics kept
+    assert rows["a3"][1] == "Swedish"
+    assert '"Sanctions & Pressure": 1' in rows["a1"][2]
+    assert {r[3] for r in rows.values()} == {get_taxonomy().version}
+
+#9. --------------------------------------------------------------
+# Checks that the transforms can be called from SQL on a project connection
+# and give the same answers as the Python functions.
+def test_transform_udfs_in_sql():
+    from ingestion.db import connect
+    from transforms.transform_utils import categorize_text
+
+    con = connect(":memory:")
+    con.execute("CREATE TABLE t AS SELECT * FROM (VALUES ('Stocks rally as markets cheer'), ('eng'), (NULL)) v(txt)")
+    rows = con.execute("""
+        SELECT txt, categorize_text(txt), normalize_language(txt), title_tokens(txt),
+               count_frames(txt)['Conflict & War']
+        FROM t
+    """).fetchall()
+    by_text = {r[0]: r[1:] for r in rows}
+    assert by_text["Stocks rally as markets cheer"][0] == categorize_text("Stocks rally as markets cheer")
+    assert by_text["eng"][1] == "English"
+    assert by_text["Stocks rally as markets cheer"][2] == ["cheer", "markets", "rally", "stocks"]
+    assert by_text["Stocks rally as markets cheer"][3] == 0
+    assert by_text[None] == (None, None, None, None)
+
+#10. -------------------------------------------------------------
+# Checks that the sidebar selections become one SQL query: equal selections normalize
+# to the same cache key, the filters (search, topics, countries) are applied in DuckDB,
+# and the keyset cursor continues after the last article of the previous page.
+def test_article_query_builder_filters_in_sql():
+    import duckdb
+    from dashboard.queries import ArticleFilters, build_article_count_query, build_article_query
+    from ingestion.schema import DDL
+
+    assert ArticleFilters.normalized(search=" Ukraine ", countries=["SE", "DE", "SE"]) == \
+        ArticleFilters.normalized(search="ukraine", countries=["DE", "SE"])
+
+    con = duckdb.connect()
+    con.execute(DDL)
+    con.execute("""
+        INSERT INTO articles (article_id, url, title, source_country, topics, published_at) VALUES
+        ('a1', 'u1', 'Ukraine talks resume', 'SE', '["politics"]', '2025-01-03'),
+        ('a2', 'u2', 'Ukraine grain exports', 'DE', '["economy"]', '2025-01-02'),
+        ('a3', 'u3', 'Local football result', 'SE', '["sports"]', '2025-01-01')
+    """)
+    filters = ArticleFilters.normalized(search="UKRAINE", topics=["politics", "economy"], countries=["SE", "DE"])
+    sql, params = build_article_query(filters, limit=1)
+    assert [r[0] for r in con.execute(sql, params).fetchall()] == ["a1"]
+    sql, params = build_article_query(filters, limit=1, after=("2025-01-03 00:00:00", "a1"))
+    assert [r[0] for r in con.execute(sql, params).fetchall()] == ["a2"]
+    sql, params = build_article_count_query(filters)
+    assert con.execute(sql, params).fetchone()[0] == 2
+
+#11. -------------------------------------------------------------
+# Checks that the shared read pool hands back the same cursor for repeated queries,
+# reopens after the database file changes, and lets go of the file once idle.
+def test_read_connection_pool_reuses_and_reopens(tmp_path):
+    import time
+    from ingestion.db import ReadConnectionPool, connect
+
+    path = str(tmp_path / "news.duckdb")
+    writer = connect(path)
+    writer.execute("CREATE TABLE t AS SELECT 1 AS x")
+    writer.close()
+
+    pool = ReadConnectionPool(path, idle_seconds=0.2)
+    with pool.cursor() as cur:
+        first = cur
+        assert cur.execute("SELECT count(*) FROM t").fetchone()[0] == 1
+    with pool.cursor() as cur:
+        assert cur is first
+
+    time.sleep(0.5)  # idle -> the file lock is released and a writer can get in
+    writer = connect(path, lock_timeout=0)
+    writer.execute("INSERT INTO t VALUES (2)")
+    writer.close()
+
+    with pool.cursor() as cur:
+        assert cur is not first
+        assert cur.execute("SELECT count(*) FROM t").fetchone()[0] == 2
+    pool.close()
+
+#12. -------------------------------------------------------------
+# Checks that time-window cutoffs move in bucket steps, so reruns inside a bucket
+# produce the same cache key, and that "All time" has no cutoff at all.
+def test_time_buckets_are_stable_within_a_bucket():
+    from datetime import datetime, timezone
+    from dashboard.time_windows import time_bucket, window_cutoff
+
+    t1 = datetime(2025, 1, 1, 12, 1, 5, tzinfo=timezone.utc)
+    t2 = datetime(2025, 1, 1, 12, 14, 59, tzinfo=timezone.utc)
+    t3 = datetime(2025, 1, 1, 12, 15, 0, tzinfo=timezone.utc)
+    assert time_bucket("Last 24 hours", t1) == time_bucket("Last 24 hours", t2) == "2025-01-01T12:00:00"
+    assert time_bucket("Last 24 hours", t3) == "2025-01-01T12:15:00"
+    assert window_cutoff("Last 24 hours", "2025-01-01T12:00:00") == "2024-12-31T12:00:00"
+    assert time_bucket("All time", t1) is None and window_cutoff("All time", None) is None
+
+#13. -------------------------------------------------------------
+# Checks the Global Coverage aggregates computed in DuckDB: country shares and tiers,
+# and per-country top domains with top-3 share and HHI.
+def test_coverage_and_domain_concentration_queries():
+    import duckdb
+    from ingestion.schema import DDL
+    from dashboard.queries import build_country_coverage_query, build_domain_concentration_query
+
+    con = duckdb.connect()
+    con.execute(DDL)
+    rows = [("SE", "a.se")] * 6 + [("SE", "b.se")] * 2 + [("SE", "c.se"), ("SE", "d.se"), ("DE", "a.de")]
+    con.executemany(
+        "INSERT INTO articles (article_id, url, provider, source_country, source_domain) VALUES (?, ?, 'gdelt', ?, ?)",
+        [(f"id{i}", f"u{i}", c, d) for i, (c, d) in enumerate(rows)],
+    )
+    sql, params = build_country_coverage_query()
+    coverage = con.execute(sql, params).fetchall()
+    assert [(c, n, share) for c, n, share, _ in coverage] == [("SE", 10, 90.9), ("DE", 1, 9.1)]
+    assert coverage[0][3] == "High coverage" and coverage[1][3] == "Low coverage"
+
+    sql, params = build_domain_concentration_query(top_n=2)
+    se = [r for r in con.execute(sql, params).fetchall() if r[0] == "SE"]
+    assert [r[1] for r in se] == ["a.se", "b.se"]  # capped at top_n
+    _, _, _, _, share, top3_pct, hhi, level = se[0]
+    assert (share, top3_pct, hhi, level) == (60.0, 90.0, 4200, "High concentration")
+
+#14. -------------------------------------------------------------
+# Checks that framing totals are summed in SQL from stored frames, and that articles
+# without stored frames are scored on the fly (body, else summary).
+def test_frame_totals_query_uses_stored_frames_and_fallback():
+    import json
+    import duckdb
+    from ingestion.schema import DDL
+    from transforms.duckdb_udfs import register_udfs
+    from transforms.transform_utils import count_frames
+    from dashboard.queries import build_frame_totals_query
+
+    con = register_udfs(duckdb.connect())
+    con.execute(DDL)
+    stored = json.dumps(count_frames("the war goes on"))
+    con.executemany(
+        "INSERT INTO articles (article_id, url, provider, topics, published_at, body, summary, frames) VALUES (?, ?, 'eventregistry', '[]', '2025-01-01', ?, ?, ?)",
+        [
+            ("a1", "u1", "", "", stored),
+            ("a2", "u2", "", "An embargo on exports after the war", None),
+        ],
+    )
+    sql, params = build_frame_totals_query()
+    totals = dict(con.execute(sql, params).fetchall())
+    assert totals["Conflict & War"] == 2
+    assert totals["Sanctions & Pressure"] == 1
+
+#15. -------------------------------------------------------------
+# Checks that the financial Q&A sends the articles most relevant to the question
+# (BM25) instead of simply the newest ones, and stays within the token budget.
+def test_finance_qa_selects_relevant_articles_within_budget():
+    from transforms.retrieval import BM25Index
+    from dashboard.finance_qa import answer_question, index_text
+
+    articles = [
+        {"article_id": "new", "title": "Retail sales steady", "summary": "Shoppers spent as usual.", "published_at": "2025-01-03"},
+        {"article_id": "mid", "title": "Central bank raises rates", "summary": "Inflation stays high, rates go up.", "published_at": "2025-01-02"},
+        {"article_id": "old", "title": "Inflation fears return", "summary": "Economists expect inflation to climb.", "published_at": "2025-01-01"},
+    ]
+    index = BM25Index()
+    assert index.add_many((a["article_id"], index_text(a)) for a in articles) == 3
+    assert index.add_many((a["article_id"], index_text(a)) for a in articles) == 0  # incremental
+
+    prompts = []
+    def stub(prompt):
+        prompts.append(prompt)
+        return "stub answer"
+
+    answer, used = answer_question("What about inflation and rates?", index, articles, stub)
+    assert answer == "stub answer"
+    assert set(used) == {"mid", "old"} and "Retail sales" not in prompts[0]
+
+    _, used = answer_question("inflation", index, articles, stub, token_budget=30)
+    assert len(used) == 1
+
+#16. -------------------------------------------------------------
+# Checks that Q&A answers stream in chunks, are cached on disk under the normalized
+# question + context + model (so a repeat skips the model), and that a stuck model
+# is cut off by the hard timeout instead of blocking the page.
+def test_stream_answer_caches_and_times_out(tmp_path):
+    import time
+    from dashboard.answer_cache import AnswerCache
+    from dashboard.finance_qa import stream_answer
+
+    class StubClient:
+        name = "stub"
+        calls = 0
+
+        def stream(self, prompt, timeout):
+            StubClient.calls += 1
+            yield "Rates "
+            yield "dominate."
+
+    class StuckClient:
+        name = "stuck"
+
+        def stream(self, prompt, timeout):
+            time.sleep(5)
+            yield "too late"
+
+    path = str(tmp_path / "answers.duckdb")
+    cache = AnswerCache(path)
+    chunks = list(stream_answer("What dominates?", "prompt", ["a1", "a2"], StubClient(), cache))
+    assert chunks == ["Rates ", "dominate."]
+    cache.close()
+
+    cache = AnswerCache(path)  # persisted across instances
+    assert list(stream_answer("  what DOMINATES ", "prompt", ["a2", "a1"], StubClient(), cache)) == ["Rates dominate."]
+    assert StubClient.calls == 1
+
+    start = time.monotonic()
+    chunks = list(stream_answer("What dominates?", "prompt", ["a1"], StuckClient(), cache, timeout=0.2))
+    assert time.monotonic() - start < 2 and "stopped" in chunks[-1]
+    assert len(cache) == 1  # timeouts are not cached
+
+#17. -------------------------------------------------------------
+# Checks that loader results are memory-lean: low-cardinality text becomes categorical,
+# other text/lists stay Arrow-backed, timestamps are UTC-aware, and sizes are reported.
+def test_arrow_to_pandas_dtypes_and_memory_report():
+    import duckdb
+    from dashboard.data_access import arrow_to_pandas, memory_report, record_memory
+
+    con = duckdb.connect()
+    con.execute("SET TimeZone = 'UTC'")
+    table = con.execute("""
+        SELECT 'gdelt' AS provider, 'A title' AS title,
+               from_json('["economy"]', '["VARCHAR"]') AS topics,
+               timezone('UTC', TIMESTAMP '2025-01-01 10:00') AS published_at
+    """).to_arrow_table()
+    df = arrow_to_pandas(table)
+    assert isinstance(df["provider"].dtype, pd.CategoricalDtype)
+    assert isinstance(df["title"].dtype, pd.ArrowDtype)
+    assert df["topics"].iloc[0] == ["economy"]
+    assert str(df["published_at"].dt.tz) == "UTC"
+
+    record_memory("test.dataset", df)
+    report = memory_report()
+    assert report.loc[report["dataset"] == "test.dataset", "rows"].item() == 1
+
+#18. -------------------------------------------------------------
+# Checks the import-time benchmark: a page's module-level imports are measured (plotly on
+# the chart pages, which always need it), and only the script's direct imports are counted.
+def test_import_time_parsing():
+    from dashboard.import_time import parse_importtime, top_level_imports
+
+    imports = top_level_imports("dashboard/pages/Global_Coverage.py")
+    assert "import streamlit as st" in imports
+    assert "import plotly.express as px" in imports
+    assert not any("plotly" in line for line in top_level_imports("dashboard/pages/Financial_Focus.py"))
+
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       150 |        150 |   numpy.core\n"
+        "import time:       100 |        250 | pandas\n"
+        "import time:        20 |         20 | dotenv\n"
+    )
+    assert parse_importtime(stderr) == [("pandas", 250), ("dotenv", 20)]
+
+#19. -------------------------------------------------------------
+# Checks the sidebar facets: counts kept in facet_counts as articles are inserted, and
+# counts over matching articles (ignoring the facet's own filter) when other filters are active.
+def test_facet_counts_table_and_filtered_facets():
+    import duckdb
+    from ingestion.schema import DDL
+    from ingestion.facets import add_facet_counts
+    from dashboard.queries import ArticleFilters, build_facet_query, build_facet_table_query
+
+    con = duckdb.connect()
+    con.execute(DDL)
+    con.execute("""
+        INSERT INTO articles (article_id, url, provider, source_country, topics, published_at) VALUES
+        ('a1', 'u1', 'gdelt', 'SE', '["economy", "economy"]', '2025-01-01 10:20'),
+        ('a2', 'u2', 'gdelt', 'DE', '["economy"]', '2025-01-02 08:00'),
+        ('a3', 'u3', 'eventregistry', 'SE', '["sports"]', '2025-01-02 09:00')
+    """)
+    add_facet_counts(con, ["a1", "a2"])
+    add_facet_counts(con, ["a3"])
+
+    sql, params = build_facet_table_query()
+    facets = {(d, v): n for d, v, n in con.execute(sql, params).fetchall()}
+    assert facets[("topic", "economy")] == 2 and facets[("country", "SE")] == 2
+    sql, params = build_facet_table_query("2025-01-02T08:30:00")  # rounded down to 08:00
+    assert ("topic", "economy") in {(d, v) for d, v, _ in con.execute(sql, params).fetchall()}
+
+    filters = ArticleFilters.normalized(topics=["economy"], countries=["SE"])
+    sql, params = build_facet_query(filters, "country")  # own filter ignored
+    assert con.execute(sql, params).fetchall() == [("DE", 1), ("SE", 1)]
+    sql, params = build_facet_query(filters, "topic")
+    assert con.execute(sql, params).fetchall() == [("economy", 1), ("sports", 1)]
+
+#20. -------------------------------------------------------------
+# Checks that ingestion adds only newly inserted articles to the facet counts,
+# so re-fetching an article that is already stored doesn't inflate them.
+def test_upsert_counts_only_newly_inserted_articles_in_facets():
+    import duckdb
+    from datetime import datetime
+    from ingestion.article_types import NormalizedArticle
+    from ingestion.ingest_news import ensure_schema, upsert_articles
+
+    con = duckdb.connect()
+    ensure_schema(con)
+    article = NormalizedArticle(
+        provider="gdelt", provider_id=None, url="https://example.com/a", title="Markets rally",
+        summary=None, body=None, image_url=None, published_at=datetime(2025, 1, 1, 10, 0),
+        source_name=None, source_domain="example.com", source_country="Sweden", language="eng",
+        topics=[], raw={},
+    )
+    upsert_articles(con, [article])
+    upsert_articles(con, [article])  # duplicate: not inserted, not counted again
+    count = con.execute(
+        "SELECT sum(article_count) FROM facet_counts WHERE dimension = 'country' AND value = 'Sweden'"
+    ).fetchone()[0]
+    assert count == 1
+
+#21. -------------------------------------------------------------
+# Checks delta refresh of cached article frames: a new data version only fetches rows
+# inserted since the last load without changing frames already handed out, a moving window
+# drops old rows without a query, and a rewrite of existing articles (reprocess) triggers a full reload.
+def test_delta_frame_fetches_only_new_rows():
+    import duckdb
+    from ingestion.ingest_news import bump_data_version, ensure_schema
+    from dashboard.data_access import arrow_to_pandas
+    from dashboard.delta_frames import DeltaFrame
+
+    con = duckdb.connect()
+    con.execute("SET TimeZone = 'UTC'")
+    ensure_schema(con)
+    con.execute("""
+        INSERT INTO articles (article_id, url, provider, published_at, inserted_at) VALUES
+        ('a1', 'u1', 'gdelt', '2025-01-01 10:00', '2025-01-01 10:05'),
+        ('a2', 'u2', 'gdelt', '2025-01-02 10:00', '2025-01-02 10:05')
+    """)
+    delta = DeltaFrame(
+        "provider, timezone('UTC', published_at) AS published_at",
+        fetch=lambda sql, params: arrow_to_pandas(con.execute(sql, params).to_arrow_table()),
+        fetch_value=lambda sql, params: con.execute(sql, params).fetchone()[0],
+    )
+    version = bump_data_version(con)
+    first = delta.refresh(None, version)
+    assert len(first) == 2 and delta.last_fetched_rows == 2
+    delta.refresh(None, version)
+    assert delta.last_fetched_rows == 0
+
+    con.execute("""
+        INSERT INTO articles (article_id, url, provider, published_at, inserted_at)
+        VALUES ('a3', 'u3', 'eventregistry', '2025-01-03 10:00', '2025-01-03 10:05')
+    """)
+    version = bump_data_version(con)
+    frame = delta.refresh(None, version)
+    assert delta.last_fetched_rows == 1 and sorted(frame["article_id"]) == ["a1", "a2", "a3"]
+    assert isinstance(frame["provider"].dtype, pd.CategoricalDtype)
+    assert len(first) == 2 and list(first["provider"].cat.categories) == ["gdelt"]  # handed out: unchanged
+
+    frame = delta.refresh("2025-01-02T00:00:00", version)  # window moved: evict, no query
+    assert delta.last_fetched_rows == 0 and sorted(frame["article_id"]) == ["a2", "a3"]
+
+    version = bump_data_version(con, rewrite=True)
+    delta.refresh("2025-01-02T00:00:00", version)
+    assert delta.last_fetched_rows == 2
+
+#22. -------------------------------------------------------------
+# Checks approximate mode: small windows stay exact, large ones get a sampling rate, and
+# sampled aggregates are scaled back up with a margin that covers the exact count
+# (unfiltered counts stay exact).
+def test_approximate_queries_scale_sample_with_error_bound():
+    import duckdb
+    from ingestion.schema import DDL
+    from dashboard.queries import (
+        ArticleFilters,
+        build_article_count_query,
+        build_country_coverage_query,
+        sample_percent,
+    )
+
+    assert sample_percent(1_000) is None
+    assert sample_percent(10_000_000, exact=True) is None
+    assert sample_percent(10_000_000) == 2.0
+
+    con = duckdb.connect()
+    con.execute(DDL)
+    con.execute("""
+        INSERT INTO articles (article_id, url, provider, source_country)
+        SELECT 'a' || i, 'u' || i, 'gdelt', CASE WHEN i % 4 = 0 THEN 'SE' ELSE 'DE' END
+        FROM range(40000) t(i)
+    """)
+    sql, params = build_article_count_query(ArticleFilters(), sample_pct=10.0)
+    assert con.execute(sql, params).fetchone() == (40000,)  # unfiltered: exact count(*) is cheaper
+    sql, params = build_article_count_query(ArticleFilters.normalized(countries=["DE"]), sample_pct=10.0)
+    estimate, margin = con.execute(sql, params).fetchone()
+    assert 0 < margin < 2000 and abs(estimate - 30000) <= margin
+
+    sql, params = build_country_coverage_query(sample_pct=10.0)
+    rows = {r[0]: r for r in con.execute(sql, params).fetchall()}
+    country, estimate, share, label, margin = rows["SE"]
+    assert abs(estimate - 10000) <= margin and abs(share - 25.0) < 2
+    sql, params = build_country_coverage_query()
+    assert len(con.execute(sql, params).fetchall()[0]) == 4  # exact queries keep their columns
+
+#23. -------------------------------------------------------------
+# Checks that independent page loaders run at the same time: results come back in order,
+# the total wait is about the slowest task, and a failing task raises its error.
+def test_run_concurrently_overlaps_and_keeps_order():
+    import time
+    import pytest
+    from dashboard.parallel import run_concurrently
+
+    def slow(value, seconds):
+        time.sleep(seconds)
+        return value
+
+    start = time.monotonic()
+    assert run_concurrently(lambda: slow("a", 0.3), lambda: slow("b", 0.1), lambda: slow("c", 0.3)) == ["a", "b", "c"]
+    assert time.monotonic() - start < 0.6
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        run_concurrently(lambda: slow("a", 0.1), fail)
+
+#24. -------------------------------------------------------------
+# Checks the post-ingest warm-up: every standard view is cached for every time window at
+# the current data version under the key the page loaders use, and older versions are dropped.
+def test_warm_up_caches_every_view_per_window(tmp_path):
+    from datetime import datetime, timezone
+    import duckdb
+    from ingestion.schema import DDL
+    from ingestion.ingest_news import bump_data_version
+    from ingestion.warm_up import warm_up_views
+    from transforms.duckdb_udfs import register_udfs
+    from dashboard.time_windows import TIME_FILTER_OPTIONS, time_bucket
+    from dashboard.result_cache import ResultCache, result_key
+    from dashboard.views import VIEW_QUERIES, view_query
+
+    con = register_udfs(duckdb.connect())
+    con.execute(DDL)
+    con.execute("""
+        INSERT INTO articles (article_id, url, provider, source_country, source_domain, topics, published_at, summary)
+        VALUES ('a1', 'u1', 'gdelt', 'SE', 'a.se', '[]', '2025-01-01 10:00', ''),
+               ('a2', 'u2', 'eventregistry', 'DE', 'a.de', '["economy"]', '2025-01-01 11:00', 'the war')
+    """)
+    cache = ResultCache(str(tmp_path))
+    now = datetime(2025, 1, 2, tzinfo=timezone.utc)
+    bump_data_version(con)
+    warm_up_views(con, cache, now=now)
+    version = bump_data_version(con)
+    assert warm_up_views(con, cache, now=now) == len(TIME_FILTER_OPTIONS) * len(VIEW_QUERIES)
+    assert cache.stats()["entries"] == len(TIME_FILTER_OPTIONS) * len(VIEW_QUERIES)  # old version pruned
+
+    sql, params = view_query("global_coverage.countries", "Last 7 days", time_bucket("Last 7 days", now))
+    warmed = cache.get(result_key(sql, params, version))
+    assert warmed.to_pylist() == con.execute(sql, params).to_arrow_table().to_pylist()
+    assert cache.get(result_key(sql, params, version + 1)) is None
+
+#25. -------------------------------------------------------------
+# Checks the on-disk result cache: results survive a new cache instance (another process),
+# the least recently used ones are evicted beyond the size cap, and hits/misses are counted.
+def test_result_cache_persists_and_evicts_lru(tmp_path):
+    import pyarrow as pa
+    from dashboard.result_cache import ResultCache, result_key
+
+    assert result_key("SELECT  1", [], 1) == result_key("SELECT 1", [], 1) != result_key("SELECT 1", [], 2)
+    table = pa.table({"x": list(range(1000))})
+    cache = ResultCache(str(tmp_path), max_bytes=20_000)
+    cache.put("a", table, 1)
+    cache.put("b", table, 1)
+    assert cache.get("a").equals(table)  # "a" is now more recent than "b"
+    cache.put("c", table, 1)  # over the cap: "b" goes
+
+    other = ResultCache(str(tmp_path), max_bytes=20_000)
+    assert other.get("b") is None
+    assert other.get("a").equals(table) and other.get("c").equals(table)
+    stats = other.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (3, 1, 2)
+    cache.close()
+    other.close()
+
+#26. -------------------------------------------------------------
+# Checks the daily rollup behind the Dagster assets: recomputing a day's facet_counts
+# gives the same counts as adding the articles one by one, and running it twice changes nothing.
+def test_refresh_facet_counts_is_idempotent_per_day():
+    import duckdb
+    from datetime import datetime
+    from ingestion.schema import DDL
+    from ingestion.facets import add_facet_counts, refresh_facet_counts
+
+    con = duckdb.connect()
+    con.execute(DDL)
+    con.execute("""
+        INSERT INTO articles (article_id, url, provider, source_country, topics, published_at) VALUES
+        ('a1', 'u1', 'gdelt', 'SE', '["economy"]', '2025-01-01 10:20'),
+        ('a2', 'u2', 'gdelt', 'DE', '["economy"]', '2025-01-02 08:00'),
+        ('a3', 'u3', 'eventregistry', 'SE', '["sports"]', '2025-01-02 09:00')
+    """)
+    add_facet_counts(con, ["a1", "a2", "a3"])
+    expected = con.execute("SELECT * FROM facet_counts ORDER BY ALL").fetchall()
+
+    day = (datetime(2025, 1, 2), datetime(2025, 1, 3))
+    refresh_facet_counts(con, *day)
+    refresh_facet_counts(con, *day)
+    assert con.execute("SELECT * FROM facet_counts ORDER BY ALL").fetchall() == expected
+
+#27. -------------------------------------------------------------
+# Checks micro-batch pacing: nothing runs while the newest fetch is within the freshness
+# target, and once it is stale only providers whose share of the daily budget has passed join.
+def test_micro_batch_pacing_respects_freshness_and_budgets():
+    from datetime import datetime, timedelta
+    from ingestion.pacing import ProviderPace, due_providers
+
+    paces = {"gdelt": ProviderPace(288, 250), "eventregistry": ProviderPace(12, 100)}  # every 5 min / 2 h
+    now = datetime(2025, 1, 1, 12, 0)
+    fresh = timedelta(minutes=30)
+    assert due_providers({}, now, paces, fresh) == ["gdelt", "eventregistry"]
+
+    last = {"gdelt": now - timedelta(minutes=10), "eventregistry": now - timedelta(minutes=10)}
+    assert due_providers(last, now, paces, fresh) == []
+    last = {"gdelt": now - timedelta(minutes=40), "eventregistry": now - timedelta(minutes=40)}
+    assert due_providers(last, now, paces, fresh) == ["gdelt"]
+    last["eventregistry"] = now - timedelta(hours=2)
+    assert due_providers(last, now, paces, fresh) == ["gdelt", "eventregistry"]
+
+#28. -------------------------------------------------------------
+# Checks the provider rate limiter: a reservation is capped by the daily quota, the quota is
+# shared through the DuckDB file (a second limiter sees it used up, and reserving more raises),
+# and a throttle backoff makes the next reservation wait.
+def test_rate_limiter_quota_is_persisted_and_backoff_waits(tmp_path):
+    import time
+    import pytest
+    from ingestion.rate_limit import ProviderLimits, QuotaExhausted, RateLimiter
+
+    path = str(tmp_path / "rate_limits.duckdb")
+    limits = {"news": ProviderLimits(requests_per_second=1000.0, burst=5, daily_requests=3, items_per_request=100)}
+    limiter = RateLimiter(path, limits)
+    assert limiter.reserve("news", 250) == 250  # 3 requests
+    assert RateLimiter(path, limits).remaining("news") == 0
+    with pytest.raises(QuotaExhausted):
+        RateLimiter(path, limits).reserve("news", 100)
+    assert RateLimiter(path, limits).reserve("news", 0) == 0  # asking for nothing is not an error
+
+    limits = {"news": ProviderLimits(1000.0, 5, daily_requests=10, items_per_request=100)}
+    limiter = RateLimiter(str(tmp_path / "other.duckdb"), limits)
+    assert limiter.reserve("news", 1000) == 1000
+    with pytest.raises(QuotaExhausted):
+        limiter.reserve("news", 1000)
+    limiter = RateLimiter(str(tmp_path / "backoff.duckdb"), limits)
+    limiter.penalize("news", 0.3)
+    started = time.perf_counter()
+    assert limiter.reserve("news", 50) == 50
+    assert time.perf_counter() - started >= 0.25
+
+#29. -------------------------------------------------------------
+# Checks the Event Registry query matrix: one capped sub-query per keyword x language, run
+# in parallel, with articles found by several sub-queries kept once (by uri).
+def test_eventregistry_matrix_fans_out_and_dedupes(tmp_path, monkeypatch):
+    import threading
+    import time
+    from ingestion import eventregistry_fetcher
+    from ingestion.article_types import NormalizedArticle
+    from ingestion.rate_limit import ProviderLimits, RateLimiter
+
+    calls, active, peak = [], [0], [0]
+    lock = threading.Lock()
+
+    def fake_fetch(keywords, category=None, lang=None, max_items=100, **kwargs):
+        with lock:
+            calls.append((keywords[0], lang, max_items))
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        uris = [f"{keywords[0]}-{lang}", "shared"]
+        return [
+            NormalizedArticle(
+                provider="eventregistry", provider_id=uri, url=f"https://example.com/{uri}", title=uri,
+                summary=None, body=None, image_url=None, published_at=None, source_name=None,
+                source_domain=None, source_country=None, language=lang, topics=[], raw={},
+            )
+            for uri in uris
+        ]
+
+    monkeypatch.setattr(eventregistry_fetcher, "fetch_eventregistry_articles", fake_fetch)
+    articles = eventregistry_fetcher.fetch_eventregistry_matrix(
+        ["economy", "sports"], langs=["eng", "deu"], max_items_per_query=40,
+        limiter=RateLimiter(str(tmp_path / "rate_limits.duckdb"), {"eventregistry": ProviderLimits(2.0, 5, 48, 100)}),
+    )
+    assert sorted(calls) == [("economy", "deu", 40), ("economy", "eng", 40), ("sports", "deu", 40), ("sports", "eng", 40)]
+    assert peak[0] > 1
+    uris = [a.provider_id for a in articles]
+    assert len(uris) == len(set(uris)) == 5
+
+#30. -------------------------------------------------------------
+# Checks that a second process (another dashboard replica) can use the Q&A answer cache
+# while this one holds it open, and that both see each other's answers.
+def test_answer_cache_is_shared_between_processes(tmp_path):
+    import subprocess
+    import sys
+    from dashboard.answer_cache import AnswerCache
+    from ingestion.db import ROOT_DIR
+
+    path = str(tmp_path / "answers.sqlite")
+    cache = AnswerCache(path)
+    cache.put("first", "from this process")
+    script = (
+        "from dashboard.answer_cache import AnswerCache\n"
+        f"cache = AnswerCache({path!r})\n"
+        "assert cache.get('first') == 'from this process'\n"
+        "cache.put('second', 'from the other process')\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT_DIR, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert cache.get("second") == "from the other process"
+    cache.close()
+
+#31. -------------------------------------------------------------
+# Checks the Event Registry budget that micro-batch pacing and the query matrix share: the
+# run's max_items is split over the sub-queries, and pacing spaces runs by what a matrix run
+# really spends, so a day of sensor ticks stays within the daily request budget.
+def test_query_matrix_runs_fit_the_daily_request_budget(monkeypatch):
+    from datetime import datetime, timedelta
+    from ingestion import ingest_news
+    from ingestion.pacing import PROVIDER_PACES, due_providers
+
+    monkeypatch.setattr(ingest_news, "ER_QUERY_MATRIX", True)
+    monkeypatch.setattr(ingest_news, "ER_KEYWORDS", ["economy", "technology", "politics", "sports", "health"])
+    monkeypatch.setattr(ingest_news, "ER_MATRIX_CATEGORIES", [None])
+    monkeypatch.setattr(ingest_news, "ER_MATRIX_LANGS", [None])
+    caps = []
+    monkeypatch.setattr(
+        ingest_news, "fetch_eventregistry_matrix",
+        lambda keywords, categories, langs, max_items_per_query, **kwargs: caps.append(max_items_per_query) or [],
+    )
+    ingest_news.fetch_eventregistry_batch(max_items=100)
+    assert caps == [20]  # 5 sub-queries x 20 = the run's 100 items
+
+    pace = ingest_news.eventregistry_pace()
+    assert pace.requests_per_run == 5
+    paces = {"eventregistry": pace}
+    day = datetime(2025, 1, 1)
+    last, spent = {}, 0
+    for minute in range(24 * 60):  # sensor ticks every minute
+        now = day + timedelta(minutes=minute)
+        if due_providers(last, now, paces, timedelta(minutes=30)):
+            spent += pace.requests_per_run
+            last["eventregistry"] = now
+    assert 0 < spent <= PROVIDER_PACES["eventregistry"].daily_requests
+
+#32. -------------------------------------------------------------
+# Checks that a fetcher out of quota fails loudly (so a daily partition isn't recorded as
+# empty) without calling the API, while max_items=0 is a silent skip.
+def test_fetchers_raise_when_quota_is_used_up(tmp_path, monkeypatch):
+    import pytest
+    from ingestion import gdelt_fetcher
+    from ingestion.rate_limit import ProviderLimits, QuotaExhausted, RateLimiter
+
+    def no_request(*args, **kwargs):
+        raise AssertionError("the API must not be called")
+
+    monkeypatch.setattr(gdelt_fetcher.requests, "get", no_request)
+    limiter = RateLimiter(str(tmp_path / "rate_limits.duckdb"), {"gdelt": ProviderLimits(1000.0, 1, 1, 250)})
+    limiter.reserve("gdelt", 250)  # the day's only request
+    assert gdelt_fetcher.fetch_gdelt_articles("economy", maxrecords=0, limiter=limiter) == []
+    with pytest.raises(QuotaExhausted):
+        gdelt_fetcher.fetch_gdelt_articles("economy", maxrecords=250, limiter=limiter)
+
+#33. -------------------------------------------------------------
+# Checks that only one thread (re)opens the read pool's connection, e.g. while an ingest
+# holds the write lock, without holding the pool lock; the others share its connection or
+# its error instead of each waiting on the file lock in turn.
+def test_read_pool_opens_once_outside_the_pool_lock(tmp_path, monkeypatch):
+    import threading
+    import time
+    import duckdb
+    import pytest
+    from ingestion import db
+
+    path = str(tmp_path / "news.duckdb")
+    writer = db.connect(path)
+    writer.execute("CREATE TABLE t AS SELECT 1 AS x")
+    writer.close()
+
+    real_connect, calls, release = db.connect, [], threading.Event()
+    fail = False
+
+    def slow_connect(*args, **kwargs):
+        calls.append(1)
+        release.wait(10)
+        if fail:
+            raise duckdb.IOException("Could not set lock on file")
+        return real_connect(*args, **kwargs)
+
+    monkeypatch.setattr(db, "connect", slow_connect)
+    pool = db.ReadConnectionPool(path)
+    results = []
+
+    def reader():
+        try:
+            with pool.cursor() as cur:
+                results.append(cur.execute("SELECT count(*) FROM t").fetchone()[0])
+        except duckdb.IOException as exc:
+            results.append(exc)
+
+    for fail in (True, False):
+        release.clear()
+        calls.clear()
+        results.clear()
+        threads = [threading.Thread(target=reader) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.3)  # all readers are waiting on the first one's open
+        assert calls and pool._lock.acquire(timeout=5)  # free while the connection is being opened
+        pool._lock.release()
+        release.set()
+        for thread in threads:
+            thread.join(10)
+        assert len(calls) == 1
+        if fail:
+            assert len(results) == 4 and all(isinstance(r, duckdb.IOException) for r in results)
+        else:
+            assert results == [1, 1, 1, 1]
+    pool.close()
+
+#34. -------------------------------------------------------------
+# Checks that a query matrix the day's quota can't pay for isn't started, and that one
+# running out partway hands back what the other sub-queries already fetched.
+def test_query_matrix_keeps_articles_when_quota_runs_out(tmp_path, monkeypatch):
+    import pytest
+    from ingestion import eventregistry_fetcher
+    from ingestion.article_types import NormalizedArticle
+    from ingestion.rate_limit import ProviderLimits, QuotaExhausted, RateLimiter
+
+    limiter = RateLimiter(str(tmp_path / "rate_limits.duckdb"), {"eventregistry": ProviderLimits(1000.0, 5, 3, 100)})
+
+    def fake_fetch(keywords, max_items, limiter, **kwargs):
+        if keywords == ["sports"]:
+            raise QuotaExhausted("Daily eventregistry quota of 3 requests is used up")
+        limiter.reserve("eventregistry", max_items)
+        return [NormalizedArticle(
+            provider="eventregistry", provider_id=keywords[0], url=f"https://example.com/{keywords[0]}",
+            title=keywords[0], summary=None, body=None, image_url=None, published_at=None, source_name=None,
+            source_domain=None, source_country=None, language=None, topics=[], raw={},
+        )]
+
+    monkeypatch.setattr(eventregistry_fetcher, "fetch_eventregistry_articles", fake_fetch)
+    with pytest.raises(QuotaExhausted) as exc_info:
+        eventregistry_fetcher.fetch_eventregistry_matrix(["economy", "sports", "health"], limiter=limiter)
+    assert [a.provider_id for a in exc_info.value.articles] == ["economy", "health"]
+
+    # 1 request left, the matrix needs 3: nothing is spent
+    with pytest.raises(QuotaExhausted) as exc_info:
+        eventregistry_fetcher.fetch_eventregistry_matrix(["economy", "sports", "health"], limiter=limiter)
+    assert exc_info.value.articles == []
+    assert limiter.remaining("eventregistry") == 1
+
+#35. -------------------------------------------------------------
+# Checks that reprocessing follows the stored taxonomy stamps rather than its progress
+# rows: going back to a taxonomy version that was already processed redoes rows stamped
+# with another version, and an old resume point isn't trusted once rows before it changed.
+def test_reprocess_after_switching_back_to_an_earlier_taxonomy():
+    import duckdb
+    from ingestion.reprocess import reprocess_articles
+    from ingestion.schema import DDL
+    from transforms.transform_utils import get_taxonomy
+
+    con = duckdb.connect()
+    con.execute(DDL)
+    con.execute("""
+        INSERT INTO articles (article_id, provider, url, title, language, topics) VALUES
+        ('a1', 'eventregistry', 'u1', 'Football league final', 'eng', '["politics"]'),
+        ('a2', 'gdelt', 'u2', 'Stocks fall', 'en', '["Unknown"]'),
+        ('a3', 'eventregistry', 'u3', 'Nothing to see', 'swe', '["health"]')
+    """)
+    version = get_taxonomy().version
+    assert reprocess_articles(con, batch_size=2, workers=1) == 3
+
+    # another taxonomy was reprocessed in between, then this one is back
+    con.execute("UPDATE articles SET taxonomy_version = 'other'")
+    assert reprocess_articles(con, batch_size=2, workers=1) == 3
+
+    # an unfinished run of this version stopped after a2, before the other taxonomy ran
+    con.execute("UPDATE articles SET taxonomy_version = 'other'")
+    con.execute(
+        "UPDATE reprocess_progress SET last_article_id = 'a2', finished_at = NULL WHERE taxonomy_version = ?",
+        [version],
+    )
+    assert reprocess_articles(con, batch_size=2, workers=1) == 3
+    assert reprocess_articles(con, batch_size=2, workers=1) == 0
+    assert {r[0] for r in con.execute("SELECT taxonomy_version FROM articles").fetchall()} == {version}
@@ -0,0 +1,47 @@
+from __future__ import annotations
+from typing import Any, Callable
+
+import duckdb
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from transforms.transform_utils import _token_set, categorize_text, count_frames, normalize_language
+
+# --- Transforms as vectorized DuckDB functions ---------------------------------
+# Lets SQL compute categories/frames next to filters and aggregates, e.g.
+#   SELECT unnest(categorize_text(title || ' ' || summary)) AS topic, count(*) FROM articles GROUP BY 1
+# DuckDB hands each UDF a whole Arrow column; repeated values are computed once.
+
+
+def _vectorize(func: Callable[[str], Any], out_type: pa.DataType) -> Callable[[pa.ChunkedArray], pa.Array]:
+    def udf(values: pa.ChunkedArray) -> pa.Array:
+        if isinstance(values, pa.ChunkedArray):
+            values = values.combine_chunks()
+        encoded = pc.dictionary_encode(values)
+        results = pa.array([func(v) for v in encoded.dictionary.to_pylist()], type=out_type)
+        return results.take(encoded.indices)
+    return udf
+
+
+def _frame_items(text: str) -> list:
+    return list(count_frames(text).items())
+
+
+def _title_tokens(text: str) -> list:
+    return sorted(_token_set(text))
+
+
+UDFS = {
+    # name: (python function, arrow return type, duckdb return type)
+    "categorize_text": (categorize_text, pa.list_(pa.string()), "VARCHAR[]"),
+    "count_frames": (_frame_items, pa.map_(pa.string(), pa.int32()), "MAP(VARCHAR, INTEGER)"),
+    "normalize_language": (normalize_language, pa.string(), "VARCHAR"),
+    "title_tokens": (_title_tokens, pa.list_(pa.string()), "VARCHAR[]"),
+}
+
+
+def register_udfs(con: duckdb.DuckDBPyConnection) -> duckdb.DuckDBPyConnection:
+    """Register the transform UDFs on a connection (cursors created from it inherit them)."""
+    for name, (func, arrow_type, sql_type) in UDFS.items():
+        con.create_function(name, _vectorize(func, arrow_type), ["VARCHAR"], sql_type, type="arrow")
+    return con
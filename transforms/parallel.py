@@ -0,0 +1,125 @@
+from __future__ import annotations
+import atexit
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from transforms.transform_utils import (
+    categorize_text,
+    count_frames,
+    get_taxonomy,
+    normalize_language,
+    normalize_topics,
+    warm_matchers,
+)
+
+# --- Process-pool transform executor -----------------------------------------
+# Topic/frame matching is pure Python and CPU-bound, so big batches (backfills,
+# reprocessing) are chunked across worker processes. Small batches stay serial
+# because starting workers costs more than it saves.
+
+DEFAULT_CHUNK_SIZE = 500
+MIN_PARALLEL_ITEMS = 2000
+
+_pools: Dict[int, ProcessPoolExecutor] = {}
+
+
+def default_workers() -> int:
+    """Worker count from TRANSFORM_WORKERS, else one per CPU core."""
+    env = os.getenv("TRANSFORM_WORKERS")
+    if env:
+        return max(1, int(env))
+    return os.cpu_count() or 1
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    pool = _pools.get(workers)
+    if pool is None:
+        # spawn: safe inside threaded hosts (Streamlit, Dagster); each worker compiles matchers once
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=warm_matchers,
+        )
+        _pools[workers] = pool
+    return pool
+
+
+@atexit.register
+def shutdown_pools() -> None:
+    for pool in _pools.values():
+        pool.shutdown(cancel_futures=True)
+    _pools.clear()
+
+
+def _apply_chunk(func: Callable[[Any], Any], chunk: List[Any]) -> List[Any]:
+    return [func(item) for item in chunk]
+
+
+def parallel_map(
+    func: Callable[[Any], Any],
+    items: Iterable[Any],
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    min_parallel: int = MIN_PARALLEL_ITEMS,
+) -> List[Any]:
+    """
+    Apply a module-level (picklable) function to every item, in input order.
+    Falls back to a plain loop for small batches or a single worker.
+    """
+    items = list(items)
+    workers = workers or default_workers()
+    if workers <= 1 or len(items) < max(min_parallel, 1):
+        return [func(item) for item in items]
+
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    out: List[Any] = []
+    # Executor.map yields results in submission order -> deterministic output
+    for part in _get_pool(min(workers, len(chunks))).map(partial(_apply_chunk, func), chunks):
+        out.extend(part)
+    return out
+
+
+def transform_record(record: dict) -> dict:
+    """
+    Derived fields for one article record (keys as in the articles table, topics as a list).
+    GDELT keeps its original themes; other providers get normalized categories.
+    """
+    taxonomy_version = get_taxonomy().version
+    provider_lower = (record.get("provider") or "").lower()
+    raw_topics = record.get("topics") or []
+    if provider_lower == "gdelt":
+        topics = raw_topics
+    else:
+        text_blob = f"{record.get('title') or ''} {record.get('summary') or ''}"
+        topics = normalize_topics(raw_topics, text_blob=text_blob)
+
+    return {
+        "topics": topics,
+        "language": normalize_language(record.get("language")),
+        "frames": count_frames(record.get("body") or record.get("summary") or ""),
+        "taxonomy_version": taxonomy_version,
+    }
+
+
+def rederive_record(record: dict) -> dict:
+    """
+    Like transform_record, but for an article already stored: topics are re-scored from the
+    text first (as the fetchers do), keeping the stored topics only when nothing matches.
+    """
+    if (record.get("provider") or "").lower() != "gdelt":
+        text_blob = f"{record.get('title') or ''} {record.get('body') or record.get('summary') or ''}"
+        record = {**record, "topics": categorize_text(text_blob) or record.get("topics") or []}
+    return transform_record(record)
+
+
+def transform_records(records: Iterable[dict], workers: Optional[int] = None) -> List[dict]:
+    """Run transform_record over a batch, in parallel when the batch is large."""
+    return parallel_map(transform_record, records, workers=workers)
+
+
+def rederive_records(records: Iterable[dict], workers: Optional[int] = None) -> List[dict]:
+    """Run rederive_record over a batch, in parallel when the batch is large."""
+    return parallel_map(rederive_record, records, workers=workers)
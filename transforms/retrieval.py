@@ -0,0 +1,106 @@
+from __future__ import annotations
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+# Small local retrieval stage: a BM25 index that can grow one article at a time,
+# so the dashboard only indexes articles it hasn't seen before.
+
+STOPWORDS = {
+    "the", "and", "for", "are", "was", "were", "with", "that", "this", "from", "what", "which",
+    "who", "how", "why", "when", "about", "into", "over", "more", "most", "than", "their", "there",
+    "these", "those", "have", "has", "had", "its", "not", "but", "you", "your", "any", "all",
+    "can", "does", "did", "based", "appear", "articles", "article", "coverage",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens (3+ chars, stopwords removed), duplicates kept for term frequency."""
+    return [t for t in re.split(r"\W+", (text or "").lower()) if len(t) >= 3 and t not in STOPWORDS]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough model-token count (~4 characters per token)."""
+    return len(text or "") // 4 + 1
+
+
+class BM25Index:
+    """
+    Okapi BM25 over short documents (title + summary). Documents are added incrementally;
+    adding an id that is already indexed is a no-op. Safe to share between Streamlit sessions.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._term_freqs: Dict[Hashable, Counter] = {}
+        self._lengths: Dict[Hashable, int] = {}
+        self._doc_freq: Counter = Counter()
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._term_freqs)
+
+    def __contains__(self, doc_id: Hashable) -> bool:
+        return doc_id in self._term_freqs
+
+    def add(self, doc_id: Hashable, text: str) -> bool:
+        """Index one document; returns False when the id was already indexed."""
+        if doc_id in self._term_freqs:
+            return False
+        terms = Counter(tokenize(text))
+        with self._lock:
+            if doc_id in self._term_freqs:
+                return False
+            self._term_freqs[doc_id] = terms
+            self._lengths[doc_id] = sum(terms.values())
+            self._doc_freq.update(terms.keys())
+            self._total_length += self._lengths[doc_id]
+        return True
+
+    def add_many(self, docs: Iterable[Tuple[Hashable, str]]) -> int:
+        """Index (id, text) pairs; returns how many were new."""
+        return sum(self.add(doc_id, text) for doc_id, text in docs)
+
+    def search(self, query: str, k: int = 10, allowed: Optional[Set[Hashable]] = None) -> List[Tuple[Hashable, float]]:
+        """Top-k (doc_id, score) for a query, best first. `allowed` restricts the candidates."""
+        query_terms = set(tokenize(query))
+        with self._lock:
+            n_docs = len(self._term_freqs)
+            if not n_docs or not query_terms:
+                return []
+            avg_length = self._total_length / n_docs
+            idf = {
+                t: math.log(1 + (n_docs - self._doc_freq[t] + 0.5) / (self._doc_freq[t] + 0.5))
+                for t in query_terms
+                if self._doc_freq[t]
+            }
+            candidates = self._term_freqs.keys() if allowed is None else (allowed & self._term_freqs.keys())
+            scores = []
+            for doc_id in candidates:
+                terms = self._term_freqs[doc_id]
+                length = self._lengths[doc_id]
+                score = 0.0
+                for t, weight in idf.items():
+                    tf = terms.get(t, 0)
+                    if tf:
+                        score += weight * tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * length / avg_length))
+                if score > 0:
+                    scores.append((doc_id, score))
+        scores.sort(key=lambda item: (-item[1], str(item[0])))
+        return scores[:k]
+
+
+def select_within_budget(snippets: Iterable[Tuple[Hashable, str]], token_budget: int) -> List[Tuple[Hashable, str]]:
+    """Keep (id, snippet) pairs in order until the estimated token budget is used up."""
+    chosen, used = [], 0
+    for doc_id, snippet in snippets:
+        cost = estimate_tokens(snippet)
+        if used + cost > token_budget:
+            break
+        chosen.append((doc_id, snippet))
+        used += cost
+    return chosen
@@ -1,5 +1,11 @@
 from __future__ import annotations
+import hashlib
+import json
+import os
 import re
+import threading
+import time
+from dataclasses import dataclass
 from typing import Dict, List, Set
 import pandas as pd
 
@@ -49,79 +55,116 @@ def normalize_language(val):
     return raw.title()
 
 
-# --- Topic categorization -----------------------------------------------------
-
-# Canonical categories and their keyword signals. Expand here when needed!
-CATEGORY_KEYWORDS: Dict[str, List[str]] = {
-    "business": [
-        "business", "company", "companies", "market", "markets", "stock", "stocks", "equity",
-        "share price", "ipo", "earnings", "revenue", "profit", "loss", "merger", "acquisition",
-        "m&a", "takeover", "startup", "start-up", "venture", "ceo", "executive", "layoff",
-        "investment", "investor", "funding", "valuation", "private equity", "deal"
-    ],
-    "economy": [
-        "economy", "economic", "macro", "inflation", "gdp", "interest rate", "interest rates",
-        "central bank", "federal reserve", "ecb", "boe", "boj", "unemployment", "jobs report",
-        "labor market", "recession", "growth", "fiscal policy", "deficit", "trade balance",
-        "cpi", "pce", "bond yield", "treasury", "monetary policy"
-    ],
-    "science": [
-        "research", "study", "studies", "experiment", "experiments", "discovery", "discoveries",
-        "peer review", "journal", "scientist", "laboratory", "lab", "academic", "evidence"
-    ],
-    "space": [
-        "space", "nasa", "spacex", "satellite", "satellites", "rocket", "launch", "astronomy",
-        "planet", "planets", "mission", "iss", "orbit", "telescope", "moon", "mars", "lunar",
-        "cosmos", "spacecraft"
-    ],
-    "environment_climate": [
-        "climate change", "emission", "emissions", "sustainability", "energy transition",
-        "renewable", "renewables", "solar", "wind", "greenhouse", "carbon", "net zero",
-        "wildfire", "heatwave", "flood", "drought", "hurricane", "storm", "weather event",
-        "environment", "pollution", "methane", "sea level", "biodiversity"
-    ],
-    "society": [
-        "society", "social", "migration", "immigration", "refugee", "refugees", "education",
-        "school", "university", "culture", "cultural", "demographic", "demographics",
-        "inequality", "poverty", "community", "housing", "crime", "justice"
-    ],
-    "technology": [
-        "technology", "tech", "ai", "artificial intelligence", "software", "hardware", "chip",
-        "semiconductor", "device", "gadget", "cloud", "data center", "cyber", "security",
-        "cybersecurity", "machine learning", "automation"
-    ],
-    "politics": [
-        "politic", "politics", "election", "elections", "government", "president", "parliament",
-        "congress", "minister", "policy", "regulation", "diplomat", "diplomacy", "vote",
-        "voting", "campaign", "senate"
-    ],
-    "sports": [
-        "sport", "sports", "football", "soccer", "nba", "fifa", "olympic", "tennis", "golf",
-        "cricket", "baseball", "basketball", "tournament", "match", "game", "league", "cup"
-    ],
-    "health": [
-        "health", "covid", "virus", "vaccine", "hospital", "medicine", "medical", "doctor",
-        "nurse", "disease", "outbreak", "pandemic", "pharma", "drug", "clinical trial",
-        "mental health", "public health"
-    ],
-}
-
-# Alias mapping for direct topic strings
-ALIASES = {
-    "environment & climate": "environment_climate",
-    "environment and climate": "environment_climate",
-    "environment": "environment_climate",
-    "climate": "environment_climate",
-}
+# --- Taxonomy (categories, aliases, framing groups) -----------------------------
+# Keyword lists live in a versioned file (transforms/taxonomy.json, or NEWS_TAXONOMY_FILE,
+# JSON or YAML) so they can change without a code deploy. Running processes notice a new
+# file within TAXONOMY_RELOAD_SECONDS; compiled matchers are cached per content hash.
+
+TAXONOMY_FILE = os.getenv(
+    "NEWS_TAXONOMY_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "taxonomy.json")
+)
+TAXONOMY_RELOAD_SECONDS = 5.0
+
+
+@dataclass(frozen=True)
+class Taxonomy:
+    version: str                               # "<declared version>@<content hash prefix>"
+    content_hash: str
+    category_keywords: Dict[str, List[str]]
+    aliases: Dict[str, str]
+    frame_groups: Dict[str, List[str]]
+    frame_patterns: Dict[str, re.Pattern]      # one compiled alternation per framing group
+
+    @property
+    def allowed(self) -> Set[str]:
+        return set(self.category_keywords.keys())
+
+
+_taxonomies_by_hash: Dict[str, Taxonomy] = {}
+_taxonomy_state = {"path": None, "stat": None, "checked_at": 0.0, "current": None}
+_taxonomy_lock = threading.Lock()
+
+
+def _parse_taxonomy(raw: bytes, path: str) -> dict:
+    if path.endswith((".yaml", ".yml")):
+        try:
+            import yaml
+        except ImportError as exc:
+            raise RuntimeError("Install pyyaml to load a YAML taxonomy file") from exc
+        return yaml.safe_load(raw)
+    return json.loads(raw)
+
+
+def _compile_taxonomy(raw: bytes, path: str, content_hash: str) -> Taxonomy:
+    data = _parse_taxonomy(raw, path)
+    frame_groups = data["frame_groups"]
+    return Taxonomy(
+        version=f"{data.get('version', 'unversioned')}@{content_hash[:12]}",
+        content_hash=content_hash,
+        category_keywords=data["category_keywords"],
+        aliases=data.get("aliases", {}),
+        frame_groups=frame_groups,
+        # same matches as one \b...\b search per keyword
+        frame_patterns={
+            frame: re.compile(r"\b(?:" + "|".join(re.escape(kw) for kw in kws) + r")\b")
+            for frame, kws in frame_groups.items()
+        },
+    )
+
+
+def get_taxonomy(path: str | None = None) -> Taxonomy:
+    """
+    Current taxonomy. The file is stat'ed at most every TAXONOMY_RELOAD_SECONDS and only
+    re-read when it changed; matchers are compiled once per distinct file content.
+    """
+    path = path or TAXONOMY_FILE
+    state = _taxonomy_state
+    now = time.monotonic()
+    current = state["current"]
+    if current is not None and state["path"] == path and now - state["checked_at"] < TAXONOMY_RELOAD_SECONDS:
+        return current
+
+    with _taxonomy_lock:
+        file_stat = os.stat(path)
+        stat_key = (file_stat.st_mtime_ns, file_stat.st_size)
+        if current is None or state["path"] != path or state["stat"] != stat_key:
+            with open(path, "rb") as fh:
+                raw = fh.read()
+            content_hash = hashlib.sha256(raw).hexdigest()
+            if content_hash not in _taxonomies_by_hash:
+                _taxonomies_by_hash[content_hash] = _compile_taxonomy(raw, path, content_hash)
+            state["current"] = _taxonomies_by_hash[content_hash]
+            state["path"] = path
+            state["stat"] = stat_key
+        state["checked_at"] = now
+        return state["current"]
+
+
+def warm_matchers() -> None:
+    """Load and compile the taxonomy up front (e.g. once per worker process)."""
+    get_taxonomy()
+
+
+# Old module constants keep working, but always reflect the current taxonomy
+def __getattr__(name: str):
+    if name == "CATEGORY_KEYWORDS":
+        return get_taxonomy().category_keywords
+    if name == "ALIASES":
+        return get_taxonomy().aliases
+    if name == "ALLOWED":
+        return get_taxonomy().allowed
+    if name == "FRAME_GROUPS":
+        return get_taxonomy().frame_groups
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-ALLOWED = set(CATEGORY_KEYWORDS.keys())
 
+# --- Topic categorization -----------------------------------------------------
 
 #Count keyword hits per category in the provided text (case-insensitive). Returns a dict of category -> score.
 def _score_categories(text: str) -> Dict[str, int]:
     txt = (text or "").lower()
     scores: Dict[str, int] = {}
-    for cat, keywords in CATEGORY_KEYWORDS.items():
+    for cat, keywords in get_taxonomy().category_keywords.items():
         count = 0
         for kw in keywords:
             if kw in txt:
@@ -164,20 +207,21 @@ def categorize_text(text: str) -> List[str]:
 #Normalize provider topics into categories.
 #If text_blob is provided and no categories are derived, fallback to keyword scoring.
 def normalize_topics(raw_topics: List[str], text_blob: str | None = None) -> List[str]:
+    taxonomy = get_taxonomy()
     out = set()
 
     for t in raw_topics or []:
         t_norm = (t or "").lower().strip()
         if not t_norm:
             continue
-        if t_norm in ALIASES:
-            out.add(ALIASES[t_norm])
+        if t_norm in taxonomy.aliases:
+            out.add(taxonomy.aliases[t_norm])
             continue
-        if t_norm in ALLOWED:
+        if t_norm in taxonomy.category_keywords:
             out.add(t_norm)
             continue
         # map by keyword signals inside provided topic string
-        for cat, kws in CATEGORY_KEYWORDS.items():
+        for cat, kws in taxonomy.category_keywords.items():
             if any(k in t_norm for k in kws):
                 out.add(cat)
                 break
@@ -191,54 +235,12 @@ def normalize_topics(raw_topics: List[str], text_blob: str | None = None) -> Lis
 
 # --- Framing analysis helpers -------------------------------------------------
 
-FRAME_GROUPS: Dict[str, List[str]] = {
-    "Conflict & War": [
-        "war", "armed conflict", "military conflict", "battle", "combat",
-        "offensive", "counteroffensive", "troops", "military deployment",
-        "frontline", "airstrike", "missile strike", "shelling",
-        "invasion", "occupation"
-    ],
-    "Terrorism & Security": [
-        "terrorist attack", "terrorism", "extremist group", "militant",
-        "insurgent", "suicide bombing", "mass shooting",
-        "security forces", "counterterrorism", "homeland security",
-        "radicalization"
-    ],
-    "Sanctions & Pressure": [
-        "economic sanctions", "trade sanctions", "financial sanctions",
-        "embargo", "asset freeze", "travel ban", "export controls",
-        "blacklist", "secondary sanctions", "boycott"
-    ],
-    "Humanitarian Impact": [
-        "humanitarian crisis", "civilian casualties", "civilian deaths",
-        "refugees", "internally displaced", "displacement",
-        "humanitarian aid", "aid delivery", "evacuation",
-        "famine", "food insecurity", "medical supplies"
-    ],
-    "Technology": [
-        "artificial intelligence", "machine learning", "AI model",
-        "large language model", "software system",
-        "cyberattack", "cyber warfare", "cybersecurity breach",
-        "data breach", "semiconductor", "chip manufacturing",
-        "surveillance technology"
-    ],
-    "Climate & Environment": [
-        "climate change", "global warming", "greenhouse gas",
-        "greenhouse gases", "carbon emissions", "CO2 emissions",
-        "net zero", "renewable energy", "energy transition",
-        "fossil fuels", "pollution", "environmental damage",
-        "climate policy"
-    ],
-}
-
-
 def count_frames(text: str) -> dict:
     """Count article-level matches per framing group inside a text blob."""
     txt = (text or "").lower()
     scores = {}
-    for frame, kws in FRAME_GROUPS.items():
-        matched = any(re.search(rf"\b{re.escape(kw)}\b", txt) for kw in kws)
-        scores[frame] = 1 if matched else 0
+    for frame, pattern in get_taxonomy().frame_patterns.items():
+        scores[frame] = 1 if pattern.search(txt) else 0
     return scores
 
 